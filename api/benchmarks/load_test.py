@@ -0,0 +1,389 @@
+"""
+学习接口端到端压测：在桩LLM与桩OCR下测量单个worker的吞吐、延迟分位数、事件循环延迟与内存
+
+LLM替换为按token数模拟耗时的本地桩提供商（benchmarks.stubs.StubLLM），OCR替换为固定延迟的桩进程池，
+测量的是服务本身（路由、校验、提示词、分片与合并、日志、追踪等）的开销与并发能力。
+请求负载按真实分布生成：不同的单词数、文章长度、文章篇幅与题目数。
+
+--transport inprocess 通过ASGI直接调用应用；--transport socket 在本地端口启动uvicorn，经过完整的HTTP栈。
+两种方式下事件循环延迟都在服务所在的事件循环上测量。
+
+用法（在api目录下执行）:
+    python -m benchmarks.load_test --requests 200 --concurrency 16
+    python -m benchmarks.load_test --scenario mixed --transport socket --json load.json
+    python -m benchmarks.load_test --save-baseline            # 记录当前结果为基线
+    python -m benchmarks.load_test --check --threshold 0.2    # 与基线对比，退化超过20%时返回非零退出码
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_test.json")
+
+WORDS = ["ideal", "gauge", "rarely", "usage", "album", "bounce", "recede", "commodity", "parade", "permeate",
+         "resilience", "ephemeral", "allocate", "coherent", "diminish", "elaborate", "fluctuate", "hypothesis",
+         "inevitable", "justify", "leverage", "mitigate", "notion", "obscure", "paradigm", "quantify", "reluctant",
+         "scrutiny", "tangible", "undermine", "viable", "widespread", "yield", "zealous", "abundant", "benevolent",
+         "candid", "deter", "emulate", "frugal", "gregarious", "hinder", "impartial", "lucid", "meticulous",
+         "nuance", "ominous", "pragmatic", "resolute", "subtle"]
+
+SENTENCE = ("Analysts {verb} the {word} of the new policy while residents debate whether the changes will last "
+            "beyond the coming winter.")
+VERBS = ["examined", "questioned", "praised", "measured", "doubted"]
+
+# 文章篇幅（字符数）：短、典型与接口允许的最大长度
+PASSAGE_SIZES = [(1000, 0.3), (3000, 0.5), (10000, 0.2)]
+WORD_COUNTS = [(5, 0.2), (15, 0.4), (30, 0.3), (50, 0.1)]
+ARTICLE_LENGTHS = [("short", 0.25), ("medium", 0.45), ("long", 0.2), ("custom", 0.1)]
+QUESTION_COUNTS = [(5, 0.7), (10, 0.3)]
+
+
+def weighted(rng: random.Random, choices: List[Tuple[object, float]]):
+    return rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+
+def make_passage(rng: random.Random, words: List[str], size: int) -> str:
+    """生成包含目标词、约size个字符的文章；带随机编号，避免翻译缓存命中"""
+    sentences = [f"Report {rng.randrange(10 ** 9)} opens the discussion."]
+    while sum(len(sentence) + 1 for sentence in sentences) < size:
+        sentences.append(SENTENCE.format(verb=rng.choice(VERBS), word=rng.choice(words)))
+    paragraphs = [" ".join(sentences[i:i + 6]) for i in range(0, len(sentences), 6)]
+    return "\n\n".join(paragraphs)[:size]
+
+
+def word2passage_request(rng: random.Random) -> Tuple[str, str, dict]:
+    length = weighted(rng, ARTICLE_LENGTHS)
+    body = {
+        "words": rng.sample(WORDS, weighted(rng, WORD_COUNTS)),
+        "article_type": "news",
+        "difficulty_level": "b1",
+        "tone_style": "formal",
+        "article_length": length,
+        "topic": "general",
+    }
+    if length == "custom":
+        body["custom_word_count"] = rng.choice([300, 1200])
+    return "POST", "/v1/api/learning/word2passage", {"json": body}
+
+
+def passage2explanation_request(rng: random.Random) -> Tuple[str, str, dict]:
+    words = rng.sample(WORDS, weighted(rng, WORD_COUNTS))
+    body = {"words": words, "passage": make_passage(rng, words, weighted(rng, PASSAGE_SIZES))}
+    return "POST", "/v1/api/learning/passage2explanation", {"json": body}
+
+
+def passage2question_request(rng: random.Random) -> Tuple[str, str, dict]:
+    words = rng.sample(WORDS, weighted(rng, WORD_COUNTS))
+    body = {"words": words, "passage": make_passage(rng, words, weighted(rng, PASSAGE_SIZES)),
+            "question_count": weighted(rng, QUESTION_COUNTS)}
+    return "POST", "/v1/api/learning/passage2question", {"json": body}
+
+
+def upload_image_request(rng: random.Random) -> Tuple[str, str, dict]:
+    # 桩OCR不解码图片，内容只用于测量上传读取的开销；大小覆盖手机拍照的常见范围
+    size = rng.choice([200, 800, 2000]) * 1024
+    data = b"\x89PNG\r\n\x1a\n" + rng.randbytes(size)
+    return "POST", "/v1/api/learning/upload_image", {"files": {"image": ("page.png", data, "image/png")}}
+
+
+SCENARIOS: Dict[str, List[Tuple[Callable[[random.Random], Tuple[str, str, dict]], float]]] = {
+    "word2passage": [(word2passage_request, 1.0)],
+    "passage2explanation": [(passage2explanation_request, 1.0)],
+    "passage2question": [(passage2question_request, 1.0)],
+    "upload_image": [(upload_image_request, 1.0)],
+    "mixed": [(word2passage_request, 0.3), (passage2explanation_request, 0.3),
+              (passage2question_request, 0.25), (upload_image_request, 0.15)],
+}
+
+
+def configure_environment(args):
+    """在导入应用之前配置桩提供商与隔离的运行目录"""
+    workdir = tempfile.mkdtemp(prefix="vocabverse-load-")
+    os.environ.update({
+        "LLM_PROVIDER": "STUB",
+        "LLM_ENABLED_PROVIDERS": "",
+        "LLM_PROVIDER_PLUGINS": "STUB=benchmarks.stubs:StubLLM",
+        "STUB_LLM_TTFT_MS": str(args.llm_ttft_ms),
+        "STUB_LLM_TOKENS_PER_SEC": str(args.llm_tokens_per_sec),
+        "SHARED_STATE_BACKEND": "memory",
+        "RATE_LIMIT_PER_MINUTE": "0",
+        "OCR_PREWARM": "false",
+        "UPLOAD_STORE_ENABLED": "false",
+        "LOG_DIR": os.path.join(workdir, "logs"),
+        "TRACE_EXPORT_PATH": "",
+        "PROFILE_SAMPLE_RATE": "0",
+    })
+    if args.replay:
+        # 用录制的真实调用代替桩提供商
+        os.environ.update({
+            "LLM_PROVIDER": "REPLAY",
+            "LLM_REPLAY_DIR": os.path.abspath(args.replay),
+            "LLM_REPLAY_TIME_SCALE": str(args.replay_time_scale),
+            "LLM_RECORD_DIR": "",
+        })
+    return workdir
+
+
+def rss_mb() -> float:
+    """当前进程的常驻内存（MB）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        import resource
+        # 非Linux平台只能取峰值
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+class LoopLagMonitor:
+    """周期性休眠并记录实际唤醒的延迟，反映事件循环被阻塞的程度"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - start - self.interval, 0.0))
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def reset(self):
+        self.samples = []
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)
+    return ordered[index]
+
+
+async def drive(client, scenario: str, requests: int, concurrency: int, seed: int) -> dict:
+    """以固定并发发送请求，返回延迟、错误数与耗时"""
+    rng = random.Random(seed)
+    generators = SCENARIOS[scenario]
+    # 请求内容在发送时才生成，上传的图片数据不会在整个场景期间占用内存
+    plan = [(weighted(rng, generators), rng.randrange(2 ** 32)) for _ in range(requests)]
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    queue = list(reversed(plan))
+
+    async def worker():
+        while queue:
+            generator, request_seed = queue.pop()
+            method, path, kwargs = generator(random.Random(request_seed))
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            if status != "200":
+                errors[status] = errors.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"latencies": latencies, "errors": errors, "elapsed": time.perf_counter() - start}
+
+
+def summarize(raw: dict, lag: List[float], rss_before: float, rss_after: float) -> dict:
+    latencies = raw["latencies"]
+    return {
+        "requests": len(latencies),
+        "errors": raw["errors"],
+        "throughput_rps": round(len(latencies) / raw["elapsed"], 2) if raw["elapsed"] else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+        "loop_lag_p99_ms": round(percentile(lag, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lag) * 1000, 2) if lag else 0.0,
+        "rss_mb": round(rss_after, 1),
+        "rss_growth_mb": round(rss_after - rss_before, 1),
+    }
+
+
+async def run_inprocess(scenarios: List[str], args) -> Dict[str, dict]:
+    import httpx
+    import main
+
+    results = {}
+    async with main.app.router.lifespan_context(main.app):
+        monitor = LoopLagMonitor()
+        monitor.start()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            for index, scenario in enumerate(scenarios):
+                await drive(client, scenario, min(args.warmup, args.requests), args.concurrency, args.seed + 1000)
+                monitor.reset()
+                rss_before = rss_mb()
+                raw = await drive(client, scenario, args.requests, args.concurrency, args.seed + index)
+                results[scenario] = summarize(raw, monitor.samples, rss_before, rss_mb())
+                print_row(scenario, results[scenario])
+        monitor.stop()
+    return results
+
+
+def run_socket(scenarios: List[str], args) -> Dict[str, dict]:
+    import httpx
+    import uvicorn
+    import main
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    # 服务运行在独立线程的事件循环中，延迟监测挂在该循环上
+    server_loop = asyncio.new_event_loop()
+    monitor = LoopLagMonitor()
+
+    def serve():
+        asyncio.set_event_loop(server_loop)
+        server_loop.run_until_complete(server.serve())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    server_loop.call_soon_threadsafe(monitor.start)
+
+    async def run_all() -> Dict[str, dict]:
+        results = {}
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300, limits=limits) as client:
+            for index, scenario in enumerate(scenarios):
+                await drive(client, scenario, min(args.warmup, args.requests), args.concurrency, args.seed + 1000)
+                monitor.reset()
+                rss_before = rss_mb()
+                raw = await drive(client, scenario, args.requests, args.concurrency, args.seed + index)
+                results[scenario] = summarize(raw, list(monitor.samples), rss_before, rss_mb())
+                print_row(scenario, results[scenario])
+        return results
+
+    try:
+        return asyncio.run(run_all())
+    finally:
+        server_loop.call_soon_threadsafe(monitor.stop)
+        server.should_exit = True
+        thread.join(timeout=30)
+
+
+HEADER = f"{'scenario':<22}{'req':>6}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'lag99':>8}{'rss':>8}"
+
+
+def print_row(scenario: str, result: dict):
+    errors = sum(result["errors"].values())
+    print(f"{scenario:<22}{result['requests']:>6}{errors:>6}{result['throughput_rps']:>9.1f}"
+          f"{result['p50_ms']:>9.0f}{result['p95_ms']:>9.0f}{result['p99_ms']:>9.0f}"
+          f"{result['loop_lag_p99_ms']:>8.1f}{result['rss_mb']:>8.0f}", flush=True)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """与基线对比：吞吐下降或p95/p99延迟上升超过阈值比例视为退化"""
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if not base:
+            continue
+        if base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{scenario}: throughput {result['throughput_rps']} rps < baseline "
+                               f"{base['throughput_rps']} rps")
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and result[key] > base[key] * (1 + threshold):
+                regressions.append(f"{scenario}: {key} {result[key]} > baseline {base[key]}")
+        if sum(result["errors"].values()) > sum(base["errors"].values()):
+            regressions.append(f"{scenario}: errors {result['errors']} (baseline {base['errors']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="学习接口端到端压测")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="要运行的场景，可重复指定，默认运行全部场景")
+    parser.add_argument("--transport", choices=["inprocess", "socket"], default="inprocess")
+    parser.add_argument("--requests", type=int, default=100, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发请求数")
+    parser.add_argument("--warmup", type=int, default=10, help="每个场景正式测量前的预热请求数")
+    parser.add_argument("--seed", type=int, default=42, help="负载生成的随机种子")
+    parser.add_argument("--llm-ttft-ms", type=float, default=100, help="桩LLM的首token延迟")
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=1000, help="桩LLM的生成速度")
+    parser.add_argument("--replay", help="回放该目录下录制的LLM调用，代替桩提供商")
+    parser.add_argument("--replay-time-scale", type=float, default=1.0, help="回放耗时相对录制时的倍数")
+    parser.add_argument("--ocr-latency-ms", type=float, default=300, help="桩OCR的单张图片耗时")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--check", action="store_true", help="与基线对比，超过阈值时以非零状态退出")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允许的退化比例")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    from benchmarks.stubs import StubOCRPool
+    from core.image2word import ocr_pool
+    ocr_pool._ocr_pool = StubOCRPool(latency=args.ocr_latency_ms / 1000)
+
+    scenarios = args.scenario or list(SCENARIOS)
+    print(HEADER)
+    if args.transport == "socket":
+        results = run_socket(scenarios, args)
+    else:
+        results = asyncio.run(run_inprocess(scenarios, args))
+
+    report = {
+        "transport": args.transport,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "llm_ttft_ms": args.llm_ttft_ms,
+        "llm_tokens_per_sec": args.llm_tokens_per_sec,
+        "ocr_latency_ms": args.ocr_latency_ms,
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"baseline not found: {args.baseline}", file=sys.stderr)
+            sys.exit(2)
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        keys = ("transport", "concurrency", "llm_ttft_ms", "llm_tokens_per_sec", "ocr_latency_ms")
+        if any(baseline.get(key) != report[key] for key in keys):
+            print("warning: baseline was recorded with different settings", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+请求处理流程中CPU热点的微基准测试
+
+覆盖各接口中与LLM无关的本地处理：单词清洗、OCR文本过滤、LLM返回内容的JSON解析、
+提示词模板编译与渲染、问题格式检查、响应模型的两次Pydantic校验。每项使用固定的
+small/typical/max三档输入（max为接口允许的上限），测量单次耗时并用tracemalloc统计内存分配。
+
+用法（在api目录下执行）:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter text_to_json --json micro.json
+    python -m benchmarks.micro --compare micro.json     # 与之前保存的结果对比
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+SIZES = ("small", "typical", "max")
+WORD_COUNTS = {"small": 5, "typical": 20, "max": 50}
+PASSAGE_CHARS = {"small": 1000, "typical": 3000, "max": 10000}
+OCR_LINES = {"small": 20, "typical": 120, "max": 400}
+QUESTION_COUNTS = {"small": 5, "typical": 10, "max": 20}
+
+VOCABULARY = ["ideal", "gauge", "rarely", "usage", "album", "bounce", "recede", "commodity", "parade", "permeate",
+              "resilience", "ephemeral", "allocate", "coherent", "diminish", "elaborate", "fluctuate", "hypothesis",
+              "inevitable", "justify", "leverage", "mitigate", "notion", "obscure", "paradigm", "quantify",
+              "reluctant", "scrutiny", "tangible", "undermine", "viable", "widespread", "yield", "zealous",
+              "abundant", "benevolent", "candid", "deter", "emulate", "frugal", "gregarious", "hinder",
+              "impartial", "lucid", "meticulous", "nuance", "ominous", "pragmatic", "resolute", "subtle"]
+
+
+def _passage(chars: int) -> str:
+    sentence = ("Analysts examined the **{word}** of the new policy while residents debated whether the changes "
+                "would last beyond the coming winter. ")
+    text, index = "", 0
+    while len(text) < chars:
+        text += sentence.format(word=VOCABULARY[index % len(VOCABULARY)])
+        index += 1
+        if index % 6 == 0:
+            text += "\\n\\n"
+    return text[:chars]
+
+
+def _words(size: str) -> List[str]:
+    # 混入需要清洗的字符，与用户输入的真实情况一致
+    return [f"{word}{'!' if i % 3 == 0 else ''}<{i}>" if i % 4 == 0 else word
+            for i, word in enumerate(VOCABULARY[:WORD_COUNTS[size]])]
+
+
+def _ocr_texts(size: str) -> List[Tuple[str, float]]:
+    rng = random.Random(7)
+    lines = []
+    for i in range(OCR_LINES[size]):
+        word = VOCABULARY[i % len(VOCABULARY)]
+        lines.append(rng.choice([
+            (f"{i + 1}. {word} /ˈ{word}/ n. 释义{i}", 0.93),
+            (f"{word} adj. 形容词释义", 0.91),
+            (f"Unit {i // 40 + 1}", 0.99),
+            (f"{i}", 0.99),
+            (f"{word} up with", 0.88),
+            ("理想的；完美的", 0.95),
+        ]))
+    return lines
+
+
+def _questions(size: str) -> List[dict]:
+    return [{
+        "question": f"The word '{VOCABULARY[i]}' in paragraph {i % 3 + 1} most nearly means...",
+        "answer": "ABCD"[i % 4],
+        "option": {key: f"Option {key} for question {i + 1}" for key in "ABCD"},
+        "explanation": {"chinese_exp": "原文第一段说明了这一点。", "english_exp": "The first paragraph states this."},
+    } for i in range(QUESTION_COUNTS[size])]
+
+
+def _explanation(size: str) -> dict:
+    passage = _passage(PASSAGE_CHARS[size])
+    return {
+        "language_points": [{"word": word, "explanation": f"n. /{word}/ 文中含义（第1段）\n - 搭配结构：use {word}"}
+                            for word in VOCABULARY[:WORD_COUNTS[size]]],
+        "translation": "委员会在下午最终表决之前仔细审议了这项提案。" * (len(passage) // 40),
+    }
+
+
+def _llm_response(size: str) -> str:
+    # LLM常见的返回形式：代码块包裹、含无效转义与控制字符
+    body = json.dumps(_explanation(size), ensure_ascii=False, indent=2)
+    return "```json\n" + body.replace("第1段", "第1段\\d").replace("搭配", "\x07搭配") + "\n```"
+
+
+def build_benchmarks() -> Dict[str, Tuple[Callable[[Any], Any], Dict[str, Any]]]:
+    """名称 -> (被测函数, 各档输入)"""
+    from jinja2 import Template
+
+    from controllers.learning import question_format_error
+    from core.image2word.word_extractor import get_word_extractor
+    from core.prompts.prompt_template import PromptTemplate, text_to_json
+    from core.prompts.prompts import WORD2TRANSLATION
+    from core.prompts.registry import prompt_registry
+    from pydantic import TypeAdapter
+    from services.learning.learning_service import sanitize_words
+    from services.learning.learning_type import Passage2ExplanationResponse, QuestionItem
+
+    extractor = get_word_extractor()
+    explanation_adapter = TypeAdapter(Passage2ExplanationResponse)
+    questions_adapter = TypeAdapter(List[QuestionItem])
+
+    def render_args(size: str) -> dict:
+        words = VOCABULARY[:WORD_COUNTS[size]]
+        return {"words": ",".join(words), "passage": _passage(PASSAGE_CHARS[size]), "focus_words": words}
+
+    def compile_each(kwargs: dict):
+        # 改造前的做法：每个请求都新建模板
+        return PromptTemplate(WORD2TRANSLATION, {}).render(words=kwargs["words"], passage=kwargs["passage"])
+
+    def explanation_double(result: dict):
+        # 接口中先构造响应模型，FastAPI再按response_model校验一次并序列化
+        response = Passage2ExplanationResponse(**result)
+        return explanation_adapter.dump_json(explanation_adapter.validate_python(response))
+
+    def explanation_single(result: dict):
+        return explanation_adapter.dump_json(explanation_adapter.validate_python(result))
+
+    def questions_validate(questions: List[dict]):
+        return questions_adapter.dump_json(questions_adapter.validate_python(questions))
+
+    # 各档输入在计时前生成
+    return {
+        "sanitize_words": (sanitize_words, {size: _words(size) for size in SIZES}),
+        "ocr_extract_words": (extractor.extract, {size: _ocr_texts(size) for size in SIZES}),
+        "text_to_json": (text_to_json, {size: _llm_response(size) for size in SIZES}),
+        "prompt_compile_each": (compile_each, {size: render_args(size) for size in SIZES}),
+        "prompt_registry_render": (lambda kwargs: prompt_registry.render("word2translation", **kwargs),
+                                   {size: render_args(size) for size in SIZES}),
+        "jinja_compile_only": (lambda source: Template(source), {"typical": WORD2TRANSLATION}),
+        "question_key_checks": (question_format_error, {size: _questions(size) for size in SIZES}),
+        "question_pydantic": (questions_validate, {size: _questions(size) for size in SIZES}),
+        "explanation_double_validation": (explanation_double, {size: _explanation(size) for size in SIZES}),
+        "explanation_single_validation": (explanation_single, {size: _explanation(size) for size in SIZES}),
+    }
+
+
+def time_it(func: Callable[[Any], Any], arg: Any, min_time: float, repeat: int) -> Dict[str, float]:
+    """自动确定循环次数使每轮至少min_time秒，重复repeat轮，返回单次耗时（微秒）"""
+    func(arg)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(arg)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 5 or loops >= 1 << 20:
+            break
+        loops *= 2
+    loops = max(int(loops * (min_time / max(elapsed, 1e-9))), 1)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(arg)
+        samples.append((time.perf_counter() - start) / loops * 1e6)
+    return {"min_us": round(min(samples), 2), "median_us": round(statistics.median(samples), 2), "loops": loops}
+
+
+def measure_allocations(func: Callable[[Any], Any], arg: Any) -> Dict[str, float]:
+    """单次调用的分配情况：调用期间的峰值内存增量，以及调用结束后仍存活的新增内存块数（含返回值）"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return {"peak_kib": round((peak - base) / 1024, 1), "retained_blocks": blocks}
+
+
+def compare(results: Dict[str, dict], previous: Dict[str, dict]):
+    print()
+    print(f"{'benchmark':<42}{'before us':>12}{'after us':>12}{'change':>10}")
+    for name, result in results.items():
+        old = previous.get(name)
+        if not old:
+            continue
+        change = (result["median_us"] - old["median_us"]) / old["median_us"] if old["median_us"] else 0.0
+        print(f"{name:<42}{old['median_us']:>12.1f}{result['median_us']:>12.1f}{change:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="请求处理流程CPU热点微基准测试")
+    parser.add_argument("--filter", help="只运行名称包含该字符串的测试")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每轮测量的最短时间（秒）")
+    parser.add_argument("--repeat", type=int, default=5, help="测量轮数，取中位数与最小值")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    print(f"{'benchmark':<42}{'median us':>12}{'min us':>12}{'peak KiB':>10}{'blocks':>8}")
+    for name, (func, fixtures) in build_benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        for size, arg in fixtures.items():
+            key = f"{name}/{size}"
+            result = time_it(func, arg, args.min_time, args.repeat)
+            result.update(measure_allocations(func, arg))
+            results[key] = result
+            print(f"{key:<42}{result['median_us']:>12.1f}{result['min_us']:>12.1f}"
+                  f"{result['peak_kib']:>10.1f}{result['retained_blocks']:>8}", flush=True)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"min_time": args.min_time, "repeat": args.repeat, "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
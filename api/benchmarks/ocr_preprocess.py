@@ -0,0 +1,106 @@
+"""
+OCR预处理基准测试：对比不同预处理配置下的识别耗时与准确率
+
+夹具目录中每张图片对应一个同名的.txt文件，内容为图片中应识别出的英文单词（空白分隔）。
+
+用法（在api目录下执行）:
+    python -m benchmarks.ocr_preprocess --fixtures benchmarks/fixtures/ocr --repeat 3
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from typing import Dict, List, Optional, Set
+
+from core.image2word.image2word import ImageOCR
+from core.image2word.preprocess import ImagePreprocessor
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'\-]+")
+
+# 待对比的预处理配置，None表示不做预处理（与改造前的行为一致）
+VARIANTS: Dict[str, Optional[dict]] = {
+    "baseline": None,
+    "downscale": dict(max_side=1600, fix_exif=False, grayscale=False, normalize_contrast=False, crop_text_column=False),
+    "downscale+exif": dict(max_side=1600, fix_exif=True, grayscale=False, normalize_contrast=False, crop_text_column=False),
+    "default": {},
+    "downscale+exif+gray": dict(max_side=1600, fix_exif=True, grayscale=True, normalize_contrast=True, crop_text_column=False),
+    "full+crop": dict(max_side=1600, fix_exif=True, grayscale=True, normalize_contrast=True, crop_text_column=True),
+    "aggressive": dict(max_side=1024, fix_exif=True, grayscale=True, normalize_contrast=True, crop_text_column=True),
+}
+
+
+def extract_words(text: str) -> Set[str]:
+    return {word.lower() for word in WORD_PATTERN.findall(text)}
+
+
+def load_fixtures(directory: str) -> List[dict]:
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        truth_path = os.path.join(directory, f"{stem}.txt")
+        if ext.lower() not in IMAGE_EXTENSIONS or not os.path.exists(truth_path):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            data = f.read()
+        with open(truth_path, encoding="utf-8") as f:
+            truth = extract_words(f.read())
+        fixtures.append({"name": name, "data": data, "truth": truth})
+    return fixtures
+
+
+def run_variant(ocr: ImageOCR, options: Optional[dict], fixtures: List[dict], repeat: int) -> dict:
+    ocr.preprocessor = ImagePreprocessor(**options) if options is not None else None
+    latencies = []
+    recalls = []
+    precisions = []
+    for fixture in fixtures:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            texts = ocr.recognize(fixture["data"])
+            latencies.append((time.perf_counter() - start) * 1000)
+        recognized = extract_words(" ".join(text for text, _ in texts))
+        hits = len(recognized & fixture["truth"])
+        recalls.append(hits / len(fixture["truth"]) if fixture["truth"] else 1.0)
+        precisions.append(hits / len(recognized) if recognized else 0.0)
+    return {
+        "latency_ms_mean": statistics.mean(latencies),
+        "latency_ms_p95": sorted(latencies)[max(int(len(latencies) * 0.95) - 1, 0)],
+        "recall": statistics.mean(recalls),
+        "precision": statistics.mean(precisions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR预处理耗时/准确率基准测试")
+    parser.add_argument("--fixtures", default="benchmarks/fixtures/ocr", help="图片夹具目录")
+    parser.add_argument("--repeat", type=int, default=3, help="每张图片重复识别次数")
+    parser.add_argument("--variants", nargs="*", default=list(VARIANTS), help="要测试的配置名称")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"夹具目录中没有找到带.txt标注的图片: {args.fixtures}")
+
+    ocr = ImageOCR()
+    # 预热一次，避免首次推理的初始化开销计入第一个配置
+    ocr.recognize(fixtures[0]["data"])
+
+    results = {}
+    print(f"{'variant':<22}{'mean(ms)':>10}{'p95(ms)':>10}{'recall':>9}{'precision':>11}")
+    for name in args.variants:
+        result = run_variant(ocr, VARIANTS[name], fixtures, args.repeat)
+        results[name] = result
+        print(f"{name:<22}{result['latency_ms_mean']:>10.1f}{result['latency_ms_p95']:>10.1f}"
+              f"{result['recall']:>9.3f}{result['precision']:>11.3f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"fixtures": len(fixtures), "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+提示词渲染基准测试：对比每次新建模板与注册表缓存模板的渲染吞吐，以及token估算与文章压缩的开销
+
+用法（在api目录下执行）:
+    python -m benchmarks.prompt_render --iterations 2000
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict
+
+from jinja2 import Template
+
+from core.prompts.prompts import PASSAGE2QUESTION, WORD2PASSAGE, WORD2TRANSLATION
+from core.prompts.registry import fit_passage, prompt_registry
+from core.prompts.tokenizer import count_tokens
+
+WORDS = ["ideal", "gauge", "rarely", "usage", "album", "bounce", "recede", "commodity", "parade", "permeate"]
+
+PASSAGE_PARAGRAPH = (
+    "December has always been a critical commodity sales season, but this year's shopping parade reveals "
+    "shifting consumer priorities. Retail analysts gauge foot traffic and online clicks to track spending. "
+    "The ideal gift is now experiential rather than material. Vinyl album sales made a remarkable bounce, "
+    "while collectors recede from digital platforms. Environmental campaigns permeate the holiday discourse, "
+    "and reusable wrapping is rarely questioned. "
+)
+# 中等篇幅文章（约2500个字符）不会触发裁剪；约10000个字符与接口允许的最长文章相当，会触发裁剪
+PASSAGE = "\n\n".join([PASSAGE_PARAGRAPH * 2] * 3)
+LONG_PASSAGE = "\n\n".join([PASSAGE_PARAGRAPH * 4] * 6)[:10000]
+
+PASSAGE_PARAMS = {
+    "words": ",".join(WORDS),
+    "article_type": "news",
+    "difficulty_level": "b1",
+    "tone_style": "formal",
+    "article_length": "medium",
+    "word_count": None,
+    "topic": "business",
+    "sentence_complexity": "0.5",
+}
+
+
+def measure(func: Callable[[], object], iterations: int) -> Dict[str, float]:
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return {"ops_per_sec": iterations / elapsed, "us_per_op": elapsed / iterations * 1e6}
+
+
+def scenarios() -> Dict[str, Callable[[], object]]:
+    explanation = {"words": ",".join(WORDS), "passage": PASSAGE}
+    questions = {**explanation, "difficulty": "适中"}
+    long_explanation = {**explanation, "passage": LONG_PASSAGE}
+    return {
+        # 改造前的做法：每个请求都重新编译模板
+        "word2passage/compile_each": lambda: Template(WORD2PASSAGE).render(**PASSAGE_PARAMS),
+        "word2passage/registry": lambda: prompt_registry.render("word2passage", **PASSAGE_PARAMS),
+        "word2translation/compile_each": lambda: Template(WORD2TRANSLATION).render(**explanation),
+        "word2translation/registry": lambda: prompt_registry.render("word2translation", focus_words=WORDS, **explanation),
+        "passage2question/compile_each": lambda: Template(PASSAGE2QUESTION).render(**questions),
+        "passage2question/registry": lambda: prompt_registry.render("passage2question", focus_words=WORDS, **questions),
+        "word2translation/registry_trimmed": lambda: prompt_registry.render("word2translation", focus_words=WORDS, **long_explanation),
+        "count_tokens/10k_chars": lambda: count_tokens(LONG_PASSAGE),
+        "fit_passage/10k_chars_to_1000": lambda: fit_passage(LONG_PASSAGE, 1000, WORDS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提示词渲染基准测试")
+    parser.add_argument("--iterations", type=int, default=2000, help="每个场景的执行次数")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario':<38}{'ops/s':>12}{'us/op':>12}")
+    for name, func in scenarios().items():
+        # 编译模板很慢，按比例减少次数
+        iterations = max(args.iterations // 20, 10) if name.endswith("compile_each") else args.iterations
+        results[name] = measure(func, iterations)
+        print(f"{name:<38}{results[name]['ops_per_sec']:>12.0f}{results[name]['us_per_op']:>12.1f}")
+
+    print()
+    print(f"{'prompt':<20}{'tokens':>10}{'trimmed':>10}")
+    for name, kwargs in (("word2passage", PASSAGE_PARAMS),
+                         ("word2translation", {"words": ",".join(WORDS), "passage": LONG_PASSAGE}),
+                         ("passage2question", {"words": ",".join(WORDS), "passage": LONG_PASSAGE, "difficulty": "适中"})):
+        rendered = prompt_registry.render(name, focus_words=WORDS, **kwargs)
+        print(f"{name:<20}{rendered.tokens:>10}{str(rendered.trimmed):>10}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"iterations": args.iterations, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+启动耗时基准测试：冷启动导入耗时、首次创建LLM客户端耗时与spawn工作进程耗时
+
+每项指标都在全新的解释器中测量，取多次运行的中位数。
+使用--compare可以在临时的git worktree中对同一指标测量另一个版本，便于对比改动前后。
+
+用法（在api目录下执行，需配置好.env或环境变量）:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 5 --compare HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+# 在子进程中执行的测量代码，结果以毫秒打印到标准输出
+IMPORT_MAIN = """
+import time
+start = time.perf_counter()
+import main
+print((time.perf_counter() - start) * 1000)
+"""
+
+FIRST_LLM = """
+import time
+import main
+from config.configs import settings
+from core.llm.llm_manager import LLM_Manager
+start = time.perf_counter()
+LLM_Manager().creatLLM(settings.LLM_PROVIDER)
+print((time.perf_counter() - start) * 1000)
+"""
+
+# 模拟OCR工作进程：spawn出的子进程需要重新导入主模块，之后才能执行初始化函数
+WORKER_SPAWN = """
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=importlib.import_module, initargs=("main",)) as executor:
+        executor.submit(os.getpid).result()
+    print((time.perf_counter() - start) * 1000)
+"""
+
+SCENARIOS = {
+    "import_main_ms": IMPORT_MAIN,
+    "first_llm_client_ms": FIRST_LLM,
+    "worker_spawn_ms": WORKER_SPAWN,
+}
+
+
+def measure(code: str, cwd: str, runs: int) -> Optional[float]:
+    samples: List[float] = []
+    for _ in range(runs):
+        with tempfile.NamedTemporaryFile("w", suffix=".py", dir=cwd, delete=False) as f:
+            f.write(code)
+            script = f.name
+        try:
+            proc = subprocess.run([sys.executable, script], cwd=cwd, capture_output=True, text=True)
+        finally:
+            os.remove(script)
+        if proc.returncode != 0:
+            print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error", file=sys.stderr)
+            return None
+        samples.append(float(proc.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def run_all(cwd: str, runs: int) -> Dict[str, Optional[float]]:
+    return {name: measure(code, cwd, runs) for name, code in SCENARIOS.items()}
+
+
+def measure_ref(ref: str, runs: int) -> Dict[str, Optional[float]]:
+    """在临时worktree中测量指定git版本"""
+    api_dir = os.getcwd()
+    top = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True).stdout.strip()
+    relative = os.path.relpath(api_dir, top)
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "tree")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, ref], capture_output=True, check=True)
+        try:
+            ref_api_dir = os.path.join(worktree, relative)
+            # 复用当前目录的.env，保证两边配置一致
+            if os.path.exists(os.path.join(api_dir, ".env")):
+                with open(os.path.join(api_dir, ".env"), "rb") as src, open(os.path.join(ref_api_dir, ".env"), "wb") as dst:
+                    dst.write(src.read())
+            return run_all(ref_api_dir, runs)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], capture_output=True)
+
+
+def fmt(value: Optional[float]) -> str:
+    return f"{value:>10.1f}" if value is not None else f"{'error':>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="每项指标的运行次数")
+    parser.add_argument("--compare", help="对比的git版本，如HEAD~1")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    results = {"current": run_all(os.getcwd(), args.runs)}
+    if args.compare:
+        results[args.compare] = measure_ref(args.compare, args.runs)
+
+    columns = list(results)
+    print(f"{'metric':<22}" + "".join(f"{column:>12}" for column in columns))
+    for name in SCENARIOS:
+        print(f"{name:<22}" + "".join(f"  {fmt(results[column][name])}" for column in columns))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
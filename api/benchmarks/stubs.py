@@ -0,0 +1,167 @@
+"""
+基准测试用的本地桩：不访问网络的LLM提供商与不加载模型的OCR进程池
+
+桩LLM按提示词类型返回格式正确的结果，耗时按"首token延迟 + 输出token数 / 生成速度"模拟，
+由环境变量STUB_LLM_TTFT_MS与STUB_LLM_TOKENS_PER_SEC配置。通过提供商插件机制注册:
+    LLM_PROVIDER=STUB LLM_PROVIDER_PLUGINS=STUB=benchmarks.stubs:StubLLM
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Iterator, List, Optional, Tuple, Union
+
+from core.llm.llm import LLM
+from core.prompts.tokenizer import count_tokens
+
+_FILLER = ("The committee reviewed the proposal carefully before the final vote was held in the afternoon. "
+           "Several members noted that the budget would need to be adjusted over the coming months. ")
+_FILLER_ZH = "委员会在下午最终表决之前仔细审议了这项提案。几位成员指出，预算需要在未来几个月内进行调整。"
+
+
+def _between(prompt: str, pattern: str, default: str = "") -> str:
+    matches = re.findall(pattern, prompt)
+    return matches[-1].strip() if matches else default
+
+
+def _article(words: List[str], length: int) -> str:
+    sentences = [f"In this part the **{word}** appears naturally in context." for word in words]
+    text = " ".join(sentences)
+    while len(text.split()) < length:
+        text += " " + _FILLER
+    return " ".join(text.split()[:max(length, len(sentences) * 8)])
+
+
+def _question(index: int, seed: str) -> dict:
+    return {
+        "question": f"Question {index + 1} about {seed}: which statement is supported by the passage?",
+        "answer": "ABCD"[index % 4],
+        "option": {key: f"Option {key} for question {index + 1}" for key in "ABCD"},
+        "explanation": {"chinese_exp": "原文第一段说明了这一点。", "english_exp": "The first paragraph states this."},
+    }
+
+
+def respond(prompt: str) -> str:
+    """按提示词类型生成桩响应"""
+    if "文章策划助手" in prompt:
+        sections = int(_between(prompt, r"恰好包含(\d+)个部分", "3"))
+        total = int(_between(prompt, r"文章长度: 约(\d+)词", "800"))
+        words = [word for word in _between(prompt, r"单词列表: (.*)").split(",") if word]
+        return json.dumps({
+            "title": "A Stub Article",
+            "style_notes": "third person, past tense",
+            "sections": [{"heading": f"Part {i + 1}", "summary": f"Summary of part {i + 1}.",
+                          "words": words[i::sections], "word_count": total // sections}
+                         for i in range(sections)],
+        })
+    if "分工写作同一篇文章" in prompt:
+        words = [word for word in _between(prompt, r"本部分必须使用的单词: (.*)").split(",") if word]
+        return json.dumps({"content": _article(words, int(_between(prompt, r"本部分长度: 约(\d+)词", "250")))})
+    if "全文翻译任务说明" in prompt:
+        passage = prompt.rsplit("原文内容:", 1)[-1]
+        return json.dumps({"translation": (_FILLER_ZH * (len(passage) // 100 + 1))[:max(len(passage) // 2, 20)]},
+                          ensure_ascii=False)
+    if "单词语境解析任务说明" in prompt or "文本分析任务说明" in prompt:
+        words = [word for word in _between(prompt, r"待解析单词:(.*)").split(",") if word]
+        points = [{"word": word, "explanation": f"n. /{word}/ 文中含义（第1段）\n - 搭配结构：use {word} in context"}
+                  for word in words]
+        result = {"language_points": points}
+        if "文本分析任务说明" in prompt:
+            passage = prompt.rsplit("原文内容:", 1)[-1]
+            result["translation"] = (_FILLER_ZH * (len(passage) // 100 + 1))[:max(len(passage) // 2, 20)]
+        return json.dumps(result, ensure_ascii=False)
+    if "Please design" in prompt:
+        count = int(_between(prompt, r"Please design (\d+)", "5"))
+        seed = _between(prompt, r"article:(.{0,40})", "the article")
+        return json.dumps([_question(i, seed) for i in range(count)], ensure_ascii=False)
+    # 单次生成整篇文章
+    words = [word for word in _between(prompt, r"单词列表: (.*)").split(",") if word]
+    length = _between(prompt, r"文章长度: (\d+)词")
+    length = int(length) if length else {"100": 150, "300": 400, "600": 800}.get(
+        _between(prompt, r"文章长度: (\d+)-", "300"), 400)
+    article = _article(words, length)
+    return json.dumps({"article": article, "word_count": str(len(article.split())), "article_type": "news",
+                       "difficulty_level": "b1", "tone_style": "formal", "topic": "general"})
+
+
+class StubLLM(LLM):
+    """不访问网络的桩提供商，按token数模拟生成耗时"""
+
+    model = "stub"
+
+    def __init__(self, client=None):
+        self.ttft = float(os.getenv("STUB_LLM_TTFT_MS", "100")) / 1000
+        self.tokens_per_sec = float(os.getenv("STUB_LLM_TOKENS_PER_SEC", "1000"))
+
+    def setPrompt(self, prompt: str):
+        pass
+
+    def addHistory_User(self, content):
+        pass
+
+    def addHistory_Assistant(self, content):
+        pass
+
+    def addHistory(self, messages):
+        pass
+
+    def _decode_time(self, response: str) -> float:
+        return count_tokens(response) / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    def ChatToBot(self, content: str):
+        response = respond(content)
+        time.sleep(self.ttft + self._decode_time(response))
+        return response
+
+    def ChatToBotWithStream(self, content: str) -> Iterator[str]:
+        response = respond(content)
+        time.sleep(self.ttft)
+        chunk_size = max(len(response) // 20, 1)
+        for start in range(0, len(response), chunk_size):
+            chunk = response[start:start + chunk_size]
+            time.sleep(self._decode_time(chunk))
+            yield chunk
+
+
+class StubOCRPool:
+    """代替OCR进程池：不启动工作进程，按固定延迟返回识别结果"""
+
+    def __init__(self, latency: float = 0.3, words: Optional[List[str]] = None):
+        self.latency = latency
+        self.words = words or ["ideal", "gauge", "rarely", "usage", "album", "bounce", "recede", "commodity"]
+        self.pool_size = 0
+        self.cache = None
+        self._pending = 0
+
+    def start(self, warmup: bool = True):
+        pass
+
+    def shutdown(self, wait_jobs: bool = True):
+        pass
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        return {"pool_size": 0, "pending": self._pending, "waiting": 0, "cache": None}
+
+    def _result(self) -> List[Tuple[str, float]]:
+        return [(word, 0.98) for word in self.words] + [("12", 0.99), ("n. 理想", 0.95)]
+
+    def recognize(self, image: Union[str, bytes], timeout: Optional[float] = None) -> List[Tuple[str, float]]:
+        self._pending += 1
+        try:
+            time.sleep(self.latency)
+            return self._result()
+        finally:
+            self._pending -= 1
+
+    async def recognize_async(self, image: Union[str, bytes], timeout: Optional[float] = None) -> List[Tuple[str, float]]:
+        self._pending += 1
+        try:
+            await asyncio.sleep(self.latency)
+            return self._result()
+        finally:
+            self._pending -= 1
@@ -1,25 +1,201 @@
+from typing import List, Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
+
+# 各LLM提供商启用时必须配置的字段
+PROVIDER_REQUIRED_FIELDS = {
+    "OPENAI": ["OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_MODEL"],
+    "DEEPSEEK": ["DEEPSEEK_API_KEY", "DEEPSEEK_BASE_URL", "DEEPSEEK_MODEL"],
+    "SILICONFLOW": ["SILICONFLOW_API_KEY", "SILICONFLOW_BASE_URL", "SILICONFLOW_MODEL"],
+    "GEMINI": ["GEMINI_API_KEY", "GEMINI_MODEL"],
+}
+
 class Settings(BaseSettings):
     LLM_PROVIDER :str
+    LLM_ENABLED_PROVIDERS:str = ""   # 除LLM_PROVIDER外需要启用的提供商，逗号分隔
+    LLM_PROVIDER_PLUGINS:str = ""    # 额外的提供商插件，格式为 NAME=module:Class，逗号分隔
+    LLM_STREAM_RESPONSES:bool = False  # 以流式方式调用LLM（结果拼接后返回），可统计首token延迟
+    LLM_MAX_CONCURRENCY:int = 8      # 单个进程对同一提供商同时进行的调用上限，0表示不限制
+    LLM_PROVIDER_CONCURRENCY:str = ""  # 按提供商覆盖并发上限，格式为 NAME=limit，逗号分隔
+    LLM_QUEUE_TIMEOUT:float = 60     # 等待并发额度的最长秒数，超时后请求失败（503），0表示一直等待
+    LLM_PARALLEL_WORKERS:int = 16    # 分片并行调用共用的线程数上限
+    LLM_RECORD_DIR:str = ""          # 不为空时录制LLM调用的请求、响应与分段耗时到该目录（gzip压缩的JSONL）
+    LLM_REPLAY_DIR:str = ""          # LLM_PROVIDER=REPLAY时读取的录制目录
+    LLM_REPLAY_TIME_SCALE:float = 1.0  # 回放耗时相对录制时的倍数，0表示不等待
+    LLM_REPLAY_MISS:str = "nearest"  # 找不到相同请求时的处理：nearest返回同类提示词的录制结果，error报错
+
+    # 只有被启用的提供商需要配置对应字段
+    OPENAI_API_KEY:Optional[str] = None
+    OPENAI_BASE_URL:Optional[str] = None
+    OPENAI_MODEL:Optional[str] = None
+
+    DEEPSEEK_API_KEY:Optional[str] = None
+    DEEPSEEK_BASE_URL:Optional[str] = None
+    DEEPSEEK_MODEL:Optional[str] = None
+
+    SILICONFLOW_API_KEY:Optional[str] = None
+    SILICONFLOW_BASE_URL:Optional[str] = None
+    SILICONFLOW_MODEL:Optional[str] = None
+
+    GEMINI_API_KEY:Optional[str] = None
+    GEMINI_MODEL:Optional[str] = None
+
+    # 启动预热配置
+    WARMUP_PROVIDER_PROBE:bool = False   # 预热时是否对LLM提供商做一次轻量连通性检查
+    WARMUP_PROBE_TIMEOUT:float = 5
+    WARMUP_PROBE_REQUIRED:bool = False   # 连通性检查失败时是否视为未就绪
+
+    # OCR工作进程池配置
+    OCR_POOL_SIZE:int = 0            # 工作进程数，0表示按CPU核数自动计算
+    OCR_CPU_THREADS:int = 2          # 每个工作进程的推理线程数
+    OCR_QUEUE_SIZE:int = 16          # 等待队列上限，超出后拒绝新请求
+    OCR_WORKER_MAX_JOBS:int = 200    # 每个工作进程处理多少次任务后回收重建
+    OCR_PREWARM:bool = True          # 启动预热时拉起OCR进程池；关闭后在首次上传时按需加载
+    OCR_USE_GPU:bool = False
+    OCR_LANG:str = "ch"
+    OCR_REC_BATCH_NUM:int = 16       # 识别模型每批处理的文本行数
+    OCR_WORDLIST_PATH:str = ""       # 英文词表文件（每行一个单词或词组），用于校验并匹配OCR提取的单词
+    OCR_MIN_CONFIDENCE:float = 0.5   # 低于该置信度的识别行被丢弃
+    OCR_MAX_PHRASE_WORDS:int = 4     # 单个词条的最大单词数，更长的英文片段视为例句
+    OCR_MAX_CONCURRENCY:int = 0      # 单个API进程同时提交的OCR任务上限，0表示与工作进程数一致
+    OCR_TIMEOUT_SECONDS:float = 60   # 单张图片的识别超时（含排队时间）
+
+    # OCR结果缓存配置
+    OCR_CACHE_ENABLED:bool = True
+    OCR_CACHE_MAX_ENTRIES:int = 1024     # 内存中缓存的图片数上限（LRU淘汰）
+    OCR_CACHE_PHASH_DISTANCE:int = 0     # 感知哈希（256位）判定为同一图片的最大汉明距离，0表示关闭（默认）；排版相同的不同页面也很接近，开启时建议不超过4
+    OCR_CACHE_DISK_DIR:str = ""          # 磁盘缓存目录，为空表示不启用
+    OCR_CACHE_SHARED:bool = True         # 识别结果写入共享状态后端，多个worker之间复用并合并重复识别
+    OCR_CACHE_SHARED_TTL:float = 24 * 3600
+
+    # OCR图像预处理配置
+    OCR_PREPROCESS_ENABLED:bool = True
+    OCR_MAX_SIDE:int = 1600          # 最长边像素上限，0表示不缩放
+    OCR_FIX_EXIF:bool = True         # 按EXIF方向校正，校正后跳过方向分类器
+    OCR_GRAYSCALE:bool = False
+    OCR_NORMALIZE_CONTRAST:bool = True
+    OCR_CROP_TEXT_COLUMN:bool = False
 
+    # 上传配置
+    UPLOAD_MAX_BYTES:int = 10 * 1024 * 1024  # 单个上传文件大小上限
+    UPLOAD_CHUNK_SIZE:int = 64 * 1024        # 分块读取大小
+    UPLOAD_MAX_FILES:int = 10                # 批量上传的图片数量上限
+    UPLOAD_STORE_ENABLED:bool = False        # 是否持久化保存上传的图片
+    UPLOAD_STORE_DIR:str = "uploads"
+    UPLOAD_STORE_MAX_BYTES:int = 512 * 1024 * 1024  # 上传目录总大小上限，超出后淘汰最旧文件
 
-    OPENAI_API_KEY:str
-    OPENAI_BASE_URL:str
-    OPENAI_MODEL:str
+    # 服务进程配置（serve.py）
+    SERVER_HOST:str = "0.0.0.0"
+    SERVER_PORT:int = 9988
+    SERVER_WORKERS:int = 1                   # worker进程数
+    SERVER_GRACEFUL_TIMEOUT:float = 30       # 收到退出信号后等待连接关闭的最长时间
+    SERVER_DRAIN_TIMEOUT:float = 25          # 退出前等待进行中的LLM调用完成的最长时间
+    SERVER_DRAIN_ON_SIGNAL:bool = False      # 收到SIGTERM时先在监听状态下排空再退出（serve.py默认开启）
+    SERVER_DRAIN_DELAY:float = 5             # 排空开始后继续接收请求的时间，供负载均衡器通过/readyz摘除实例
 
-    DEEPSEEK_API_KEY:str
-    DEEPSEEK_BASE_URL:str
-    DEEPSEEK_MODEL:str
+    # 跨worker共享状态配置（缓存、限流、single-flight）
+    SHARED_STATE_BACKEND:str = "sqlite"      # sqlite（单机多worker）、redis（多机）或memory（单worker）
+    SHARED_STATE_SQLITE_PATH:str = "data/shared_state.db"
+    SHARED_STATE_REDIS_URL:str = "redis://127.0.0.1:6379/0"
+    RATE_LIMIT_PER_MINUTE:int = 0            # 每个客户端每分钟的请求上限，0表示不限流
+    TRUSTED_PROXIES:str = ""                 # 可信反向代理的IP或网段，逗号分隔；只有来自这些地址的请求才采用X-Forwarded-For
 
-    SILICONFLOW_API_KEY:str
-    SILICONFLOW_BASE_URL:str
-    SILICONFLOW_MODEL:str
+    # 学习记录存储配置
+    RECORD_STORE_PATH:str = "data/records.db"  # 服务端学习记录数据库（SQLite）
+    RECORD_COMPRESS_LEVEL:int = 6            # 文章、翻译与题目的zlib压缩级别
+    RECORD_PREVIEW_CHARS:int = 160           # 历史列表中文章预览的字符数
+    RECORD_PAGE_SIZE:int = 20                # 历史列表默认每页记录数
+    RECORD_MAX_PAGE_SIZE:int = 100           # 每页记录数上限
+    RECORD_EXPORT_BATCH:int = 200            # 导出时每次从数据库读取的记录数
+    RECORD_IMPORT_BATCH:int = 500            # 导入时每个事务插入的记录数
+    RECORD_IMPORT_MAX_LINE_BYTES:int = 1024 * 1024  # 导入文件中单条记录的大小上限
+
+    # 复习计划配置（SM-2）
+    REVIEW_TRACK_EXPOSURES:bool = True       # 保存新的学习记录时，将其中的单词加入复习计划
+    REVIEW_INITIAL_EASE:float = 2.5          # 新单词的难度系数
+    REVIEW_MAX_INTERVAL_DAYS:float = 365     # 复习间隔上限
+    REVIEW_EXPOSURE_QUALITY:int = 3          # 单词出现在生成的文章中视为的回忆质量（0-5）
+    REVIEW_CORRECT_QUALITY:int = 4           # 答对相关题目视为的回忆质量
+    REVIEW_INCORRECT_QUALITY:int = 1         # 答错相关题目视为的回忆质量
+
+    # 响应压缩与条件请求配置
+    COMPRESSION_ENABLED:bool = True          # 按Accept-Encoding压缩响应（安装brotli后优先br，否则gzip）
+    COMPRESSION_MIN_BYTES:int = 1024         # 小于该大小的完整响应不压缩
+    COMPRESSION_GZIP_LEVEL:int = 6
+    COMPRESSION_BROTLI_QUALITY:int = 5
+    ETAG_ENABLED:bool = True                 # GET响应返回内容哈希ETag，If-None-Match匹配时返回304
+    ETAG_MAX_BYTES:int = 2 * 1024 * 1024     # 超过该大小的响应不计算ETag
+    GENERATION_RESULTS_ENABLED:bool = True   # 保存生成接口的结果，可通过Content-Location给出的GET地址重新获取并使用ETag验证
+    GENERATION_RESULTS_TTL:float = 24 * 3600
+
+    # 日志配置
+    LOG_DIR:str = "logs"
+    LOG_LEVEL:str = "INFO"
+    LOG_MAX_BYTES:int = 50 * 1024 * 1024     # 单个日志文件大小上限，超出后轮转
+    LOG_ROTATE_HOURS:float = 24              # 按时间轮转的间隔，0表示只按大小轮转
+    LOG_BACKUP_COUNT:int = 14                # 保留的历史日志文件数
+    LOG_QUEUE_SIZE:int = 10000               # 待写入日志的队列上限，超出后丢弃
+    LOG_MAX_FIELD_CHARS:int = 512            # 请求/响应载荷中单个字符串字段的最大长度
+    LOG_PAYLOAD_SAMPLE_RATE:float = 0.0      # 保留完整载荷（不截断）的请求比例
+
+    # 请求追踪配置
+    TRACE_ENABLED:bool = True                # 记录请求各阶段耗时并返回Server-Timing响应头
+    TRACE_EXPORT_PATH:str = ""               # 追踪导出文件（OTLP/JSON，每行一条），为空表示不导出
+    TRACE_EXPORT_SAMPLE_RATE:float = 1.0     # 导出追踪的请求比例
+
+    # 提示词配置
+    PROMPT_VERSIONS:str = ""                 # 固定提示词版本，格式为 name=version，逗号分隔；未指定时使用最新版本
+    PROMPT_TOKEN_BUDGETS:str = "passage2question=6000"  # 各提示词的token预算，超出时压缩文章（整篇翻译类提示词不裁剪）
+
+    # 文章解析配置
+    EXPLANATION_USE_CONTEXTS:bool = True     # 单词解析只发送目标词所在的句子，全文翻译单独调用；关闭时沿用整篇文章的单次调用
+    EXPLANATION_CONTEXT_SENTENCES:int = 3    # 每个目标词最多发送的句子数
+    TRANSLATION_CACHE_ENABLED:bool = True    # 全文翻译结果按文章内容缓存在共享状态后端
+    TRANSLATION_CACHE_TTL:float = 7 * 24 * 3600
+    TRANSLATION_TIMEOUT_SECONDS:float = 180  # 等待其他请求翻译同一篇文章的最长时间
+    EXPLANATION_SHARD_WORDS:int = 10         # 单词解析每个分片的单词数，分片并行生成，0表示不分片
+    TRANSLATION_SHARD_CHARS:int = 2500       # 全文翻译按段落分片，每个分片的字符数上限，0表示不分片
+    QUESTION_SHARD_SIZE:int = 5              # 出题每个分片的题目数，题目更多时按文章段落分片并行生成
+    QUESTION_SHARD_RETRIES:int = 1           # 解析失败或题目不足的分片重新生成的次数，仍不足时请求失败
+
+    # 长文章生成配置
+    LONGFORM_ENABLED:bool = True             # 长篇与较长的自定义长度文章先生成大纲，再并行生成各部分
+    LONGFORM_MIN_WORDS:int = 600             # 达到该字数时采用分部分生成
+    LONGFORM_SECTION_WORDS:int = 250         # 每个部分的目标字数，决定部分数
+    LONGFORM_MAX_SECTIONS:int = 6            # 部分数上限
+
+    # 按需剖析配置
+    PROFILE_ADMIN_TOKEN:str = ""             # 管理令牌，请求头X-Profile携带该值时剖析该请求；为空表示关闭
+    PROFILE_SAMPLE_RATE:float = 0.0          # 随机剖析的请求比例
+    PROFILE_INTERVAL_MS:float = 5            # 采样间隔
+    PROFILE_MAX_CONCURRENT:int = 1           # 同时剖析的请求数上限
+    PROFILE_DIR:str = "profiles"             # 剖析结果目录（折叠栈与speedscope文件）
+    PROFILE_AGGREGATE_WINDOW:int = 50        # 最热函数统计覆盖的最近剖析次数
 
-    GEMINI_API_KEY:str
-    GEMINI_MODEL:str
     class Config:
         env_file = ".env"
         extra = 'allow'
 
+    @property
+    def enabled_providers(self) -> List[str]:
+        providers = [self.LLM_PROVIDER]
+        for name in self.LLM_ENABLED_PROVIDERS.split(","):
+            name = name.strip().upper()
+            if name and name not in providers:
+                providers.append(name)
+        return providers
+
+    @model_validator(mode="after")
+    def validate_enabled_providers(self):
+        # 只校验启用的提供商，未使用的提供商无需配置密钥
+        missing = []
+        for provider in self.enabled_providers:
+            for field in PROVIDER_REQUIRED_FIELDS.get(provider, []):
+                if not getattr(self, field):
+                    missing.append(field)
+        if missing:
+            raise ValueError(f"已启用的LLM提供商缺少配置: {', '.join(missing)}")
+        return self
+
 
 settings = Settings()
\ No newline at end of file
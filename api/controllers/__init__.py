@@ -1 +1,6 @@
 from .learning import router as learning_router
+from .health import router as health_router
+from .metrics import router as metrics_router
+from .profiling import router as profiling_router
+from .records import router as records_router
+from .reviews import router as reviews_router
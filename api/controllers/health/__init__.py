@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from core.lifecycle.warmup import warmup_state
+from core.lifecycle.inflight import inflight_tracker
+
+router = APIRouter()
+
+# 存活检查：进程能响应即返回200
+@router.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+# 就绪检查：预热完成前与退出排空期间返回503，负载均衡不会把流量导向冷启动或即将退出的进程
+@router.get("/readyz")
+def readyz():
+    snapshot = {**warmup_state.snapshot(), **inflight_tracker.snapshot()}
+    if inflight_tracker.draining:
+        return JSONResponse(status_code=503, content={"status": "draining", **snapshot})
+    if warmup_state.ready:
+        return {"status": "ready", **snapshot}
+    return JSONResponse(status_code=503, content={"status": "warming_up" if not snapshot["finished"] else "failed", **snapshot})
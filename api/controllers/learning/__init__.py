@@ -1,21 +1,69 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from services.learning.learning_service import WordServices
 from services.learning.learning_type import (
     Word2PassageRequest, Word2PassageResponse,
     Passage2ExplanationRequest, Passage2ExplanationResponse,
     Passage2QuestionRequest, QuestionItem, ImageResponse,
+    Passage2TranslationRequest, Passage2TranslationResponse,
     ArticleType, DifficultyLevel, ToneStyle, ArticleLength,
     QuestionDifficulty, TopicArea
 )
-from typing import List, Optional
-from core.image2word.image2word import ImageOCR
+from typing import List, Optional, Union
+from core.image2word.ocr_pool import get_ocr_pool, OCRQueueFullError, OCRTimeoutError
+from core.image2word.preprocess import ImageDecodeError
+from core.llm.limiter import LLMQueueTimeoutError
+from core.image2word.upload_store import get_upload_store
+from core.image2word.word_extractor import get_word_extractor
+from core.http.results import load_result
+from core.shared_state import RateLimiter, get_shared_state
+from core.tracing import span
+from starlette.concurrency import run_in_threadpool
+from config.configs import settings
 from pydantic import BaseModel, ValidationError
 import os
 from core.logger import api_logger
+from functools import lru_cache
+import ipaddress
 import json
 import re
+import asyncio
 
-router = APIRouter()
+# 解析TRUSTED_PROXIES配置（IP或CIDR网段）
+@lru_cache(maxsize=4)
+def trusted_networks(value: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+def is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_networks(settings.TRUSTED_PROXIES))
+
+# 客户端地址：默认为TCP连接的对端地址；连接来自可信代理时，按X-Forwarded-For从右向左取第一个不可信的地址
+# （最左侧的值由客户端任意填写，不能用于限流）
+def client_identity(request: Request) -> str:
+    host = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("X-Forwarded-For")
+    if not forwarded or not is_trusted_proxy(host):
+        return host
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else host
+
+# 按客户端限流，计数保存在共享状态后端，多个worker共享同一额度
+async def rate_limit(request: Request):
+    if settings.RATE_LIMIT_PER_MINUTE <= 0:
+        return
+    rate_limiter = RateLimiter(get_shared_state(), settings.RATE_LIMIT_PER_MINUTE)
+    identity = client_identity(request)
+    if not await run_in_threadpool(rate_limiter.hit, identity):
+        raise HTTPException(status_code=429, detail="请求过于频繁，请稍后再试")
+
+router = APIRouter(dependencies=[Depends(rate_limit)])
 word_service = WordServices()
 
 # 验证上传的文件类型
@@ -32,6 +80,32 @@ def validate_image(file: UploadFile = File(...)):
     
     return file
 
+# 分块读取上传文件，超过大小上限时立即中止
+async def read_upload(file: UploadFile, max_bytes: int = None) -> bytes:
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    chunks = []
+    size = 0
+    while True:
+        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"图片过大，请限制在{max_bytes // (1024 * 1024)}MB以内")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+# 检查生成的问题是否包含QuestionItem要求的各个键，返回第一个问题的错误信息
+def question_format_error(questions: List[dict]) -> Optional[str]:
+    for item in questions:
+        if not all(key in item for key in ["question", "answer", "option", "explanation"]):
+            return "生成的问题格式不正确，请重试"
+        if not all(key in item["option"] for key in ["A", "B", "C", "D"]):
+            return "生成的选项格式不正确，请重试"
+        if not all(key in item["explanation"] for key in ["chinese_exp", "english_exp"]):
+            return "生成的解释格式不正确，请重试"
+    return None
+
 # 根据单词生成文章
 @router.post("/word2passage", response_model=Word2PassageResponse)
 def word2passage(request: Word2PassageRequest):
@@ -62,7 +136,8 @@ def word2passage(request: Word2PassageRequest):
             request.sentence_complexity
         )
         
-        response = Word2PassageResponse(**result)
+        with span("validate.response"):
+            response = Word2PassageResponse(**result)
         # 记录响应
         api_logger.log_response("/word2passage", response.dict())
         return response
@@ -70,6 +145,10 @@ def word2passage(request: Word2PassageRequest):
         # 处理验证错误
         api_logger.log_error("/word2passage", f"参数验证错误: {str(e)}")
         raise HTTPException(status_code=400, detail=f"参数验证错误: {str(e)}")
+    except LLMQueueTimeoutError as e:
+        # LLM调用排队超时，服务繁忙
+        api_logger.log_error("/word2passage", str(e), 503)
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPException:
         # 直接抛出已有的HTTP异常
         raise
@@ -100,7 +179,8 @@ def passage2question(request: Passage2QuestionRequest):
         questions = word_service.generate_questions(
             request.words,
             request.passage,
-            request.difficulty.value
+            request.difficulty.value,
+            request.question_count
         )
         
         if not questions:
@@ -115,19 +195,10 @@ def passage2question(request: Passage2QuestionRequest):
             return response
         elif isinstance(questions, list):
             # 验证每个问题项是否符合QuestionItem模型
-            for item in questions:
-                if not all(key in item for key in ["question", "answer", "option", "explanation"]):
-                    error_msg = "生成的问题格式不正确，请重试"
-                    api_logger.log_error("/passage2question", error_msg, 500)
-                    raise HTTPException(status_code=500, detail=error_msg)
-                if not all(key in item["option"] for key in ["A", "B", "C", "D"]):
-                    error_msg = "生成的选项格式不正确，请重试"
-                    api_logger.log_error("/passage2question", error_msg, 500)
-                    raise HTTPException(status_code=500, detail=error_msg)
-                if not all(key in item["explanation"] for key in ["chinese_exp", "english_exp"]):
-                    error_msg = "生成的解释格式不正确，请重试"
-                    api_logger.log_error("/passage2question", error_msg, 500)
-                    raise HTTPException(status_code=500, detail=error_msg)
+            error_msg = question_format_error(questions)
+            if error_msg:
+                api_logger.log_error("/passage2question", error_msg, 500)
+                raise HTTPException(status_code=500, detail=error_msg)
             api_logger.log_response("/passage2question", {"count": len(questions)})
             return questions
         else:
@@ -135,6 +206,10 @@ def passage2question(request: Passage2QuestionRequest):
             error_msg = "生成问题返回不支持的格式，请重试"
             api_logger.log_error("/passage2question", error_msg, 500)
             raise HTTPException(status_code=500, detail=error_msg)
+    except LLMQueueTimeoutError as e:
+        # LLM调用排队超时，服务繁忙
+        api_logger.log_error("/passage2question", str(e), 503)
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPException as e:
         api_logger.log_error("/passage2question", e.detail, e.status_code)
         raise e
@@ -162,10 +237,15 @@ def passage2explanation(request: Passage2ExplanationRequest):
             request.passage
         )
         
-        response = Passage2ExplanationResponse(**result)
+        with span("validate.response"):
+            response = Passage2ExplanationResponse(**result)
         # 记录响应
         api_logger.log_response("/passage2explanation", {"points_count": len(response.language_points)})
         return response
+    except LLMQueueTimeoutError as e:
+        # LLM调用排队超时，服务繁忙
+        api_logger.log_error("/passage2explanation", str(e), 503)
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPException as e:
         api_logger.log_error("/passage2explanation", e.detail, e.status_code)
         raise e
@@ -174,6 +254,31 @@ def passage2explanation(request: Passage2ExplanationRequest):
         api_logger.log_error("/passage2explanation", error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+# 翻译整篇文章（结果按文章内容缓存，/passage2explanation中的翻译与此复用同一缓存）
+@router.post("/passage2translation", response_model=Passage2TranslationResponse)
+def passage2translation(request: Passage2TranslationRequest):
+    try:
+        # 记录请求
+        api_logger.log_request("/passage2translation", request.dict())
+        
+        translation = word_service.translate_passage(request.passage)
+        
+        response = Passage2TranslationResponse(translation=translation)
+        # 记录响应
+        api_logger.log_response("/passage2translation", {"translation_length": len(translation)})
+        return response
+    except LLMQueueTimeoutError as e:
+        # LLM调用排队超时，服务繁忙
+        api_logger.log_error("/passage2translation", str(e), 503)
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException as e:
+        api_logger.log_error("/passage2translation", e.detail, e.status_code)
+        raise e
+    except Exception as e:
+        error_msg = f"翻译文章失败: {str(e)}"
+        api_logger.log_error("/passage2translation", error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
 # 上传图片并返回单词
 @router.post("/upload_image", response_model=ImageResponse)
 async def upload_image(
@@ -183,38 +288,115 @@ async def upload_image(
         # 记录请求
         api_logger.log_request("/upload_image", {"filename": image.filename})
         
-        # 检查文件路径"uploads"是否存在
-        if not os.path.exists("uploads"):
-            os.makedirs("uploads")
-        
-        # 净化文件名
-        safe_filename = re.sub(r'[^\w\.\-]', '_', image.filename)
+        # 读取图片到内存，直接交给OCR工作进程解码，不经过磁盘
+        data = await read_upload(image)
         
-        # 保存图片
-        image_path = f"uploads/{safe_filename}"
-        with open(image_path, "wb") as f:
-            f.write(image.file.read())
+        # 可选：按内容哈希持久化保存
+        image_path = None
+        upload_store = get_upload_store()
+        if upload_store is not None:
+            ext = os.path.splitext(image.filename or "")[1]
+            image_path = await run_in_threadpool(upload_store.save, data, ext)
         
-        # 识别图片中的文字
-        ocr = ImageOCR()
-        texts = ocr.get_text_only(image_path)
+        # 识别图片中的文字（在OCR工作进程池中执行，事件循环只等待结果）
+        with span("ocr.recognize"):
+            texts = await get_ocr_pool().recognize_async(data)
         
-        # 过滤文字结果
-        safe_texts = []
-        for text in texts:
-            # 只保留字母、数字和基本标点
-            safe_text = ''.join(c for c in text if c.isalnum() or c in [' ', '-', '.', ','])
-            if safe_text:
-                safe_texts.append(safe_text)
+        # 从识别结果中提取英文单词，去掉释义、音标、页码等内容
+        with span("ocr.extract_words"):
+            words = get_word_extractor().extract(texts)
         
-        response = ImageResponse(image_path=image_path, words=safe_texts)
+        response = ImageResponse(image_path=image_path, words=words)
         # 记录响应
-        api_logger.log_response("/upload_image", {"words_count": len(safe_texts), "image_path": image_path})
+        api_logger.log_response("/upload_image", {"words_count": len(words), "image_path": image_path})
         return response
+    except OCRQueueFullError as e:
+        api_logger.log_error("/upload_image", str(e), 503)
+        raise HTTPException(status_code=503, detail=str(e))
+    except OCRTimeoutError as e:
+        api_logger.log_error("/upload_image", str(e), 504)
+        raise HTTPException(status_code=504, detail=str(e))
+    except ImageDecodeError as e:
+        # 图片内容无法解码
+        api_logger.log_error("/upload_image", str(e), 400)
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         # 直接抛出已有的HTTP异常
         raise
     except Exception as e:
         error_msg = f"上传图片失败: {str(e)}"
         api_logger.log_error("/upload_image", error_msg)
-        raise HTTPException(status_code=500, detail=error_msg)
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=error_msg)
+
+# OCR进程池与结果缓存的运行状态（含缓存命中率）
+@router.get("/ocr_stats")
+def ocr_stats():
+    return get_ocr_pool().stats()
+
+# 获取之前保存的生成结果（地址由生成接口的Content-Location响应头给出），配合If-None-Match可得到304
+@router.get("/results/{key}")
+def generation_result(key: str):
+    if not re.fullmatch(r"[0-9a-f]{32}", key):
+        raise HTTPException(status_code=400, detail="无效的结果标识")
+    body = load_result(key)
+    if body is None:
+        raise HTTPException(status_code=404, detail="生成结果不存在或已过期")
+    return Response(content=body, media_type="application/json")
+
+# 批量上传多页图片，按完成顺序流式返回每页结果，最后返回跨页去重后的单词
+@router.post("/upload_images")
+async def upload_images(
+    images: List[UploadFile] = File(...)
+):
+    api_logger.log_request("/upload_images", {"filenames": [image.filename for image in images]})
+    
+    if not images:
+        raise HTTPException(status_code=400, detail="请至少上传一张图片")
+    if len(images) > settings.UPLOAD_MAX_FILES:
+        error_msg = f"一次最多上传{settings.UPLOAD_MAX_FILES}张图片"
+        api_logger.log_error("/upload_images", error_msg, 400)
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    # 在开始流式响应前读完全部上传内容
+    pages = [await read_upload(image) for image in images]
+    upload_store = get_upload_store()
+    ocr_pool = get_ocr_pool()
+    word_extractor = get_word_extractor()
+    
+    async def recognize_page(index: int, data: bytes) -> dict:
+        page = {"type": "page", "index": index, "filename": images[index].filename}
+        try:
+            if upload_store is not None:
+                ext = os.path.splitext(images[index].filename or "")[1]
+                page["image_path"] = await run_in_threadpool(upload_store.save, data, ext)
+            page["words"] = word_extractor.extract(await ocr_pool.recognize_async(data))
+        except (OCRQueueFullError, OCRTimeoutError, ImageDecodeError) as e:
+            page["error"] = str(e)
+        except Exception as e:
+            page["error"] = f"识别失败: {str(e)}"
+        return page
+    
+    async def stream():
+        # 各页同时提交到OCR进程池，由多个工作进程并行识别
+        tasks = [asyncio.ensure_future(recognize_page(i, data)) for i, data in enumerate(pages)]
+        merged: List[str] = []
+        seen = set()
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page = await next_done
+                if "error" in page:
+                    failed += 1
+                    api_logger.log_error("/upload_images", f"第{page['index'] + 1}页: {page['error']}")
+                for word in page.get("words", []):
+                    if word not in seen:
+                        seen.add(word)
+                        merged.append(word)
+                yield json.dumps(page, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        api_logger.log_response("/upload_images", {"pages": len(pages), "failed": failed, "words_count": len(merged)})
+        yield json.dumps({"type": "summary", "pages": len(pages), "failed": failed, "words": merged}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
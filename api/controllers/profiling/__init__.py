@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from core.profiling import hot_functions
+from core.profiling.middleware import is_admin_token
+
+router = APIRouter()
+
+# 最近剖析结果中最热的函数，需要管理令牌
+@router.get("/profiles/top")
+def top_functions(n: int = Query(20, ge=1, le=200), x_profile_token: str = Header("")):
+    if not is_admin_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="无权访问")
+    return hot_functions.top(n)
@@ -0,0 +1,222 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from services.records.record_type import LearningRecord, RecordSummary, RecordPage, RecordImportResponse, UserIdResponse
+from controllers.learning import rate_limit
+from core.records.record_store import get_record_store, decode_cursor
+from starlette.concurrency import run_in_threadpool
+from config.configs import settings
+from core.logger import api_logger
+from pydantic import ValidationError
+from typing import List, Optional
+import hashlib
+import json
+import re
+import secrets
+import zlib
+
+# 至少32个字符的随机串（如UUID或POST /records/users签发的标识），不接受"1"这类可猜测的标识
+_USER_ID = re.compile(r"^[A-Za-z0-9_-]{32,128}$")
+
+# 用户标识由请求头X-User-Id提供，记录按用户隔离
+# X-User-Id相当于访问凭据（bearer secret）：持有者即可读写该用户的全部记录，应由服务端签发并像密码一样保存
+# 数据库与日志中只使用其哈希，不保存标识本身
+def current_user(x_user_id: Optional[str] = Header(None, alias="X-User-Id")) -> str:
+    if not x_user_id or not _USER_ID.match(x_user_id):
+        raise HTTPException(status_code=400, detail="缺少或无效的用户标识（X-User-Id），请使用POST /records/users签发的标识")
+    return hashlib.sha256(x_user_id.encode()).hexdigest()
+
+router = APIRouter(dependencies=[Depends(rate_limit)])
+
+# 签发新的用户标识，前端保存后在之后的请求中以X-User-Id发送
+@router.post("/users", response_model=UserIdResponse)
+def create_user():
+    return UserIdResponse(user_id=secrets.token_urlsafe(32))
+
+# 保存一条学习记录（已有相同文章与单词的记录时合并到该记录）
+@router.post("", response_model=RecordSummary)
+def save_record(record: LearningRecord, user_id: str = Depends(current_user)):
+    try:
+        api_logger.log_request("/records", {"user_id": user_id, "id": record.id, "words_count": len(record.words)})
+        summary = get_record_store().save(user_id, record.dict(exclude_none=True))
+        api_logger.log_response("/records", {"id": summary["id"]})
+        return summary
+    except Exception as e:
+        error_msg = f"保存学习记录失败: {str(e)}"
+        api_logger.log_error("/records", error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+# 按时间倒序分页返回学习记录摘要，翻页时传入上一页返回的next_cursor
+@router.get("", response_model=RecordPage)
+def list_records(
+    limit: int = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, max_length=200),
+    user_id: str = Depends(current_user)
+):
+    limit = min(limit or settings.RECORD_PAGE_SIZE, settings.RECORD_MAX_PAGE_SIZE)
+    try:
+        items, next_cursor = get_record_store().page(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RecordPage(items=items, next_cursor=next_cursor)
+
+# 查找包含某个单词的学习记录
+@router.get("/words/{word}", response_model=List[RecordSummary])
+def records_by_word(
+    word: str,
+    limit: int = Query(None, ge=1),
+    user_id: str = Depends(current_user)
+):
+    if not word.strip() or len(word) > 50:
+        raise HTTPException(status_code=400, detail="单词不能为空且不超过50个字符")
+    limit = min(limit or settings.RECORD_PAGE_SIZE, settings.RECORD_MAX_PAGE_SIZE)
+    return get_record_store().find_by_word(user_id, word, limit)
+
+# 导出全部学习记录为NDJSON（每行一条完整记录，按时间从早到晚），逐批读取数据库并流式返回
+# 断点续传：after_id传入已收到的最后一条记录的ID；指定limit时，最后一行为{"next_cursor": ...}，下次以cursor传入
+@router.get("/export")
+def export_records(
+    cursor: Optional[str] = Query(None, max_length=200),
+    after_id: Optional[str] = Query(None, max_length=100),
+    limit: Optional[int] = Query(None, ge=1),
+    gzip: bool = False,
+    user_id: str = Depends(current_user)
+):
+    store = get_record_store()
+    try:
+        if cursor:
+            decode_cursor(cursor)
+        elif after_id:
+            cursor = store.cursor_after(user_id, after_id)
+            if cursor is None:
+                raise HTTPException(status_code=404, detail="after_id对应的学习记录不存在")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    api_logger.log_request("/records/export", {"user_id": user_id, "cursor": cursor, "limit": limit})
+
+    def lines():
+        count = 0
+        for record, position in store.export(user_id, cursor, settings.RECORD_EXPORT_BATCH):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+            count += 1
+            if limit and count >= limit:
+                yield json.dumps({"next_cursor": position}) + "\n"
+                return
+
+    def compressed():
+        # gzip格式，每批记录后同步刷新，中断时已收到的部分仍可解压
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for count, line in enumerate(lines(), 1):
+            data = compressor.compress(line.encode("utf-8"))
+            if count % settings.RECORD_EXPORT_BATCH == 0:
+                data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    filename = f"records.ndjson{'.gz' if gzip else ''}"
+    return StreamingResponse(
+        compressed() if gzip else lines(),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# 解析一批NDJSON行并在一个事务中导入，结果累加到result
+def import_lines(user_id: str, lines: List[tuple], result: dict):
+    records = []
+    for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            if isinstance(data, dict) and set(data) == {"next_cursor"}:
+                # 分段导出文件末尾的游标行
+                continue
+            records.append(LearningRecord(**data).dict(exclude_none=True))
+        except (ValueError, TypeError, ValidationError) as e:
+            result["failed"] += 1
+            if len(result["errors"]) < 20:
+                result["errors"].append({"line": number, "error": str(e)[:200]})
+    inserted = get_record_store().import_batch(user_id, records) if records else 0
+    result["imported"] += inserted
+    result["skipped"] += len(records) - inserted
+
+# 导入NDJSON格式的学习记录（可为gzip压缩），流式读取请求体，按批在事务中插入
+# 导入是幂等的：ID已存在或内容相同的记录会被跳过，中断后可重新上传整个文件
+@router.post("/import", response_model=RecordImportResponse)
+async def import_records(request: Request, user_id: str = Depends(current_user)):
+    api_logger.log_request("/records/import", {"user_id": user_id})
+    result = {"imported": 0, "skipped": 0, "failed": 0, "errors": []}
+    max_line = settings.RECORD_IMPORT_MAX_LINE_BYTES
+    batch: List[tuple] = []
+    buffer = b""
+    number = 0
+
+    async def feed(data: bytes):
+        nonlocal buffer, number
+        parts = data.split(b"\n")
+        if len(parts) > 1:
+            parts[0] = buffer + parts[0]
+            buffer = b""
+            for line in parts[:-1]:
+                number += 1
+                batch.append((number, line))
+                if len(batch) >= settings.RECORD_IMPORT_BATCH:
+                    # 解析与写入在线程池中进行，不阻塞事件循环
+                    await run_in_threadpool(import_lines, user_id, batch[:], result)
+                    batch.clear()
+        buffer += parts[-1]
+        if len(buffer) > max_line:
+            raise HTTPException(status_code=413, detail=f"第{number + 1}行记录过大")
+
+    decompressor = None
+    try:
+        async for chunk in request.stream():
+            if decompressor is None:
+                # 按gzip魔数或Content-Encoding判断是否压缩
+                gzipped = chunk[:2] == b"\x1f\x8b" or request.headers.get("Content-Encoding") == "gzip"
+                decompressor = zlib.decompressobj(47) if gzipped else False
+            if not decompressor:
+                await feed(chunk)
+                continue
+            data = chunk
+            while data:
+                if decompressor.eof:
+                    # 多个gzip成员首尾相接（如分段压缩后拼接的文件），每个成员使用新的解压器
+                    decompressor = zlib.decompressobj(47)
+                # 限制每次解压的输出大小，压缩比异常高的数据也不会一次占用大量内存
+                await feed(decompressor.decompress(data, max_line))
+                while decompressor.unconsumed_tail:
+                    await feed(decompressor.decompress(decompressor.unconsumed_tail, max_line))
+                data = decompressor.unused_data
+        if decompressor and not decompressor.eof:
+            raise zlib.error("压缩数据不完整")
+        number += 1
+        batch.append((number, buffer))
+        await run_in_threadpool(import_lines, user_id, batch, result)
+    except HTTPException as e:
+        api_logger.log_error("/records/import", e.detail, e.status_code)
+        raise
+    except zlib.error as e:
+        api_logger.log_error("/records/import", str(e), 400)
+        raise HTTPException(status_code=400, detail=f"解压导入文件失败: {str(e)}")
+    except Exception as e:
+        error_msg = f"导入学习记录失败: {str(e)}"
+        api_logger.log_error("/records/import", error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+    api_logger.log_response("/records/import", {k: v for k, v in result.items() if k != "errors"})
+    return result
+
+# 获取完整的学习记录（含文章、翻译与题目）
+@router.get("/{record_id}", response_model=LearningRecord)
+def get_record(record_id: str, user_id: str = Depends(current_user)):
+    record = get_record_store().get(user_id, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="学习记录不存在")
+    return record
+
+# 删除学习记录
+@router.delete("/{record_id}")
+def delete_record(record_id: str, user_id: str = Depends(current_user)):
+    if not get_record_store().delete(user_id, record_id):
+        raise HTTPException(status_code=404, detail="学习记录不存在")
+    return {"deleted": record_id}
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from services.records.record_type import (
+    QuizAnswer, QuizAnswersRequest, QuizAnswersResponse,
+    ExposuresRequest, DueWordsResponse
+)
+from controllers.learning import rate_limit
+from controllers.records import current_user
+from core.nlp.passage import analyze_passage
+from core.records.review_store import get_review_store
+from core.logger import api_logger
+from typing import Dict, List
+
+router = APIRouter(dependencies=[Depends(rate_limit)])
+
+# 题目考查的单词：请求中指定的单词，否则为题干与正确选项中出现的目标词
+# 只按目标词本身及其屈折形式匹配，不把题干中的其他词（new）还原后算作目标词（news）
+def answer_words(answer: QuizAnswer, words: List[str]) -> List[str]:
+    if answer.words:
+        return answer.words
+    question = answer.question
+    text = f"{question.question}\n{getattr(question.option, question.answer, '')}"
+    return [word for word, sentences in analyze_passage(text, words, base_forms=False).located.items() if sentences]
+
+# 到期需要复习的单词，按到期时间从早到晚排列
+@router.get("/due", response_model=DueWordsResponse)
+def due_words(
+    limit: int = Query(20, ge=1, le=50),
+    user_id: str = Depends(current_user)
+):
+    store = get_review_store()
+    items = store.due(user_id, limit)
+    next_due_at = items[0]["due_at"] if items else store.next_due_at(user_id)
+    return DueWordsResponse(words=[item["word"] for item in items], items=items, next_due_at=next_due_at)
+
+# 记录测验结果：答对的单词推迟复习，答错的单词重新从一天后开始
+@router.post("/answers", response_model=QuizAnswersResponse)
+def record_answers(request: QuizAnswersRequest, user_id: str = Depends(current_user)):
+    try:
+        api_logger.log_request("/reviews/answers", {"user_id": user_id, "answers_count": len(request.answers)})
+        results: Dict[str, bool] = {}
+        unmatched = 0
+        for answer in request.answers:
+            words = answer_words(answer, request.words)
+            if not words:
+                unmatched += 1
+            correct = answer.selected == answer.question.answer.strip().upper()
+            for word in words:
+                results[word] = results.get(word, True) and correct
+        items = get_review_store().record_answers(user_id, results) if results else []
+        api_logger.log_response("/reviews/answers", {"updated": len(items), "unmatched": unmatched})
+        return QuizAnswersResponse(items=items, unmatched=unmatched)
+    except Exception as e:
+        error_msg = f"记录测验结果失败: {str(e)}"
+        api_logger.log_error("/reviews/answers", error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+# 记录单词出现在一篇文章中（不保存学习记录的客户端使用；保存学习记录时会自动记录）
+@router.post("/exposures")
+def record_exposures(request: ExposuresRequest, user_id: str = Depends(current_user)):
+    get_review_store().record_exposures(user_id, request.words)
+    return {"words": len(request.words)}
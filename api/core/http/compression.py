@@ -0,0 +1,165 @@
+import zlib
+from typing import List, Optional, Tuple
+
+from config.configs import settings
+
+try:
+    import brotli
+except ImportError:  # brotli为可选依赖，未安装时只使用gzip
+    brotli = None
+
+# 已压缩或压缩收益很小的内容类型
+_INCOMPRESSIBLE_PREFIXES = (b"image/", b"audio/", b"video/", b"application/gzip", b"application/zip",
+                            b"application/octet-stream", b"font/woff")
+
+
+def parse_accept_encoding(value: str) -> dict:
+    """解析Accept-Encoding为 编码 -> q值"""
+    encodings = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, number = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        encodings[name.strip().lower()] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """按客户端的偏好选择br或gzip；同等偏好时优先br（已安装brotli时）"""
+    encodings = parse_accept_encoding(accept_encoding)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = encodings.get(name, encodings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class _Encoder:
+    """流式压缩器：gzip使用zlib，br使用brotli"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """输出目前为止的全部压缩数据（流式响应的每一段都能被客户端及时解压）"""
+        if self.encoding == "br":
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def find_header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """
+    按Accept-Encoding压缩响应（brotli已安装时优先br，否则gzip）
+
+    完整响应小于COMPRESSION_MIN_BYTES时不压缩；流式响应（导出、批量识别进度等）逐段压缩并立即刷新，
+    不影响客户端按行读取。已带Content-Encoding的响应、图片等已压缩的内容类型保持原样。
+    压缩后的表示与原始内容不再逐字节相同，强ETag改为弱ETag。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept = find_header(scope.get("headers", []), b"accept-encoding")
+        encoding = choose_encoding(accept.decode("latin-1")) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = find_header(headers, b"content-type") or b""
+                if (message["status"] in (204, 304) or find_header(headers, b"content-encoding") is not None
+                        or content_type.lower().startswith(_INCOMPRESSIBLE_PREFIXES)):
+                    passthrough = True
+                    if message["status"] == 304 and find_header(headers, b"etag") is not None:
+                        # 304与压缩后的200响应使用相同的弱ETag
+                        message = {**message, "headers": [
+                            (key, value if key.lower() != b"etag" or value.startswith(b"W/") else b"W/" + value)
+                            for key, value in headers] + [(b"vary", b"Accept-Encoding")]}
+                    await send(message)
+                else:
+                    # 等到第一段响应体再决定是否压缩
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = [(key, value) for key, value in start_message["headers"]
+                           if key.lower() not in (b"content-length", b"etag")]
+                etag = find_header(start_message["headers"], b"etag")
+                if not more_body and len(body) < settings.COMPRESSION_MIN_BYTES:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                headers.append((b"content-encoding", encoding.encode()))
+                vary = find_header(headers, b"vary")
+                if vary is None:
+                    headers.append((b"vary", b"Accept-Encoding"))
+                elif b"accept-encoding" not in vary.lower():
+                    headers = [(key, value + b", Accept-Encoding" if key.lower() == b"vary" else value)
+                               for key, value in headers]
+                if etag is not None:
+                    headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start_message, "headers": headers})
+                    start_message = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start_message, "headers": headers})
+                start_message = None
+
+            data = encoder.compress(body)
+            data += encoder.flush() if more_body else encoder.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
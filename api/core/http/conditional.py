@@ -0,0 +1,83 @@
+import hashlib
+from typing import List
+
+from config.configs import settings
+from core.http.compression import find_header
+
+
+def make_etag(body: bytes) -> bytes:
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """If-None-Match按弱比较匹配（忽略W/前缀），*匹配任意ETag"""
+    if if_none_match.strip() == b"*":
+        return True
+    target = etag[2:] if etag.startswith(b"W/") else etag
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate.startswith(b"W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """
+    为GET的完整响应生成内容哈希ETag，If-None-Match匹配时返回304
+
+    学习记录、复习列表等接口内容不变时，客户端重复查看只需一次往返而不必重新下载正文。
+    流式响应（没有Content-Length）、非200响应、超过ETAG_MAX_BYTES的响应与已带ETag的响应保持原样。
+    未设置Cache-Control时补充"private, no-cache"：按用户区分的内容只缓存在客户端，每次使用前重新验证。
+    POST生成接口的结果由GenerationResultMiddleware保存，通过GET /v1/api/learning/results/{key}获得ETag与304。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not settings.ETAG_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        if_none_match = find_header(scope.get("headers", []), b"if-none-match")
+
+        start_message = None
+        chunks: List[bytes] = []
+
+        async def send_with_etag(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                length = find_header(headers, b"content-length")
+                if (message["status"] == 200 and find_header(headers, b"etag") is None
+                        and length is not None and int(length) <= settings.ETAG_MAX_BYTES):
+                    start_message = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            chunks.clear()
+            etag = make_etag(body)
+            headers = list(start_message["headers"]) + [(b"etag", etag)]
+            if find_header(headers, b"cache-control") is None:
+                headers.append((b"cache-control", b"private, no-cache"))
+            status = start_message["status"]
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                # 304只保留验证相关的响应头，不返回正文
+                status = 304
+                body = b""
+                headers = [(key, value) for key, value in headers
+                           if key.lower() not in (b"content-length", b"content-type")]
+            await send({**start_message, "status": status, "headers": headers})
+            start_message = None
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,85 @@
+import hashlib
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from config.configs import settings
+from core.http.compression import find_header
+from core.http.conditional import make_etag
+from core.logger import api_logger
+from core.shared_state import get_shared_state
+
+# 结果可通过GET重新获取的生成接口
+GENERATION_PATHS = frozenset({
+    "/v1/api/learning/word2passage",
+    "/v1/api/learning/passage2explanation",
+    "/v1/api/learning/passage2question",
+})
+RESULTS_PATH = "/v1/api/learning/results/"
+
+
+def result_key(body: bytes) -> str:
+    """按返回内容的哈希命名结果：地址只对应这一份内容，其他请求的生成结果不会覆盖它"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def load_result(key: str) -> Optional[bytes]:
+    return get_shared_state().get(f"generation:{key}")
+
+
+class GenerationResultMiddleware:
+    """
+    保存生成接口（POST）的结果，并给出可用GET重新获取的地址
+
+    生成接口是POST，ConditionalGetMiddleware不为其生成ETag。成功的JSON结果按内容哈希
+    保存在共享状态后端（GENERATION_RESULTS_TTL），响应头Content-Location指向GET /v1/api/learning/results/{key}，
+    ETag与该地址的GET响应一致。地址始终对应本次返回的内容：相同的请求再次生成得到新的地址，
+    不会改变之前给出的结果；客户端再次查看时改用该地址，只需一次304往返。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in GENERATION_PATHS
+                or not settings.GENERATION_RESULTS_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks: List[bytes] = []
+
+        async def send_with_location(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                length = find_header(headers, b"content-length")
+                content_type = find_header(headers, b"content-type") or b""
+                if (message["status"] == 200 and content_type.startswith(b"application/json")
+                        and length is not None and int(length) <= settings.ETAG_MAX_BYTES):
+                    start_message = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            chunks.clear()
+            headers = list(start_message["headers"])
+            key = result_key(body)
+            try:
+                await run_in_threadpool(get_shared_state().set, f"generation:{key}", body, settings.GENERATION_RESULTS_TTL)
+                headers += [(b"content-location", (RESULTS_PATH + key).encode()), (b"etag", make_etag(body))]
+            except Exception as e:
+                # 保存失败不影响本次生成结果的返回
+                api_logger.error(f"Failed to store generation result {key}: {str(e)}")
+            await send({**start_message, "headers": headers})
+            start_message = None
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_location)
@@ -1,15 +1,17 @@
-from paddleocr import PaddleOCR
 import os
 import numpy as np
 from typing import Union, List, Tuple, Optional
 from PIL import Image
 from typing import List
+from core.image2word.preprocess import ImageDecodeError, ImagePreprocessor
 class ImageOCR:
     """
     基于PaddleOCR的图像文字识别类
     """
     
-    def __init__(self, use_gpu: bool = False, lang: str = "ch", use_angle_cls: bool = True):
+    def __init__(self, use_gpu: bool = False, lang: str = "ch", use_angle_cls: bool = True,
+                 cpu_threads: Optional[int] = None, preprocessor: Optional[ImagePreprocessor] = None,
+                 rec_batch_num: Optional[int] = None):
         """
         初始化OCR识别器
         
@@ -17,29 +19,67 @@ class ImageOCR:
             use_gpu: 是否使用GPU进行推理，默认False
             lang: 识别语言，默认中文
             use_angle_cls: 是否使用方向分类器，默认True
+            cpu_threads: CPU推理线程数，默认使用PaddleOCR的默认值
+            preprocessor: 图片字节的预处理流水线，为None时直接解码原图
+            rec_batch_num: 识别模型单次前向处理的文本行数，行数多的页面可减少前向次数
         """
+        self.use_angle_cls = use_angle_cls
+        self.preprocessor = preprocessor
+        # 延迟导入paddleocr（及paddle），只有真正创建识别器的进程才加载
+        from paddleocr import PaddleOCR
+        kwargs = {}
+        if cpu_threads:
+            kwargs["cpu_threads"] = cpu_threads
+        if rec_batch_num:
+            kwargs["rec_batch_num"] = rec_batch_num
         try:
-            self.ocr = PaddleOCR(use_angle_cls=use_angle_cls, lang=lang, use_gpu=use_gpu)
+            self.ocr = PaddleOCR(use_angle_cls=use_angle_cls, lang=lang, use_gpu=use_gpu, **kwargs)
         except Exception as e:
             raise RuntimeError(f"PaddleOCR初始化失败: {e}")
         
-    def recognize(self, image_path: str) -> List[Tuple[str, float]]:
+    @staticmethod
+    def decode_image(data: bytes) -> np.ndarray:
+        """
+        将上传的图片字节直接解码为BGR格式的NumPy数组，无需落盘
+        
+        Args:
+            data: 图片文件的原始字节
+            
+        Returns:
+            np.ndarray: BGR格式的图像数组
+        """
+        import cv2
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ImageDecodeError("无法解码图片数据")
+        return image
+        
+    def recognize(self, image: Union[str, bytes, np.ndarray]) -> List[Tuple[str, float]]:
         """
         识别图像中的文字
         
         Args:
-            image_path: 图像文件路径
+            image: 图像文件路径、图片字节或已解码的NumPy数组
             
         Returns:
             list: 识别结果列表，每个元素为(文本, 置信度)元组
         """
-        # 检查文件是否存在
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"图像文件不存在: {image_path}")
+        use_cls = self.use_angle_cls
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            if self.preprocessor is not None:
+                image, oriented = self.preprocessor.process(bytes(image))
+                # 方向已由EXIF确定时跳过方向分类器
+                use_cls = use_cls and not oriented
+            else:
+                image = self.decode_image(bytes(image))
+        elif isinstance(image, str) and not os.path.exists(image):
+            # 检查文件是否存在
+            raise FileNotFoundError(f"图像文件不存在: {image}")
             
         # 执行OCR识别
         try:
-            result = self.ocr.ocr(image_path, cls=True)
+            result = self.ocr.ocr(image, cls=use_cls)
         except Exception as e:
             raise RuntimeError(f"OCR识别失败: {e}")
         
@@ -54,17 +94,17 @@ class ImageOCR:
         
         return texts
     
-    def get_text_only(self, image_path: str) -> List[str]:
+    def get_text_only(self, image: Union[str, bytes, np.ndarray]) -> List[str]:
         """
         只返回识别的文本内容，以换行符分隔
         
         Args:
-            image_path: 图像文件路径
+            image: 图像文件路径、图片字节或已解码的NumPy数组
             
         Returns:
             str: 识别的文本内容，每行文字用换行符分隔
         """
-        texts = self.recognize(image_path)
+        texts = self.recognize(image)
         result:List[str] = []
         for text, _ in texts:
             result.append(text)
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from config.configs import settings
+from core.shared_state import SingleFlight, get_shared_state
+
+OCRResult = List[Tuple[str, float]]
+
+# 近似匹配要求两张图片的宽高比相差不超过该比例
+_ASPECT_TOLERANCE = 0.01
+
+
+class ImageFingerprint(NamedTuple):
+    phash: int
+    width: int
+    height: int
+
+    def same_shape(self, other: "ImageFingerprint") -> bool:
+        """宽高比一致（允许_ASPECT_TOLERANCE的误差），缩放后的同一张图片仍视为相同"""
+        ratio, other_ratio = self.width / self.height, other.width / other.height
+        return abs(ratio - other_ratio) <= _ASPECT_TOLERANCE * other_ratio
+
+
+def _fingerprint(value) -> Optional[ImageFingerprint]:
+    """从缓存载荷恢复指纹，旧格式（只有哈希值）的条目不参与近似匹配"""
+    if isinstance(value, list) and len(value) == 3:
+        return ImageFingerprint(*value)
+    return None
+
+
+def perceptual_hash(data: bytes, hash_size: int = 16) -> Optional[ImageFingerprint]:
+    """
+    计算图片的差值哈希（dHash），并记录图片尺寸
+
+    同一页讲义的重复拍摄、截图的重新上传等近似图片的哈希只相差少数几位。
+    哈希位数取256位，避免排版相似的不同词汇页在低分辨率下发生碰撞。
+
+    Args:
+        data: 图片文件的原始字节
+        hash_size: 哈希边长，哈希总位数为hash_size的平方
+
+    Returns:
+        ImageFingerprint: 哈希值与原图宽高，图片无法解码时返回None
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        if not width or not height:
+            return None
+        # 只需要极小的缩略图，JPEG可以直接低分辨率解码
+        image.draft("L", (hash_size * 8, hash_size * 8))
+        image = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    except Exception:
+        return None
+    pixels = list(image.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return ImageFingerprint(value, width, height)
+
+
+class OCRResultCache:
+    """
+    OCR识别结果缓存
+
+    先按图片内容的SHA-256精确匹配；开启OCR_CACHE_PHASH_DISTANCE时，未命中再按感知哈希的汉明距离
+    查找宽高比一致的近似图片。排版相同的不同词汇页哈希也很接近，近似匹配默认关闭。
+    内存中为有界LRU，可选地将结果落盘作为第二层（仅支持精确匹配）；
+    启用共享状态后端时，精确匹配的结果还会在多个worker之间共享，
+    并通过single-flight保证同一张图片同时只被识别一次。
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, disk_dir: Optional[str] = None,
+                 max_distance: Optional[int] = None, shared: Optional[SingleFlight] = None):
+        """
+        Args:
+            max_entries: 内存中最多缓存的图片数
+            disk_dir: 磁盘缓存目录，为空时不启用磁盘层
+            max_distance: 感知哈希判定为同一图片的最大汉明距离，0表示关闭近似匹配（默认）
+            shared: 跨worker共享的结果层与single-flight锁
+        """
+        self.shared = shared
+        self.max_entries = max_entries or settings.OCR_CACHE_MAX_ENTRIES
+        self.disk_dir = disk_dir if disk_dir is not None else settings.OCR_CACHE_DISK_DIR
+        self.max_distance = settings.OCR_CACHE_PHASH_DISTANCE if max_distance is None else max_distance
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # key -> (图片指纹, 识别结果)
+        self._entries: "OrderedDict[str, Tuple[Optional[ImageFingerprint], OCRResult]]" = OrderedDict()
+        self._stats: Dict[str, int] = {"exact_hits": 0, "perceptual_hits": 0, "disk_hits": 0, "shared_hits": 0,
+                                       "misses": 0}
+
+    @staticmethod
+    def content_key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def get_exact(self, key: str) -> Optional[OCRResult]:
+        """按内容哈希查找（内存、磁盘及共享后端），不更新未命中计数"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["exact_hits"] += 1
+                return entry[1]
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._put(key, entry[0], entry[1])
+            with self._lock:
+                self._stats["disk_hits"] += 1
+            return entry[1]
+        entry = self._read_shared(key)
+        if entry is not None:
+            self._put(key, entry[0], entry[1])
+            with self._lock:
+                self._stats["shared_hits"] += 1
+            return entry[1]
+        return None
+
+    def get_similar(self, fingerprint: Optional[ImageFingerprint]) -> Optional[OCRResult]:
+        """按感知哈希查找宽高比一致的近似图片，未命中时计入misses"""
+        if fingerprint is not None and self.max_distance > 0:
+            with self._lock:
+                best_key, best_distance = None, self.max_distance + 1
+                for key, (other, _) in self._entries.items():
+                    if other is None or not fingerprint.same_shape(other):
+                        continue
+                    distance = (fingerprint.phash ^ other.phash).bit_count()
+                    if distance < best_distance:
+                        best_key, best_distance = key, distance
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self._stats["perceptual_hits"] += 1
+                    return self._entries[best_key][1]
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def lookup(self, data: bytes) -> Tuple[str, Optional[ImageFingerprint], Optional[OCRResult]]:
+        """
+        查找缓存
+
+        Returns:
+            tuple: (内容哈希, 图片指纹, 识别结果)，精确命中或未开启近似匹配时不计算指纹
+        """
+        key = self.content_key(data)
+        result = self.get_exact(key)
+        if result is not None:
+            return key, None, result
+        phash = perceptual_hash(data) if self.max_distance > 0 else None
+        return key, phash, self.get_similar(phash)
+
+    def store(self, key: str, phash: Optional[ImageFingerprint], result: OCRResult, claimed: bool = True):
+        """写入各层缓存；claimed为True时同时释放本次调用声明的single-flight锁"""
+        result = [(text, float(confidence)) for text, confidence in result]
+        self._put(key, phash, result)
+        self._write_disk(key, phash, result)
+        if self.shared is not None:
+            payload = json.dumps({"phash": phash, "texts": result}, ensure_ascii=False).encode("utf-8")
+            if claimed:
+                self.shared.release(key, payload)
+            else:
+                self.shared.publish(key, payload)
+
+    def claim(self, key: str) -> bool:
+        """
+        声明由当前调用者识别该图片
+
+        Returns:
+            bool: 返回False表示其他worker正在识别同一张图片，应调用wait_for_peer等待结果
+        """
+        return self.shared is None or self.shared.acquire(key)
+
+    def release(self, key: str):
+        """识别失败时释放claim声明的锁，让等待者自行识别"""
+        if self.shared is not None:
+            self.shared.release(key)
+
+    def wait_for_peer(self, key: str, timeout: float) -> Optional[OCRResult]:
+        if self.shared is None or self.shared.wait(key, timeout) is None:
+            return None
+        return self.get_exact(key)
+
+    async def wait_for_peer_async(self, key: str, timeout: float) -> Optional[OCRResult]:
+        """wait_for_peer的异步版本，等待期间不占用线程"""
+        if self.shared is None or await self.shared.wait_async(key, timeout) is None:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_exact, key)
+
+    def _read_shared(self, key: str) -> Optional[Tuple[Optional[ImageFingerprint], OCRResult]]:
+        if self.shared is None:
+            return None
+        payload = self.shared.lookup(key)
+        if payload is None:
+            return None
+        payload = json.loads(payload)
+        return _fingerprint(payload.get("phash")), [tuple(item) for item in payload["texts"]]
+
+    def _put(self, key: str, phash: Optional[ImageFingerprint], result: OCRResult):
+        with self._lock:
+            self._entries[key] = (phash, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[Optional[ImageFingerprint], OCRResult]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                payload = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return _fingerprint(payload.get("phash")), [tuple(item) for item in payload["texts"]]
+
+    def _write_disk(self, key: str, phash: Optional[ImageFingerprint], result: OCRResult):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"phash": phash, "texts": result}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        hits = stats["exact_hits"] + stats["perceptual_hits"] + stats["disk_hits"] + stats["shared_hits"]
+        total = hits + stats["misses"]
+        stats["hit_ratio"] = round(hits / total, 4) if total else 0.0
+        return stats
+
+
+_ocr_cache: Optional[OCRResultCache] = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRResultCache]:
+    """获取全局OCR结果缓存，未启用OCR_CACHE_ENABLED时返回None"""
+    global _ocr_cache
+    if not settings.OCR_CACHE_ENABLED:
+        return None
+    if _ocr_cache is None:
+        with _ocr_cache_lock:
+            if _ocr_cache is None:
+                shared = None
+                if settings.OCR_CACHE_SHARED:
+                    shared = SingleFlight(get_shared_state(), namespace="ocr",
+                                          lock_ttl=settings.OCR_TIMEOUT_SECONDS,
+                                          result_ttl=settings.OCR_CACHE_SHARED_TTL)
+                _ocr_cache = OCRResultCache(shared=shared)
+    return _ocr_cache
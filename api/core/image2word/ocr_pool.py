@@ -0,0 +1,348 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple, Union
+
+from config.configs import settings
+from core.image2word.ocr_cache import get_ocr_cache
+from core.metrics import registry
+
+ocr_duration = registry.histogram(
+    "vocabverse_ocr_duration_seconds", "单张图片的OCR耗时（含进程池内排队）", ("outcome",),
+)
+
+# 工作进程内常驻的ImageOCR实例，由进程初始化函数创建
+_worker_ocr = None
+
+
+def _init_worker(use_gpu: bool, lang: str, cpu_threads: int):
+    """工作进程初始化：加载一次PaddleOCR模型，之后的任务复用该实例"""
+    global _worker_ocr
+    from core.image2word.image2word import ImageOCR
+    from core.image2word.preprocess import ImagePreprocessor
+    preprocessor = ImagePreprocessor() if settings.OCR_PREPROCESS_ENABLED else None
+    _worker_ocr = ImageOCR(use_gpu=use_gpu, lang=lang, cpu_threads=cpu_threads, preprocessor=preprocessor,
+                           rec_batch_num=settings.OCR_REC_BATCH_NUM)
+
+
+def _warmup_task() -> int:
+    return os.getpid()
+
+
+def _recognize_task(image: Union[str, bytes]) -> List[Tuple[str, float]]:
+    return _worker_ocr.recognize(image)
+
+
+class OCRQueueFullError(RuntimeError):
+    """OCR等待队列已满"""
+
+
+class OCRTimeoutError(RuntimeError):
+    """OCR识别超时"""
+
+
+class OCRWorkerPool:
+    """
+    常驻的OCR工作进程池
+
+    每个工作进程在启动时加载一次PaddleOCR模型，请求只承担识别耗时；
+    进程处理一定数量的任务后自动回收重建，以限制内存漂移。
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, queue_size: Optional[int] = None,
+                 max_jobs_per_worker: Optional[int] = None):
+        """
+        Args:
+            pool_size: 工作进程数，默认按CPU核数与每进程线程数计算
+            queue_size: 等待队列上限（不含正在执行的任务）
+            max_jobs_per_worker: 每个工作进程的最大任务数，达到后回收
+        """
+        cpu_threads = max(1, settings.OCR_CPU_THREADS)
+        if not pool_size:
+            # 多worker部署时每个API进程各有一个进程池，按worker数均分CPU
+            workers = max(1, settings.SERVER_WORKERS)
+            pool_size = settings.OCR_POOL_SIZE or max(1, (os.cpu_count() or 1) // cpu_threads // workers)
+        self.pool_size = pool_size
+        self.queue_size = queue_size if queue_size is not None else settings.OCR_QUEUE_SIZE
+        self.max_jobs_per_worker = max_jobs_per_worker or settings.OCR_WORKER_MAX_JOBS
+        self.cpu_threads = cpu_threads
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # 正在执行与排队的任务总数上限
+        self._slots = threading.BoundedSemaphore(self.pool_size + self.queue_size)
+        self._pending = 0
+        # 事件循环侧的并发上限，避免单个API进程占满整个进程池
+        self.max_concurrency = settings.OCR_MAX_CONCURRENCY or self.pool_size
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._async_waiting = 0
+        # 本进程正在识别的图片（按内容哈希），同一进程内的等待者直接等待该future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 识别结果缓存位于进程池之前，命中时不占用工作进程
+        self.cache = get_ocr_cache()
+
+    def start(self, warmup: bool = True):
+        """
+        创建工作进程池，重复调用无副作用
+
+        Args:
+            warmup: 是否立即拉起全部工作进程并等待模型加载完成；
+                    为False时进程在首次提交任务时按需创建
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                # PaddleOCR不能安全地fork，统一使用spawn
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.OCR_USE_GPU, settings.OCR_LANG, self.cpu_threads),
+                max_tasks_per_child=self.max_jobs_per_worker,
+            )
+            if not warmup:
+                return
+            # 每次提交都会拉起一个新进程，直到达到pool_size，从而完成全部进程的预热
+            warmups = [self._executor.submit(_warmup_task) for _ in range(self.pool_size)]
+        wait(warmups)
+        for future in warmups:
+            future.result()
+
+    def shutdown(self, wait_jobs: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait_jobs, cancel_futures=not wait_jobs)
+
+    @property
+    def pending(self) -> int:
+        """正在执行与排队中的任务数"""
+        return self._pending
+
+    def stats(self) -> dict:
+        """进程池与结果缓存的运行状态"""
+        return {
+            "pool_size": self.pool_size,
+            "pending": self._pending,
+            "waiting": self._async_waiting,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    def submit(self, image: Union[str, bytes]) -> Future:
+        """
+        提交识别任务
+
+        Args:
+            image: 图像文件路径或图片字节（字节直接在工作进程内解码，不落盘）
+
+        Raises:
+            OCRQueueFullError: 等待队列已满
+        """
+        if self._executor is None:
+            self.start(warmup=False)
+        if not self._slots.acquire(blocking=False):
+            raise OCRQueueFullError("OCR服务繁忙，请稍后重试")
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(_recognize_task, image)
+        except Exception:
+            self._release()
+            raise
+        start = time.perf_counter()
+
+        def on_done(done: Future):
+            self._release()
+            outcome = "cancelled" if done.cancelled() else ("error" if done.exception() else "ok")
+            ocr_duration.observe(time.perf_counter() - start, outcome=outcome)
+
+        future.add_done_callback(on_done)
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def recognize(self, image: Union[str, bytes], timeout: Optional[float] = None) -> List[Tuple[str, float]]:
+        """识别图像中的文字，返回(文本, 置信度)列表"""
+        if self.cache is None or not isinstance(image, bytes):
+            return self.submit(image).result(timeout=timeout)
+        # 等待其他worker与自行识别共用同一个截止时间
+        deadline = time.monotonic() + (timeout or settings.OCR_TIMEOUT_SECONDS)
+        key, phash, result = self.cache.lookup(image)
+        if result is not None:
+            return result
+        claimed = self.cache.claim(key)
+        if not claimed:
+            result = self.cache.wait_for_peer(key, max(deadline - time.monotonic(), 0))
+            if result is not None:
+                return result
+            # 对方识别失败或超时，尝试接手，让其余等待者等待本次结果
+            claimed = self.cache.claim(key)
+        try:
+            remaining = None if timeout is None else max(deadline - time.monotonic(), 0)
+            result = self.submit(image).result(timeout=remaining)
+        except BaseException:
+            if claimed:
+                self.cache.release(key)
+            raise
+        self.cache.store(key, phash, result, claimed)
+        return result
+
+    def get_text_only(self, image: Union[str, bytes], timeout: Optional[float] = None) -> List[str]:
+        """只返回识别的文本内容，与ImageOCR.get_text_only保持一致"""
+        return self._text_only(self.recognize(image, timeout=timeout))
+
+    async def recognize_async(self, image: Union[str, bytes], timeout: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        在事件循环中异步等待识别结果，识别本身在工作进程中执行
+
+        Args:
+            image: 图像文件路径或图片字节
+            timeout: 超时时间（秒，含排队时间），默认使用OCR_TIMEOUT_SECONDS
+
+        Raises:
+            OCRQueueFullError: 等待的请求过多
+            OCRTimeoutError: 识别超时
+        """
+        if timeout is None:
+            timeout = settings.OCR_TIMEOUT_SECONDS
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+        if self._async_waiting >= self.queue_size:
+            raise OCRQueueFullError("OCR服务繁忙，请稍后重试")
+
+        async def run():
+            self._async_waiting += 1
+            try:
+                await self._async_slots.acquire()
+            finally:
+                self._async_waiting -= 1
+            try:
+                # 取消asyncio侧的future会一并取消尚未开始执行的进程池任务
+                return await asyncio.wrap_future(self.submit(image))
+            finally:
+                self._async_slots.release()
+
+        if self.cache is None or not isinstance(image, bytes):
+            try:
+                return await asyncio.wait_for(run(), timeout)
+            except asyncio.TimeoutError:
+                raise OCRTimeoutError(f"OCR识别超时（{timeout}秒）")
+
+        loop = asyncio.get_running_loop()
+        # 等待其他worker与自行识别共用同一个截止时间，总耗时不超过timeout
+        deadline = loop.time() + timeout
+        # 感知哈希需要解码缩略图，共享缓存需要访问外部存储，都放到线程中执行
+        key, phash, result = await loop.run_in_executor(None, self.cache.lookup, image)
+        if result is not None:
+            return result
+        claimed = await loop.run_in_executor(None, self.cache.claim, key)
+        while not claimed and loop.time() < deadline:
+            # 其他请求正在识别同一张图片，等待其结果；对方失败时尝试接手，已被其他等待者接手则继续等待
+            result = await self._wait_for_peer(key, max(deadline - loop.time(), 0))
+            if result is not None:
+                return result
+            claimed = await loop.run_in_executor(None, self.cache.claim, key)
+        if not claimed:
+            raise OCRTimeoutError(f"OCR识别超时（{timeout}秒）")
+
+        flight = None
+        if claimed and key not in self._inflight:
+            flight = self._inflight[key] = loop.create_future()
+        result = None
+        try:
+            result = await asyncio.wait_for(run(), max(deadline - loop.time(), 0))
+        except BaseException as e:
+            # 只释放本次调用声明的锁，不影响正在识别的其他worker
+            if claimed:
+                await loop.run_in_executor(None, self.cache.release, key)
+            if isinstance(e, asyncio.TimeoutError):
+                raise OCRTimeoutError(f"OCR识别超时（{timeout}秒）")
+            raise
+        finally:
+            if flight is not None:
+                # 结果为None时等待者自行接手识别
+                del self._inflight[key]
+                flight.set_result(result)
+        await loop.run_in_executor(None, self.cache.store, key, phash, result, claimed)
+        return result
+
+    async def _wait_for_peer(self, key: str, timeout: float) -> Optional[List[Tuple[str, float]]]:
+        """
+        在事件循环中等待正在识别同一张图片的请求，等待期间不占用线程
+
+        同一进程内的请求直接等待其future；其他worker中的请求通过共享缓存轮询，
+        轮询间隔由asyncio.sleep等待。对方失败或超时返回None。
+        """
+        flight = self._inflight.get(key)
+        if flight is None:
+            return await self.cache.wait_for_peer_async(key, timeout)
+        try:
+            # shield：本次等待超时或被取消不影响正在识别的请求
+            return await asyncio.wait_for(asyncio.shield(flight), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def get_text_only_async(self, image: Union[str, bytes], timeout: Optional[float] = None) -> List[str]:
+        """异步版本的get_text_only"""
+        return self._text_only(await self.recognize_async(image, timeout=timeout))
+
+    @staticmethod
+    def _text_only(texts: List[Tuple[str, float]]) -> List[str]:
+        result = [text for text, _ in texts]
+        if result:
+            result.pop(0)
+        return result
+
+
+_ocr_pool: Optional[OCRWorkerPool] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OCRWorkerPool:
+    """获取全局OCR工作进程池（首次调用时创建，不会自动启动进程）"""
+    global _ocr_pool
+    if _ocr_pool is None:
+        with _ocr_pool_lock:
+            if _ocr_pool is None:
+                _ocr_pool = OCRWorkerPool()
+    return _ocr_pool
+
+
+def _pool_stats() -> Optional[dict]:
+    # 只读取已创建的进程池，采集指标不应触发进程池的创建
+    return _ocr_pool.stats() if _ocr_pool is not None else None
+
+
+def _queue_depth():
+    stats = _pool_stats()
+    if stats is None:
+        return None
+    return [(("pool",), stats["pending"]), (("async_waiting",), stats["waiting"])]
+
+
+def _cache_lookups():
+    stats = _pool_stats()
+    if stats is None or stats["cache"] is None:
+        return None
+    cache = stats["cache"]
+    return [((kind,), cache[f"{kind}_hits"]) for kind in ("exact", "perceptual", "disk", "shared")] + \
+        [(("miss",), cache["misses"])]
+
+
+def _cache_hit_ratio():
+    stats = _pool_stats()
+    if stats is None or stats["cache"] is None:
+        return None
+    return stats["cache"]["hit_ratio"]
+
+
+registry.callback("vocabverse_ocr_queue_depth", "OCR任务数（pool为进程池中执行与排队的任务，async_waiting为等待提交的请求）",
+                  "gauge", _queue_depth, ("queue",))
+registry.callback("vocabverse_ocr_cache_lookups_total", "OCR结果缓存查找次数", "counter", _cache_lookups, ("result",))
+registry.callback("vocabverse_ocr_cache_hit_ratio", "OCR结果缓存命中率", "gauge", _cache_hit_ratio)
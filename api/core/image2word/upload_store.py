@@ -0,0 +1,88 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Optional
+
+from config.configs import settings
+
+
+class UploadStore:
+    """
+    可选的上传图片持久化存储
+
+    文件以内容哈希命名，相同图片只保存一份，不同用户的同名文件也不会互相覆盖；
+    总大小超过上限时按最近访问时间淘汰最旧的文件。
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            directory: 存储目录，默认使用UPLOAD_STORE_DIR
+            max_bytes: 目录总大小上限，默认使用UPLOAD_STORE_MAX_BYTES
+        """
+        self.directory = directory or settings.UPLOAD_STORE_DIR
+        self.max_bytes = max_bytes or settings.UPLOAD_STORE_MAX_BYTES
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def save(self, data: bytes, ext: str = "") -> str:
+        """
+        保存图片并返回文件路径
+
+        Args:
+            data: 图片字节
+            ext: 文件扩展名（含点号），如".png"
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        # 扩展名只保留字母数字，防止路径注入
+        ext = re.sub(r'[^\w\.]', '', ext.lower())[:10]
+        path = os.path.join(self.directory, f"{digest}{ext}")
+        with self._lock:
+            if os.path.exists(path):
+                # 已存在则只刷新访问时间，使其在淘汰顺序中靠后
+                os.utime(path)
+                return path
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str):
+        """按修改时间从旧到新删除文件，直到总大小回到上限以内"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            if entry.path == keep:
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._total_bytes -= size
+            except FileNotFoundError:
+                continue
+
+
+_upload_store: Optional[UploadStore] = None
+_upload_store_lock = threading.Lock()
+
+
+def get_upload_store() -> Optional[UploadStore]:
+    """获取全局上传存储，未启用UPLOAD_STORE_ENABLED时返回None"""
+    global _upload_store
+    if not settings.UPLOAD_STORE_ENABLED:
+        return None
+    if _upload_store is None:
+        with _upload_store_lock:
+            if _upload_store is None:
+                _upload_store = UploadStore()
+    return _upload_store
@@ -0,0 +1,161 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.configs import settings
+from core.nlp.lemmatizer import Lemmatizer
+
+# 中日韩文字及全角标点，视为释义部分
+CJK_PATTERN = re.compile(r'[　-〿㐀-鿿豈-﫿＀-￯]+')
+# 音标：/əˈbændən/ 或 [əˈbændən]
+PHONETIC_PATTERN = re.compile(r'/[^/]{1,40}/|\[[^\]]{1,40}\]')
+# 词性标注：n. vt. adj. 等
+POS_PATTERN = re.compile(r'\b(?:n|v|vt|vi|adj|adv|prep|conj|pron|int|num|art|aux|abbr|pl|sing|phr)\.', re.IGNORECASE)
+# 行首序号：1. 2) a. 3、（a.m.、e.g.等缩写不是序号）
+NUMBERING_PATTERN = re.compile(r'^\s*(?:\d{1,3}|[a-zA-Z](?![\.][A-Za-z]\.))\s*[\.\)、]\s*')
+# 带点的缩写词条：a.m. p.m. e.g. U.S.
+ABBREVIATION_PATTERN = re.compile(r'^\s*((?:[A-Za-z]\.){2,})(?![A-Za-z])')
+# 页眉页脚：Unit 3、Page 12、Lesson IV
+HEADER_PATTERN = re.compile(r'^\s*(?:page|p\.|unit|lesson|chapter|module|part|section)\s*[\dIVXivx]+\b', re.IGNORECASE)
+PAGE_NUMBER_PATTERN = re.compile(r'^[\s\-—–·.]*\d{1,4}[\s\-—–·.]*$')
+ENGLISH_RUN_PATTERN = re.compile(r"[A-Za-z][A-Za-z'\-]*(?: +[A-Za-z][A-Za-z'\-]*)*")
+
+
+class WordTrie:
+    """按单词（而非字母）组织的前缀树，用于在OCR文本中最长匹配词表中的单词与词组"""
+
+    _END = "$"
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self.root: Dict = {}
+        self.size = 0
+        for entry in entries:
+            self.insert(entry)
+
+    def insert(self, entry: str):
+        tokens = entry.lower().split()
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if self._END not in node:
+            node[self._END] = True
+            self.size += 1
+
+    def longest_match(self, tokens: List[str], start: int = 0) -> int:
+        """返回从start开始能匹配到的最长词条的结束位置，无匹配时返回start"""
+        node = self.root
+        end = start
+        for index in range(start, len(tokens)):
+            node = node.get(tokens[index])
+            if node is None:
+                break
+            if self._END in node:
+                end = index + 1
+        return end
+
+    def __contains__(self, entry: str) -> bool:
+        tokens = entry.lower().split()
+        return bool(tokens) and self.longest_match(tokens) == len(tokens)
+
+
+class VocabularyExtractor:
+    """
+    从OCR结果中提取英文单词表
+
+    逐行去除页眉页码、序号、音标、词性标注与中文释义，取每行开头的英文词条作为单词；
+    提供词表时用前缀树校验并匹配词组，词表中没有的屈折形式还原为词表中的原形；
+    未提供词表时保持课本上的词形（无法确认always、news、people等是否为变化形式），随后去重并按OCR置信度排序。
+    """
+
+    def __init__(self, wordlist: Optional[Iterable[str]] = None, min_confidence: Optional[float] = None,
+                 max_phrase_words: Optional[int] = None):
+        """
+        Args:
+            wordlist: 英文词表（可含词组），为None时不做词表校验
+            min_confidence: 低于该置信度的识别行被丢弃
+            max_phrase_words: 单个词条的最大单词数，更长的英文片段视为例句
+        """
+        entries = [entry.strip() for entry in wordlist if entry.strip()] if wordlist is not None else None
+        self.trie = WordTrie(entries) if entries else None
+        self.lemmatizer = Lemmatizer(entry.lower() for entry in entries if " " not in entry) if entries else None
+        self.min_confidence = settings.OCR_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.max_phrase_words = max_phrase_words or settings.OCR_MAX_PHRASE_WORDS
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "VocabularyExtractor":
+        with open(path, encoding="utf-8") as f:
+            return cls(wordlist=f, **kwargs)
+
+    def headword(self, line: str) -> Optional[str]:
+        """提取一行OCR文本中的英文词条，没有时返回None"""
+        if HEADER_PATTERN.match(line) or PAGE_NUMBER_PATTERN.match(line):
+            return None
+        line = NUMBERING_PATTERN.sub("", line, count=1)
+        abbreviation = ABBREVIATION_PATTERN.match(line)
+        if abbreviation is not None:
+            return abbreviation.group(1).lower()
+        # 音标、词性与中文释义都作为分隔符，将"word 释义"拆开
+        line = PHONETIC_PATTERN.sub("|", line)
+        line = POS_PATTERN.sub("|", line)
+        line = CJK_PATTERN.sub("|", line)
+
+        match = ENGLISH_RUN_PATTERN.search(line)
+        if match is None:
+            return None
+        tokens = [token.strip("'-").lower() for token in match.group().split()]
+        tokens = [token for token in tokens if token]
+        if not tokens or len(tokens) > self.max_phrase_words:
+            return None
+
+        if self.trie is not None:
+            # 词表模式：取开头最长的已知词条，首词为屈折形式时先还原，只有还原结果在词表中时才采用
+            end = self.trie.longest_match(tokens)
+            if end == 0:
+                tokens = [self.lemmatizer.lemmatize(tokens[0])] + tokens[1:]
+                end = self.trie.longest_match(tokens)
+            if end == 0:
+                return None
+            return " ".join(tokens[:end])
+
+        if len(tokens) == 1 and len(tokens[0]) < 2 and tokens[0] not in ("a", "i"):
+            return None
+        return " ".join(tokens)
+
+    def extract(self, texts: List[Tuple[str, float]]) -> List[str]:
+        """
+        Args:
+            texts: OCR识别结果，每个元素为(文本, 置信度)
+
+        Returns:
+            list: 去重后按置信度从高到低排列的单词
+        """
+        scores: Dict[str, float] = {}
+        for text, confidence in texts:
+            if confidence < self.min_confidence:
+                continue
+            word = self.headword(text)
+            if word is None:
+                continue
+            if confidence > scores.get(word, -1.0):
+                scores[word] = confidence
+        # sorted是稳定排序，置信度相同的单词保持原有顺序
+        return sorted(scores, key=lambda word: scores[word], reverse=True)
+
+
+_word_extractor: Optional[VocabularyExtractor] = None
+_word_extractor_lock = threading.Lock()
+
+
+def get_word_extractor() -> VocabularyExtractor:
+    """获取全局单词提取器，配置了OCR_WORDLIST_PATH时加载词表并编译前缀树"""
+    global _word_extractor
+    if _word_extractor is None:
+        with _word_extractor_lock:
+            if _word_extractor is None:
+                if settings.OCR_WORDLIST_PATH:
+                    _word_extractor = VocabularyExtractor.from_file(settings.OCR_WORDLIST_PATH)
+                else:
+                    _word_extractor = VocabularyExtractor()
+    return _word_extractor
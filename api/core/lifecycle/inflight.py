@@ -0,0 +1,102 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from core.logger import api_logger
+from core.metrics import registry
+
+
+class InflightTracker:
+    """
+    进行中的LLM调用计数
+
+    进程退出时先标记为draining（就绪检查随即返回503，不再接收新流量），
+    再等待已经发出的LLM调用完成，避免生成到一半的文章因重启而丢失。
+    由install_drain_on_signal在收到退出信号时立即开始排空，此时服务器仍在监听端口。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._count = 0
+        self.draining = False
+
+    @contextmanager
+    def track(self):
+        with self._cond:
+            self._count += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify_all()
+
+    @property
+    def count(self) -> int:
+        with self._cond:
+            return self._count
+
+    def drain(self, timeout: float) -> bool:
+        """
+        标记为draining并等待进行中的调用完成
+
+        Returns:
+            bool: 超时前全部完成返回True
+        """
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._count > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"draining": self.draining, "inflight": self.count}
+
+
+inflight_tracker = InflightTracker()
+
+
+def install_drain_on_signal(delay: float, timeout: float) -> bool:
+    """
+    接管服务器已注册的SIGTERM处理，收到信号时先排空再交给服务器退出
+
+    uvicorn收到SIGTERM后立即关闭监听端口，之后才执行lifespan的退出逻辑，
+    那时/readyz已无法被访问，负载均衡器也来不及摘除实例。这里在信号到达时先标记draining，
+    继续监听delay秒让负载均衡器通过/readyz发现503并停止转发，再等待进行中的LLM调用完成（最多timeout秒），
+    最后调用服务器原有的信号处理进入正常退出流程。排空期间再次收到信号时立即退出。
+    需在服务器注册信号处理之后于主线程调用（lifespan启动阶段）。
+
+    Returns:
+        bool: 是否已接管
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    original = signal.getsignal(signal.SIGTERM)
+    if not callable(original):
+        return False
+
+    def drain_then_exit(sig, frame):
+        time.sleep(delay)
+        if not inflight_tracker.drain(timeout):
+            api_logger.error(f"Shutdown: {inflight_tracker.count} LLM calls still in flight after drain timeout")
+        original(sig, frame)
+
+    def handle_term(sig, frame):
+        if inflight_tracker.draining:
+            original(sig, frame)
+            return
+        inflight_tracker.draining = True
+        api_logger.info(f"Shutdown: draining {inflight_tracker.count} LLM calls before closing listeners")
+        threading.Thread(target=drain_then_exit, args=(sig, frame), name="drain", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_term)
+    return True
+
+registry.callback("vocabverse_llm_inflight_calls", "进行中的LLM调用数", "gauge", lambda: inflight_tracker.count)
+registry.callback("vocabverse_draining", "进程是否正在退出排空（1为是）", "gauge", lambda: int(inflight_tracker.draining))
@@ -0,0 +1,81 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config.configs import settings
+from core.logger import api_logger
+
+
+class WarmupState:
+    """
+    进程预热状态
+
+    存活检查只关心进程能否响应；就绪检查要求所有必需的预热步骤都已成功完成，
+    滚动发布时流量只会被导向已预热的进程。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.finished = False
+        self.steps: Dict[str, dict] = {}
+
+    def record(self, name: str, required: bool, elapsed: float, error: Optional[str] = None):
+        with self._lock:
+            self.steps[name] = {
+                "required": required,
+                "ok": error is None,
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "error": error,
+            }
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self.finished and all(step["ok"] for step in self.steps.values() if step["required"])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "finished": self.finished,
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "steps": dict(self.steps),
+            }
+
+
+warmup_state = WarmupState()
+
+
+def _run_step(name: str, required: bool, func: Callable[[], None]):
+    start = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        warmup_state.record(name, required, time.perf_counter() - start, str(e))
+        api_logger.error(f"Warmup: {name} failed: {e}")
+    else:
+        elapsed = time.perf_counter() - start
+        warmup_state.record(name, required, elapsed)
+        api_logger.info(f"Warmup: {name} done in {elapsed:.2f} seconds")
+
+
+def run_warmup():
+    """依次执行预热步骤，阻塞直到全部完成（应在线程中调用）"""
+    from core.image2word.ocr_pool import get_ocr_pool
+    from core.llm.llm_manager import LLM_Manager, get_client
+    from core.prompts.prompt_template import compile_templates
+
+    steps: List[tuple] = [("templates", True, compile_templates)]
+    for provider in settings.enabled_providers:
+        # 提前创建共享客户端（连接池），首个请求无需再付出创建开销
+        steps.append((f"provider:{provider}", True, lambda provider=provider: get_client(provider)))
+    if settings.WARMUP_PROVIDER_PROBE:
+        def probe():
+            LLM_Manager().creatLLM(settings.LLM_PROVIDER).probe(timeout=settings.WARMUP_PROBE_TIMEOUT)
+        steps.append(("provider_probe", settings.WARMUP_PROBE_REQUIRED, probe))
+    if settings.OCR_PREWARM:
+        steps.append(("ocr_pool", False, get_ocr_pool().start))
+
+    for name, required, func in steps:
+        _run_step(name, required, func)
+    warmup_state.finished = True
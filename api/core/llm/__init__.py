@@ -1,3 +1,10 @@
 from .llm import LLM
-from .deepseek import DeepSeek_LLM
-from .llm_manager import LLM_Manager
+from .llm_manager import LLM_Manager, register_provider
+
+
+def __getattr__(name):
+    # 各提供商实现延迟导入，避免启动时加载全部SDK
+    if name == "DeepSeek_LLM":
+        from .deepseek import DeepSeek_LLM
+        return DeepSeek_LLM
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
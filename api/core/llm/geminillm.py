@@ -1,17 +1,25 @@
 from google import genai
 # import openai
-from typing import List,Iterable
+from typing import List,Iterable,Optional
 import sys
 # sys.path.append('..')
 from config.configs import settings as llm_Settings
 from .llm import LLM
 
 class GeminiLLM(LLM):
-    def __init__(self, api_key: str=llm_Settings.GEMINI_API_KEY,model:str=llm_Settings.GEMINI_MODEL) -> None:
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str=llm_Settings.GEMINI_API_KEY,model:str=llm_Settings.GEMINI_MODEL,client:Optional[genai.Client]=None) -> None:
+        # 优先复用共享的客户端，避免每次请求都新建连接池
+        self.client = client or genai.Client(api_key=api_key)
         self.messages: List[Iterable[dict]] = []
         self.model = model
 
+    @classmethod
+    def build_client(cls):
+        return genai.Client(api_key=llm_Settings.GEMINI_API_KEY)
+
+    def probe(self, timeout: float = 5.0):
+        self.client.models.get(model=self.model, config={"http_options": {"timeout": int(timeout * 1000)}})
+
     def setPrompt(self, prompt: str):
         message = {"role": "system", "content": prompt}
         self.messages.append(message)
@@ -35,14 +43,17 @@ class GeminiLLM(LLM):
         self.addHistory_Assistant(message_content)
         return message_content
     def ChatToBotWithStream(self, content: str):
-        self.addHistory_User(content)
-        response = self.client.chat.completions.create(
+        # 与ChatToBot一致，直接发送内容；genai客户端没有chat.completions接口
+        response = self.client.models.generate_content_stream(
             model=self.model,
-            messages=self.messages,
-            stream=True
+            contents=content
         )
+        chunks = []
         for chunk in response:
-            yield chunk.choices[0].delta.content
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        self.addHistory_Assistant("".join(chunks))
 if __name__ == "__main__":
 
     gemini = GeminiLLM(api_key="xxxx",model="gemini-2.0-flash")
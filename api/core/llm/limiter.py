@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from config.configs import settings
+from core.llm.metrics import llm_active_requests, llm_queue_wait
+
+
+class LLMQueueTimeoutError(RuntimeError):
+    """等待LLM并发额度超时"""
+
+
+class ProviderLimiter:
+    """
+    单个提供商的并发上限
+
+    分片并行生成会把一个请求拆成多个LLM调用，同一进程内对同一提供商的调用数
+    由该上限约束，超出的调用排队等待，避免触发提供商的速率限制。
+    排队超过timeout秒时抛出LLMQueueTimeoutError，请求失败而不是无限等待。
+    """
+
+    def __init__(self, provider: str, limit: int, timeout: float = 0):
+        self.provider = provider
+        self.limit = limit
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    @contextmanager
+    def slot(self):
+        if self._semaphore is None:
+            yield
+            return
+        start = time.time()
+        acquired = self._semaphore.acquire(timeout=self.timeout if self.timeout > 0 else None)
+        llm_queue_wait.observe(time.time() - start, provider=self.provider)
+        if not acquired:
+            raise LLMQueueTimeoutError(f"{self.provider}调用繁忙，排队超过{self.timeout:g}秒，请稍后重试")
+        llm_active_requests.inc(provider=self.provider)
+        try:
+            yield
+        finally:
+            llm_active_requests.dec(provider=self.provider)
+            self._semaphore.release()
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    limits: Dict[str, int] = {}
+    for item in value.split(","):
+        name, _, limit = item.partition("=")
+        if name.strip() and limit.strip():
+            limits[name.strip().upper()] = int(limit)
+    return limits
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    """返回提供商的并发限制器，上限取LLM_PROVIDER_CONCURRENCY中的值，未配置时为LLM_MAX_CONCURRENCY"""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                limit = _parse_limits(settings.LLM_PROVIDER_CONCURRENCY).get(provider.upper(),
+                                                                           settings.LLM_MAX_CONCURRENCY)
+                limiter = _limiters[provider] = ProviderLimiter(provider, limit, settings.LLM_QUEUE_TIMEOUT)
+    return limiter
@@ -21,4 +21,16 @@ class LLM(ABC):
         pass
     @abstractmethod
     def ChatToBotWithStream(self, content: str):
-        pass
\ No newline at end of file
+        pass
+    @classmethod
+    def build_client(cls):
+        """
+        Build the SDK client (and its connection pool) shared by every instance of this provider.
+        Return None if the provider keeps no reusable client.
+        """
+        return None
+    def probe(self, timeout: float = 5.0):
+        """
+        Cheap connectivity check used during warmup. Raise on failure.
+        """
+        pass
@@ -1,9 +1,11 @@
 from enum import Enum
-from .openaillm import OpenAILLM
-from .deepseek import DeepSeek_LLM
+import importlib
+import threading
+from typing import Dict, Type, Union
 from .llm import LLM
-from .siliconflow import SiliconFlowLLM
-from .geminillm import GeminiLLM
+from config.configs import settings
+
+
 class LLM_Provider(Enum):
     """
     Types of LLM Providers.
@@ -20,22 +22,83 @@ class LLM_Provider(Enum):
                 return member
         else:
             raise Exception("Not supported mode_provider type")
-    
+
+
+# 提供商名称 -> "模块路径:类名"，首次选用时才导入对应模块（及其openai、google.genai等依赖）
+_PROVIDER_REGISTRY: Dict[str, Union[str, Type[LLM]]] = {
+    LLM_Provider.OPENAI.value: "core.llm.openaillm:OpenAILLM",
+    LLM_Provider.DEEPSEEK.value: "core.llm.deepseek:DeepSeek_LLM",
+    LLM_Provider.SILICONFLOW.value: "core.llm.siliconflow:SiliconFlowLLM",
+    LLM_Provider.GEMINI.value: "core.llm.geminillm:GeminiLLM",
+    # 离线回放录制的调用，见 core/llm/replay.py
+    "REPLAY": "core.llm.replay:ReplayLLM",
+}
+_registry_lock = threading.Lock()
+
+
+def register_provider(name: str, target: Union[str, Type[LLM]]):
+    """
+    注册LLM提供商插件
+
+    Args:
+        name: 提供商名称，与LLM_PROVIDER配置对应
+        target: LLM子类，或"模块路径:类名"形式的字符串（延迟导入）
+    """
+    with _registry_lock:
+        _PROVIDER_REGISTRY[name.upper()] = target
+
+
+def registered_providers():
+    return list(_PROVIDER_REGISTRY)
+
+
+def resolve_provider(name: str) -> Type[LLM]:
+    """返回提供商对应的LLM类，必要时导入其模块"""
+    target = _PROVIDER_REGISTRY.get(name)
+    if target is None:
+        raise Exception("Not supported mode_provider type")
+    if isinstance(target, str):
+        with _registry_lock:
+            target = _PROVIDER_REGISTRY[name]
+            if isinstance(target, str):
+                module_name, _, class_name = target.partition(":")
+                target = getattr(importlib.import_module(module_name), class_name)
+                _PROVIDER_REGISTRY[name] = target
+    return target
+
+
+# 通过配置注册的插件，例如 LLM_PROVIDER_PLUGINS=MYLLM=plugins.my_llm:MyLLM
+for _plugin in settings.LLM_PROVIDER_PLUGINS.split(","):
+    if "=" in _plugin:
+        _name, _target = _plugin.split("=", 1)
+        register_provider(_name.strip(), _target.strip())
+
+
+# 提供商名称 -> 共享的SDK客户端（连接池），由各实例复用
+_clients: Dict[str, object] = {}
+
+
+def get_client(name: str):
+    """返回提供商的共享客户端，首次调用时创建；提供商不支持共享时返回None"""
+    if name not in _clients:
+        provider = resolve_provider(name)
+        with _registry_lock:
+            if name not in _clients:
+                _clients[name] = provider.build_client()
+    return _clients[name]
+
+
 class LLM_Manager:
     def creatLLM(self,mode_provider: str)->LLM:
-        lLM_Provider = LLM_Provider.get_llm(mode_provider)
-        if lLM_Provider == LLM_Provider.DEEPSEEK:
-            return DeepSeek_LLM()
-        elif lLM_Provider == LLM_Provider.OPENAI:
-            return OpenAILLM()
-        elif lLM_Provider == LLM_Provider.SILICONFLOW:
-            return SiliconFlowLLM()
-        elif lLM_Provider == LLM_Provider.GEMINI:
-            return GeminiLLM()
-        else:
-            raise Exception("Not supported mode_provider type")
-        
+        provider = resolve_provider(mode_provider)
+        client = get_client(mode_provider)
+        llm = provider() if client is None else provider(client=client)
+        if settings.LLM_RECORD_DIR and mode_provider != "REPLAY":
+            from .replay import RecordingLLM, get_fixture_store
+            llm = RecordingLLM(llm, mode_provider, get_fixture_store(settings.LLM_RECORD_DIR))
+        return llm
+
 if __name__ == "__main__":
     llm = LLM_Manager().creatLLM("OPENAI")
     llm.setPrompt("你是一个聊天助手")
-    print(llm.ChatToBot("你好"))
\ No newline at end of file
+    print(llm.ChatToBot("你好"))
@@ -0,0 +1,17 @@
+from core.metrics import registry
+
+llm_request_duration = registry.histogram(
+    "vocabverse_llm_request_duration_seconds", "LLM调用耗时", ("provider", "model", "outcome"),
+)
+llm_time_to_first_token = registry.histogram(
+    "vocabverse_llm_time_to_first_token_seconds", "流式调用时收到第一段内容的耗时", ("provider", "model"),
+)
+llm_json_parse_failures = registry.counter(
+    "vocabverse_llm_json_parse_failures_total", "LLM返回内容无法解析为JSON的次数", ("task",),
+)
+llm_queue_wait = registry.histogram(
+    "vocabverse_llm_queue_wait_seconds", "等待提供商并发额度的耗时", ("provider",),
+)
+llm_active_requests = registry.gauge(
+    "vocabverse_llm_active_requests", "正在进行的LLM调用数", ("provider",),
+)
@@ -1,18 +1,26 @@
 from openai import OpenAI
 from openai.types.chat import ChatCompletionToolParam,ChatCompletionToolChoiceOptionParam
 # import openai
-from typing import List,Iterable
+from typing import List,Iterable,Optional
 import sys
 # sys.path.append('..')
 from config.configs import settings as llm_Settings
 from .llm import LLM
 
 class OpenAILLM(LLM):
-    def __init__(self, api_key: str=llm_Settings.OPENAI_API_KEY,base_url:str=llm_Settings.OPENAI_BASE_URL,model:str=llm_Settings.OPENAI_MODEL) -> None:
-        self.client = OpenAI(api_key=api_key,base_url=base_url)
+    def __init__(self, api_key: str=llm_Settings.OPENAI_API_KEY,base_url:str=llm_Settings.OPENAI_BASE_URL,model:str=llm_Settings.OPENAI_MODEL,client:Optional[OpenAI]=None) -> None:
+        # 优先复用共享的客户端，避免每次请求都新建连接池
+        self.client = client or OpenAI(api_key=api_key,base_url=base_url)
         self.messages: List[Iterable[dict]] = []
         self.model = model
 
+    @classmethod
+    def build_client(cls):
+        return OpenAI(api_key=llm_Settings.OPENAI_API_KEY,base_url=llm_Settings.OPENAI_BASE_URL)
+
+    def probe(self, timeout: float = 5.0):
+        self.client.with_options(timeout=timeout, max_retries=0).models.list()
+
     def setPrompt(self, prompt: str):
         message = {"role": "system", "content": prompt}
         self.messages.append(message)
@@ -43,6 +51,9 @@ class OpenAILLM(LLM):
             stream=True
         )
         for chunk in response:
+            # 部分兼容接口会返回不带choices的块（如最后的用量统计），跳过
+            if not chunk.choices or chunk.choices[0].delta.content is None:
+                continue
             yield chunk.choices[0].delta.content
 if __name__ == "__main__":
 
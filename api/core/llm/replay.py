@@ -0,0 +1,269 @@
+"""
+LLM调用的录制与回放
+
+录制：LLM_RECORD_DIR不为空时，LLM_Manager创建的实例会包装为RecordingLLM，每次调用的
+请求、响应（流式调用按分段记录）与各段的耗时追加写入该目录下的 <提供商>-<进程号>.jsonl.gz。
+每条记录单独压缩为一个gzip成员，多个线程、多个进程同时录制互不干扰，文件可直接用gzip读取。
+
+回放：LLM_PROVIDER=REPLAY 时由ReplayLLM读取LLM_REPLAY_DIR下的全部录制文件，按请求内容的哈希
+返回录制的响应，耗时按原始时间乘以LLM_REPLAY_TIME_SCALE（0表示不等待）。找不到完全相同的请求时，
+按LLM_REPLAY_MISS处理：nearest 依次返回同一类提示词的录制结果，error 直接报错。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+from config.configs import settings
+from .llm import LLM
+
+_DIGITS = re.compile(r"\d+")
+
+
+def request_key(messages: List[dict], content: str) -> str:
+    """请求内容（系统提示词、历史消息与本次输入）的哈希"""
+    payload = json.dumps([messages, content], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def request_kind(messages: List[dict], content: str) -> str:
+    """提示词类别：系统提示词加上提示词的首个非空行，其中的数字不参与区分"""
+    system = "|".join(message["content"] for message in messages if message["role"] == "system")
+    first_line = next((line.strip() for line in content.splitlines() if line.strip()), "")
+    return f"{system}|{_DIGITS.sub('#', first_line[:80])}"
+
+
+class FixtureStore:
+    """录制文件的读写"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, provider: str, record: dict):
+        data = gzip.compress((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        filename = os.path.join(self.path, f"{provider.lower()}-{os.getpid()}.jsonl.gz")
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(filename, "ab") as f:
+                f.write(data)
+
+    def load(self) -> List[dict]:
+        """按文件名顺序读取全部记录；文件末尾写入不完整的记录会被忽略"""
+        records = []
+        if not os.path.isdir(self.path):
+            return records
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith(".jsonl.gz"):
+                continue
+            try:
+                with gzip.open(os.path.join(self.path, name), "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            records.append(json.loads(line))
+            except (EOFError, OSError, json.JSONDecodeError):
+                continue
+        return records
+
+
+_stores: Dict[str, FixtureStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_fixture_store(path: str) -> FixtureStore:
+    if path not in _stores:
+        with _stores_lock:
+            if path not in _stores:
+                _stores[path] = FixtureStore(path)
+    return _stores[path]
+
+
+class _MessageTracker:
+    """记录系统提示词与历史消息，用于计算请求的哈希"""
+
+    def _track(self, role: str, content: str):
+        self.messages.append({"role": role, "content": content})
+
+
+class RecordingLLM(_MessageTracker, LLM):
+    """包装真实提供商，转发调用并录制请求与响应"""
+
+    def __init__(self, llm: LLM, provider: str, store: FixtureStore):
+        self.llm = llm
+        self.provider = provider
+        self.store = store
+        self.messages: List[dict] = []
+        self.model = getattr(llm, "model", "")
+
+    def probe(self, timeout: float = 5.0):
+        self.llm.probe(timeout=timeout)
+
+    def setPrompt(self, prompt: str):
+        self._track("system", prompt)
+        self.llm.setPrompt(prompt)
+
+    def addHistory_User(self, content):
+        self._track("user", content)
+        self.llm.addHistory_User(content)
+
+    def addHistory_Assistant(self, content):
+        self._track("assistant", content)
+        self.llm.addHistory_Assistant(content)
+
+    def addHistory(self, messages):
+        self.messages.extend(messages)
+        self.llm.addHistory(messages)
+
+    def _record(self, content: str, stream: bool, chunks: List[list], error: Optional[Exception] = None):
+        record = {
+            "key": request_key(self.messages, content),
+            "kind": request_kind(self.messages, content),
+            "provider": self.provider,
+            "model": self.model,
+            "messages": self.messages,
+            "content": content,
+            "stream": stream,
+            # [距上一段的毫秒数, 内容]，非流式调用只有一段
+            "chunks": chunks,
+            "recorded_at": time.time(),
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        self.store.append(self.provider, record)
+
+    def ChatToBot(self, content: str):
+        start = time.perf_counter()
+        try:
+            response = self.llm.ChatToBot(content)
+        except Exception as e:
+            self._record(content, False, [[round((time.perf_counter() - start) * 1000, 1), ""]], e)
+            raise
+        self._record(content, False, [[round((time.perf_counter() - start) * 1000, 1), response]])
+        self._track("user", content)
+        self._track("assistant", response)
+        return response
+
+    def ChatToBotWithStream(self, content: str) -> Iterator[str]:
+        chunks: List[list] = []
+        last = time.perf_counter()
+        try:
+            for chunk in self.llm.ChatToBotWithStream(content):
+                now = time.perf_counter()
+                chunks.append([round((now - last) * 1000, 1), chunk or ""])
+                last = now
+                yield chunk
+        except GeneratorExit:
+            # 调用方提前结束读取，记录不完整，不保存
+            raise
+        except Exception as e:
+            chunks.append([round((time.perf_counter() - last) * 1000, 1), ""])
+            self._record(content, True, chunks, e)
+            raise
+        self._record(content, True, chunks)
+        self._track("user", content)
+        self._track("assistant", "".join(chunk for _, chunk in chunks))
+
+
+class _ReplayIndex:
+    """按请求哈希与提示词类别索引的录制记录，同一键有多条记录时依次轮换"""
+
+    def __init__(self, records: List[dict]):
+        self.by_key: Dict[str, List[dict]] = defaultdict(list)
+        self.by_kind: Dict[str, List[dict]] = defaultdict(list)
+        for record in records:
+            self.by_key[record["key"]].append(record)
+            self.by_kind[record["kind"]].append(record)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _next(self, name: str, candidates: List[dict]) -> dict:
+        with self._lock:
+            index = self._cursors[name]
+            self._cursors[name] = index + 1
+        return candidates[index % len(candidates)]
+
+    def find(self, key: str, kind: str, miss: str) -> Optional[dict]:
+        if key in self.by_key:
+            return self._next(f"key:{key}", self.by_key[key])
+        if miss == "nearest" and kind in self.by_kind:
+            return self._next(f"kind:{kind}", self.by_kind[kind])
+        return None
+
+
+_indexes: Dict[str, _ReplayIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_replay_index(path: str) -> _ReplayIndex:
+    if path not in _indexes:
+        with _indexes_lock:
+            if path not in _indexes:
+                _indexes[path] = _ReplayIndex(get_fixture_store(path).load())
+    return _indexes[path]
+
+
+class ReplayLLM(_MessageTracker, LLM):
+    """按录制结果返回响应的离线提供商，耗时按原始记录缩放"""
+
+    def __init__(self, path: Optional[str] = None, time_scale: Optional[float] = None, miss: Optional[str] = None):
+        self.path = path or settings.LLM_REPLAY_DIR
+        if not self.path:
+            raise ValueError("使用REPLAY提供商时必须配置LLM_REPLAY_DIR")
+        self.time_scale = settings.LLM_REPLAY_TIME_SCALE if time_scale is None else time_scale
+        self.miss = (miss or settings.LLM_REPLAY_MISS).lower()
+        self.messages: List[dict] = []
+        self.model = "replay"
+
+    def probe(self, timeout: float = 5.0):
+        if not get_replay_index(self.path).by_key:
+            raise RuntimeError(f"录制目录中没有可回放的记录: {self.path}")
+
+    def setPrompt(self, prompt: str):
+        self._track("system", prompt)
+
+    def addHistory_User(self, content):
+        self._track("user", content)
+
+    def addHistory_Assistant(self, content):
+        self._track("assistant", content)
+
+    def addHistory(self, messages):
+        self.messages.extend(messages)
+
+    def _find(self, content: str) -> dict:
+        key = request_key(self.messages, content)
+        record = get_replay_index(self.path).find(key, request_kind(self.messages, content), self.miss)
+        if record is None:
+            raise LookupError(f"没有与请求匹配的录制记录: {key}")
+        self.model = record.get("model") or "replay"
+        return record
+
+    def _wait(self, delay_ms: float):
+        if self.time_scale > 0 and delay_ms > 0:
+            time.sleep(delay_ms / 1000 * self.time_scale)
+
+    def ChatToBot(self, content: str):
+        record = self._find(content)
+        self._wait(sum(delay for delay, _ in record["chunks"]))
+        if "error" in record:
+            raise RuntimeError(f"回放录制的调用失败: {record['error']}")
+        response = "".join(chunk for _, chunk in record["chunks"])
+        self._track("user", content)
+        self._track("assistant", response)
+        return response
+
+    def ChatToBotWithStream(self, content: str) -> Iterator[str]:
+        record = self._find(content)
+        for delay, chunk in record["chunks"]:
+            self._wait(delay)
+            if chunk:
+                yield chunk
+        if "error" in record:
+            raise RuntimeError(f"回放录制的调用失败: {record['error']}")
+        self._track("user", content)
+        self._track("assistant", "".join(chunk for _, chunk in record["chunks"]))
@@ -8,7 +8,10 @@ from .llm import LLM
 class SiliconFlowLLM(LLM):
     def __init__(self, api_key: str=llm_Settings.SILICONFLOW_API_KEY, 
                  base_url: str=llm_Settings.SILICONFLOW_BASE_URL, 
-                 model: str=llm_Settings.SILICONFLOW_MODEL) -> None:
+                 model: str=llm_Settings.SILICONFLOW_MODEL,
+                 client: Optional[requests.Session]=None) -> None:
+        # 共享的Session复用HTTP连接，避免每次请求重新握手
+        self.session = client or requests.Session()
         self.api_key = api_key
         self.base_url = base_url if base_url.endswith("/") else base_url + "/"
         self.url = f"{self.base_url}v1/chat/completions"
@@ -19,6 +22,15 @@ class SiliconFlowLLM(LLM):
             "Content-Type": "application/json"
         }
 
+    @classmethod
+    def build_client(cls):
+        return requests.Session()
+
+    def probe(self, timeout: float = 5.0):
+        response = self.session.get(f"{self.base_url}v1/models", headers=self.headers, timeout=timeout)
+        if response.status_code != 200:
+            raise Exception(f"API错误: {response.status_code} - {response.text}")
+
     def setPrompt(self, prompt: str):
         message = {"role": "system", "content": prompt}
         self.messages.append(message)
@@ -47,7 +59,7 @@ class SiliconFlowLLM(LLM):
             "top_k": 50
         }
         
-        response = requests.post(self.url, json=payload, headers=self.headers)
+        response = self.session.post(self.url, json=payload, headers=self.headers)
         
         if response.status_code != 200:
             raise Exception(f"API错误: {response.status_code} - {response.text}")
@@ -70,7 +82,7 @@ class SiliconFlowLLM(LLM):
             "top_k": 50
         }
         
-        response = requests.post(self.url, json=payload, headers=self.headers, stream=True)
+        response = self.session.post(self.url, json=payload, headers=self.headers, stream=True)
         
         if response.status_code != 200:
             raise Exception(f"API错误: {response.status_code} - {response.text}")
@@ -84,7 +96,9 @@ class SiliconFlowLLM(LLM):
                         break
                     try:
                         chunk = json.loads(data)
-                        delta = chunk["choices"][0]["delta"]
+                        if not chunk.get("choices"):
+                            continue
+                        delta = chunk["choices"][0].get("delta", {})
                         if "content" in delta and delta["content"] is not None:
                             yield delta["content"]
                     except json.JSONDecodeError:
@@ -1,31 +1,97 @@
+import atexit
 import logging
 import os
-from datetime import datetime
+import queue
+import zlib
+from logging.handlers import QueueListener
+
+from config.configs import settings
+from core.logger.context import get_request_id
+from core.logger.handlers import AsyncQueueHandler, JsonLinesFormatter, SizeAndTimeRotatingFileHandler
+from core.metrics import registry
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+def claim_worker_index(log_dir: str, workers: int):
+    """
+    为当前worker进程取得稳定的序号，返回(序号, 锁文件)
+
+    依次尝试锁定{log_dir}/api.{i}.lock，第一个未被占用的即为本进程的序号。锁在进程退出时自动释放，
+    重启的worker复用空出的序号，日志文件数不随进程号增长。无法加锁时返回(None, None)。
+    """
+    if fcntl is None:
+        return None, None
+    # 优雅重启时新旧worker可能短暂并存，多留出一倍的序号
+    for index in range(workers * 2):
+        lock_file = open(os.path.join(log_dir, f"api.{index}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return index, lock_file
+        except OSError:
+            lock_file.close()
+    return None, None
 
 class ApiLogger:
     def __init__(self):
         # 确保日志目录存在
-        log_dir = "logs"
+        log_dir = settings.LOG_DIR
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
         
-        # 创建日志文件名，包含日期
-        log_filename = f"{log_dir}/api_{datetime.now().strftime('%Y%m%d')}.log"
+        # 多worker部署时每个进程按worker序号写各自的文件，避免轮转时互相覆盖
+        self._index_lock = None
+        if settings.SERVER_WORKERS > 1:
+            index, self._index_lock = claim_worker_index(log_dir, settings.SERVER_WORKERS)
+            log_filename = f"{log_dir}/api.{os.getpid() if index is None else index}.log"
+        else:
+            log_filename = f"{log_dir}/api.log"
         
         # 配置日志格式
         self.logger = logging.getLogger("api_logger")
-        self.logger.setLevel(logging.INFO)
+        self.logger.setLevel(settings.LOG_LEVEL.upper())
+        self.logger.propagate = False
         
-        # 添加文件处理器
-        file_handler = logging.FileHandler(log_filename, encoding='utf-8')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
+        # 文件处理器在后台线程中运行：按大小与时间轮转，每行一条JSON
+        file_handler = SizeAndTimeRotatingFileHandler(
+            log_filename,
+            max_bytes=settings.LOG_MAX_BYTES,
+            interval=settings.LOG_ROTATE_HOURS * 3600,
+            backup_count=settings.LOG_BACKUP_COUNT,
+        )
+        file_handler.setFormatter(JsonLinesFormatter(max_field_chars=settings.LOG_MAX_FIELD_CHARS))
         
         # 如果logger已经有handlers，先清除
         if self.logger.handlers:
             self.logger.handlers.clear()
         
-        self.logger.addHandler(file_handler)
+        # 请求路径上只把记录放入队列
+        self.queue_handler = AsyncQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        self.logger.addHandler(self.queue_handler)
+        self.listener = QueueListener(self.queue_handler.queue, file_handler, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)
+    
+    def stop(self):
+        """写完队列中剩余的日志并停止后台线程"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+    
+    @property
+    def dropped(self) -> int:
+        """队列已满而丢弃的日志条数"""
+        return self.queue_handler.dropped
+    
+    def _sampled(self) -> bool:
+        # 按关联ID决定是否保留完整载荷，同一请求的请求与响应日志结果一致
+        rate = settings.LOG_PAYLOAD_SAMPLE_RATE
+        if rate <= 0:
+            return False
+        if rate >= 1:
+            return True
+        return zlib.crc32(get_request_id().encode()) % 10000 < rate * 10000
     
     def info(self, message):
         """记录信息级别的日志"""
@@ -36,16 +102,26 @@ class ApiLogger:
         self.logger.error(message)
     
     def log_request(self, endpoint, request_data):
-        """记录API请求"""
-        self.info(f"REQUEST - {endpoint} - {request_data}")
+        """记录API请求，载荷在后台线程中按配置截断"""
+        self.logger.info(f"REQUEST - {endpoint}", extra={
+            "event": "request", "endpoint": endpoint, "payload": request_data, "sampled": self._sampled(),
+        })
     
     def log_response(self, endpoint, response_data, status_code=200):
         """记录API响应"""
-        self.info(f"RESPONSE - {endpoint} - Status: {status_code} - {response_data}")
+        self.logger.info(f"RESPONSE - {endpoint} - Status: {status_code}", extra={
+            "event": "response", "endpoint": endpoint, "status": status_code, "payload": response_data,
+            "sampled": self._sampled(),
+        })
     
     def log_error(self, endpoint, error_message, status_code=500):
         """记录API错误"""
-        self.error(f"ERROR - {endpoint} - Status: {status_code} - {error_message}")
+        self.logger.error(f"ERROR - {endpoint} - Status: {status_code} - {error_message}", extra={
+            "event": "error", "endpoint": endpoint, "status": status_code,
+        })
 
 # 创建一个全局日志记录器实例
 api_logger = ApiLogger()
+
+registry.callback("vocabverse_log_queue_depth", "等待写入的日志条数", "gauge", api_logger.queue_handler.queue.qsize)
+registry.callback("vocabverse_log_dropped_total", "日志队列已满而丢弃的条数", "counter", lambda: api_logger.dropped)
@@ -0,0 +1,52 @@
+import re
+import uuid
+from contextvars import ContextVar
+
+# 当前请求的关联ID，由RequestIDMiddleware设置，日志记录时自动附带
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# 只接受简单字符的外部ID，避免日志注入
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def get_request_id() -> str:
+    return request_id_var.get()
+
+
+class RequestIDMiddleware:
+    """
+    为每个请求设置关联ID
+
+    优先沿用客户端或网关传入的X-Request-ID，否则生成一个新的ID，
+    并在响应头中返回，便于把前端报错、网关日志与服务端日志对应起来。
+    """
+
+    def __init__(self, app, header: str = "X-Request-ID"):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                request_id = value.decode("latin-1")
+                break
+        if not request_id or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
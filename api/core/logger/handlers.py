@@ -0,0 +1,107 @@
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from core.logger.context import get_request_id
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    请求线程中只做入队
+
+    关联ID等上下文在入队时捕获，JSON序列化、载荷截断与写文件都交给QueueListener的后台线程；
+    队列满时直接丢弃并计数，日志写入变慢不会拖慢请求。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = get_request_id()
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，超长的字符串与列表按上限截断"""
+
+    def __init__(self, max_field_chars: int = 512, max_items: int = 50):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+        self.max_items = max_items
+
+    def truncate(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if self.max_field_chars and len(value) > self.max_field_chars:
+                return f"{value[:self.max_field_chars]}...(+{len(value) - self.max_field_chars} chars)"
+            return value
+        if isinstance(value, dict):
+            return {str(k): self.truncate(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            items = [self.truncate(v) for v in value[:self.max_items]]
+            if len(value) > self.max_items:
+                items.append(f"...(+{len(value) - self.max_items} items)")
+            return items
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        return self.truncate(str(value))
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for field in ("event", "endpoint", "status"):
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if hasattr(record, "payload"):
+            payload = record.payload
+            if hasattr(payload, "model_dump"):
+                payload = payload.model_dump(mode="json")
+            # 抽样命中的请求保留完整载荷
+            entry["payload"] = payload if getattr(record, "sampled", False) else self.truncate(payload)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """文件超过max_bytes或距上次轮转超过interval秒时轮转，保留backup_count个历史文件"""
+
+    def __init__(self, filename: str, max_bytes: int, interval: float, backup_count: int):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+        if self.maxBytes <= 0:
+            return False
+        # 按当前文件大小判断，不像父类那样为估算长度再格式化一次记录
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() >= self.maxBytes
+
+    def doRollover(self):
+        super().doRollover()
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
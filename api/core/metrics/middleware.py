@@ -0,0 +1,47 @@
+import time
+
+from core.metrics import registry
+
+http_request_duration = registry.histogram(
+    "vocabverse_http_request_duration_seconds", "HTTP请求耗时", ("method", "handler", "status"),
+)
+http_requests_in_flight = registry.gauge("vocabverse_http_requests_in_flight", "正在处理的HTTP请求数")
+
+
+class MetricsMiddleware:
+    """
+    按路由统计请求耗时
+
+    标签使用匹配到的路由名称（即处理函数名，如word2passage），而不是原始URL；
+    嵌套路由下路由对象只保存相对路径，名称则在全应用内唯一。
+    未匹配任何路由的请求归入"unmatched"，避免标签基数随扫描请求无限增长。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                handler=getattr(route, "name", None) or "unmatched",
+                status=status[0],
+            )
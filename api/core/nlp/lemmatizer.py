@@ -0,0 +1,124 @@
+from typing import Iterable, List, Optional, Set
+
+# 常见不规则变化，映射到原形
+IRREGULAR_FORMS = {
+    "am": "be", "is": "be", "are": "be", "was": "be", "were": "be", "been": "be", "being": "be",
+    "has": "have", "had": "have", "having": "have",
+    "does": "do", "did": "do", "done": "do",
+    "went": "go", "gone": "go", "goes": "go",
+    "made": "make", "said": "say", "took": "take", "taken": "take",
+    "came": "come", "saw": "see", "seen": "see", "knew": "know", "known": "know",
+    "got": "get", "gotten": "get", "gave": "give", "given": "give",
+    "found": "find", "thought": "think", "told": "tell", "became": "become",
+    "left": "leave", "felt": "feel", "brought": "bring", "began": "begin", "begun": "begin",
+    "kept": "keep", "held": "hold", "wrote": "write", "written": "write",
+    "stood": "stand", "heard": "hear", "meant": "mean", "met": "meet",
+    "ran": "run", "paid": "pay", "sat": "sit", "spoke": "speak", "spoken": "speak",
+    "led": "lead", "grew": "grow", "grown": "grow", "lost": "lose", "fell": "fall", "fallen": "fall",
+    "sent": "send", "built": "build", "understood": "understand", "drew": "draw", "drawn": "draw",
+    "broke": "break", "broken": "break", "spent": "spend", "rose": "rise", "risen": "rise",
+    "drove": "drive", "driven": "drive", "bought": "buy", "wore": "wear", "worn": "wear",
+    "chose": "choose", "chosen": "choose", "sought": "seek", "caught": "catch", "taught": "teach",
+    "fought": "fight", "threw": "throw", "thrown": "throw", "ate": "eat", "eaten": "eat",
+    "flew": "fly", "flown": "fly", "forgot": "forget", "forgotten": "forget",
+    "children": "child", "men": "man", "women": "woman", "people": "person",
+    "feet": "foot", "teeth": "tooth", "mice": "mouse", "geese": "goose",
+    "better": "good", "best": "good", "worse": "bad", "worst": "bad",
+}
+
+# 以这些结尾的词通常不是复数形式（glass、bus、analysis）
+_NON_PLURAL_ENDINGS = ("ss", "us", "is")
+_VOWELS = set("aeiou")
+# 以s结尾、本身就是原形的常见词，不是其他词的复数或第三人称形式（news不是new的变化）
+NOT_INFLECTED = frozenset({
+    "always", "perhaps", "news", "series", "species", "means", "lens", "physics", "mathematics",
+    "economics", "politics", "athletics", "gymnastics", "electronics", "measles", "thanks", "whereas",
+    "besides", "towards", "afterwards", "upstairs", "downstairs", "indoors", "outdoors", "overseas",
+    "sometimes", "yes", "his", "its", "this", "us", "bus", "gas", "plus", "chaos", "canvas", "bias",
+})
+# 形容词比较级与最高级：词表还原时可用，匹配原文时不视为目标词的变化形式
+_DEGREE_FORMS = frozenset({"better", "best", "worse", "worst"})
+
+
+def inflections(base: str) -> Set[str]:
+    """
+    生成原形的屈折形式：复数或第三人称单数（-s/-es/-ies）、过去式（-ed/-ied）、现在分词（-ing），以及不规则变化
+
+    不含-er/-est等派生形式（teach与teacher、flow与flower是不同的词），也不含NOT_INFLECTED中的词。
+    按规则生成的形式可能多于实际存在的形式，只用于在原文中查找，不用于生成文本。
+    """
+    base = base.lower()
+    forms: Set[str] = {form for form, lemma in IRREGULAR_FORMS.items() if lemma == base and form not in _DEGREE_FORMS}
+    if len(base) < 2 or not base.isalpha():
+        return forms - NOT_INFLECTED
+    consonant_y = base.endswith("y") and base[-2] not in _VOWELS
+    stem = base[:-1] if consonant_y else base
+    forms.add(stem + "ies" if consonant_y else base + "s")
+    if base.endswith(("s", "x", "z", "ch", "sh", "o")):
+        forms.add(base + "es")
+    forms.add(stem + "ied" if consonant_y else base + ("d" if base.endswith("e") else "ed"))
+    if base.endswith("ie"):
+        forms.add(base[:-2] + "ying")
+    elif base.endswith("e") and not base.endswith("ee"):
+        forms.add(base[:-1] + "ing")
+    else:
+        forms.add(base + "ing")
+    # 辅音-元音-辅音结尾时双写末尾辅音：stop -> stopped、stopping
+    if len(base) >= 3 and base[-1] not in _VOWELS and base[-1] not in "wxy" \
+            and base[-2] in _VOWELS and base[-3] not in _VOWELS:
+        forms.update({base + base[-1] + "ed", base + base[-1] + "ing"})
+    forms.discard(base)
+    return forms - NOT_INFLECTED
+
+
+class Lemmatizer:
+    """
+    基于规则的轻量英文词形还原
+
+    提供词表时，只接受词表中存在的候选原形；未提供词表时lemmatize保持原词不变，
+    candidates生成的候选仅供调用方结合其他信息（如词表、原文）确认后使用。
+    """
+
+    def __init__(self, vocabulary: Optional[Iterable[str]] = None):
+        self.vocabulary: Optional[Set[str]] = {word.lower() for word in vocabulary} if vocabulary else None
+
+    def candidates(self, word: str) -> List[str]:
+        """按可能性从高到低生成候选原形（不含词本身）"""
+        result: List[str] = []
+        if word in IRREGULAR_FORMS:
+            result.append(IRREGULAR_FORMS[word])
+        if len(word) > 4 and word.endswith("ies"):
+            result.append(word[:-3] + "y")
+        if len(word) > 3 and word.endswith("es"):
+            result.append(word[:-2])
+        if len(word) > 3 and word.endswith("s") and not word.endswith(_NON_PLURAL_ENDINGS):
+            result.append(word[:-1])
+        for suffix in ("ing", "ed"):
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                stem = word[:-len(suffix)]
+                result.append(stem)
+                result.append(stem + "e")
+                # 双写辅音：stopped -> stop, running -> run
+                if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in _VOWELS:
+                    result.append(stem[:-1])
+                if suffix == "ed" and stem.endswith("i"):
+                    result.append(stem[:-1] + "y")
+        for suffix in ("er", "est"):
+            if len(word) > len(suffix) + 3 and word.endswith(suffix):
+                stem = word[:-len(suffix)]
+                result.append(stem)
+                if stem.endswith("i"):
+                    result.append(stem[:-1] + "y")
+        return result
+
+    def lemmatize(self, word: str) -> str:
+        lower = word.lower()
+        if self.vocabulary is not None:
+            if lower in self.vocabulary:
+                return lower
+            for candidate in self.candidates(lower):
+                if candidate in self.vocabulary:
+                    return candidate
+            return lower
+        # 无词表时无法确认候选原形是否真实存在（news、series、physics、people本身就是词条），保持原样
+        return lower
@@ -0,0 +1,163 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from core.nlp.lemmatizer import NOT_INFLECTED, Lemmatizer, inflections
+
+# 句末标点后（可跟引号、括号），空白之后以大写字母、数字或引号开头时视为新句子
+_SENTENCE_BOUNDARY = re.compile(r"[.!?。！？][\"'”’)\]]*(\s+)(?=[\"'“‘(\[A-Z0-9])")
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n|\n(?=\s*[-*#>\d])")
+# 以这些缩写结尾时句点不是句末
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc", "e.g", "i.e", "u.s", "u.k",
+    "fig", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+_LAST_TOKEN = re.compile(r"([A-Za-z.]+)\.$")
+
+
+class Sentence(NamedTuple):
+    paragraph: int   # 所在段落序号，从0开始
+    index: int       # 在全文中的句子序号
+    text: str
+
+
+def split_paragraphs(text: str) -> List[str]:
+    return [paragraph.strip() for paragraph in _PARAGRAPH_BOUNDARY.split(text.replace("\\n", "\n")) if paragraph.strip()]
+
+
+def chunk_paragraphs(text: str, max_chars: int) -> List[str]:
+    """按段落把文章合并为若干块，每块不超过max_chars个字符（单个段落超长时自成一块）"""
+    chunks: List[List[str]] = []
+    size = 0
+    for paragraph in split_paragraphs(text):
+        if chunks and size + len(paragraph) <= max_chars:
+            chunks[-1].append(paragraph)
+            size += len(paragraph)
+        else:
+            chunks.append([paragraph])
+            size = len(paragraph)
+    return ["\n\n".join(chunk) for chunk in chunks]
+
+
+def split_sections(text: str, parts: int) -> List[str]:
+    """按段落把文章切为最多parts个长度相近的连续部分，段落数不足时部分数相应减少"""
+    paragraphs = split_paragraphs(text)
+    parts = max(min(parts, len(paragraphs)), 1)
+    target = sum(len(paragraph) for paragraph in paragraphs) / parts
+    sections: List[List[str]] = [[]]
+    size = 0
+    for index, paragraph in enumerate(paragraphs):
+        remaining = len(paragraphs) - index
+        # 当前部分已达到平均长度，或剩余段落恰好够每个部分分到一段时，开始新的部分
+        if sections[-1] and len(sections) < parts and (size >= target or remaining == parts - len(sections)):
+            sections.append([])
+            size = 0
+        sections[-1].append(paragraph)
+        size += len(paragraph)
+    return ["\n\n".join(section) for section in sections]
+
+
+def split_sentences(text: str) -> List[Sentence]:
+    """
+    将文章切分为句子
+
+    按段落切分后再按句末标点切分，常见缩写（Dr.、e.g.、U.S.）后的句点不断句。
+    LLM生成的文章中换行有时是字面量"\\n"，同样视为换行。
+    """
+    sentences: List[Sentence] = []
+    for paragraph_index, paragraph in enumerate(split_paragraphs(text)):
+        pieces, start = [], 0
+        for match in _SENTENCE_BOUNDARY.finditer(paragraph):
+            pieces.append(paragraph[start:match.start(1)])
+            start = match.end(1)
+        pieces.append(paragraph[start:])
+        buffer = ""
+        for piece in pieces:
+            buffer = f"{buffer} {piece}" if buffer else piece
+            match = _LAST_TOKEN.search(buffer.rstrip("\"'”’)]"))
+            if match and match.group(1).lower() in _ABBREVIATIONS:
+                continue
+            sentences.append(Sentence(paragraph_index, len(sentences), buffer.strip()))
+            buffer = ""
+        if buffer:
+            sentences.append(Sentence(paragraph_index, len(sentences), buffer.strip()))
+    return sentences
+
+
+_TOKEN = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*")
+_CANDIDATES = Lemmatizer()
+
+
+def locate_words(sentences: List[Sentence], words: Iterable[str], base_forms: bool = True) -> Dict[str, List[int]]:
+    """
+    查找每个目标词出现在哪些句子中
+
+    单词按原形及其屈折形式匹配（parade能匹配parades、paraded），不匹配派生词（flow不匹配flower）；
+    词组按小写子串匹配。base_forms为False时，变化形式的目标词（gauges）不匹配文中的原形（gauge）。
+
+    Returns:
+        dict: 目标词 -> 句子序号列表（按出现顺序），未出现的词对应空列表
+    """
+    words = [word for word in dict.fromkeys(word.strip() for word in words) if word]
+    single = {word.lower(): word for word in words if " " not in word}
+    tokens = [[token.lower() for token in _TOKEN.findall(sentence.text)] for sentence in sentences]
+    # 词形 -> 目标词，目标词本身优先于其他目标词的变化形式
+    forms: Dict[str, str] = dict((lower, word) for lower, word in single.items())
+    for lower, word in single.items():
+        for form in inflections(lower):
+            forms.setdefault(form, word)
+    # 目标词本身给的是变化形式（gauges）时，文中的原形（gauge）也应匹配：
+    # 只采用在文中出现、且目标词确实是其屈折形式的候选原形
+    present = {token for sentence_tokens in tokens for token in sentence_tokens} if base_forms else set()
+    for lower, word in single.items():
+        if lower in NOT_INFLECTED:
+            continue
+        for base in _CANDIDATES.candidates(lower):
+            if base in present and base not in forms and lower in inflections(base):
+                forms[base] = word
+                for form in inflections(base):
+                    forms.setdefault(form, word)
+    phrases = [word for word in words if " " in word]
+    located: Dict[str, List[int]] = {word: [] for word in words}
+    for sentence, sentence_tokens in zip(sentences, tokens):
+        found: Set[str] = {forms[token] for token in sentence_tokens if token in forms}
+        lower = sentence.text.lower()
+        found.update(phrase for phrase in phrases if phrase.lower() in lower)
+        for word in found:
+            located[word].append(sentence.index)
+    return located
+
+
+class PassageAnalysis(NamedTuple):
+    sentences: List[Sentence]
+    located: Dict[str, List[int]]   # 目标词 -> 所在句子序号
+
+    def contexts(self, max_per_word: int = 3, words: Optional[Iterable[str]] = None) -> str:
+        """
+        生成紧凑的单词语境，代替全文放入解析提示词
+
+        每个目标词最多取前max_per_word个所在句子，多个词共用的句子只列出一次；
+        words指定时只生成其中各词的语境（用于分片）。格式如:
+            S1（第1段）: December has always been ...
+            parade: S1
+            gauge: 未在文中找到
+        """
+        words = self.located if words is None else words
+        chosen = {word: self.located.get(word, [])[:max_per_word] for word in words}
+        used = sorted({index for indexes in chosen.values() for index in indexes})
+        lines = [f"S{index + 1}（第{self.sentences[index].paragraph + 1}段）: {self.sentences[index].text}"
+                 for index in used]
+        lines.append("")
+        for word, indexes in chosen.items():
+            positions = ", ".join(f"S{index + 1}" for index in indexes) if indexes else "未在文中找到"
+            lines.append(f"{word}: {positions}")
+        return "\n".join(lines)
+
+    @property
+    def missing(self) -> List[str]:
+        return [word for word, indexes in self.located.items() if not indexes]
+
+
+def analyze_passage(passage: str, words: Iterable[str], base_forms: bool = True) -> PassageAnalysis:
+    """切分句子并定位每个目标词（含屈折变化）所在的句子"""
+    sentences = split_sentences(passage)
+    return PassageAnalysis(sentences, locate_words(sentences, words, base_forms))
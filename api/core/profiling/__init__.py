@@ -0,0 +1,214 @@
+import json
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from config.configs import settings
+
+# 项目根目录，用于缩短栈帧中的文件路径
+_API_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB_ROOT = sysconfig.get_paths()["stdlib"]
+
+Stack = Tuple[str, ...]
+
+
+class ProfileSession:
+    """一个被剖析的请求：参与该请求的线程集合，以及采样得到的调用栈计数"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        # 文件名使用服务端生成的ID：请求ID可由客户端指定，重复时会覆盖之前的剖析结果
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.threads: Set[int] = {threading.get_ident()}
+        self.stacks: Counter = Counter()
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+        self.samples = 0
+
+
+_current_session: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+
+def note_thread():
+    """
+    把当前线程加入正在剖析的请求
+
+    同步接口在线程池中执行，由请求内的代码（如追踪span）调用，使采样器同时覆盖这些线程。
+    """
+    session = _current_session.get()
+    if session is not None:
+        session.threads.add(threading.get_ident())
+
+
+class SamplingProfiler:
+    """
+    基于sys._current_frames的采样剖析器
+
+    后台线程按固定间隔读取被剖析请求所在线程的调用栈，不需要在被测代码中插桩，
+    也不像确定性剖析那样拖慢每一次函数调用。没有请求被剖析时后台线程处于等待状态。
+    异步接口在事件循环线程上执行，同一时刻其他请求的协程也可能出现在采样中。
+    """
+
+    def __init__(self, interval: float = 0.005, max_sessions: int = 1):
+        self.interval = interval
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: List[ProfileSession] = []
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def start_session(self, request_id: str) -> Optional[ProfileSession]:
+        """开始剖析当前请求，同时剖析的请求已达上限时返回None"""
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            session = ProfileSession(request_id)
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return session
+
+    def stop_session(self, session: ProfileSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+            if not self._sessions:
+                self._wakeup.clear()
+        session.duration = time.perf_counter() - session.started_at
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(_API_ROOT):
+                filename = os.path.relpath(filename, _API_ROOT)
+            elif "site-packages" in filename:
+                filename = filename.split("site-packages" + os.sep, 1)[1]
+            elif filename.startswith(_STDLIB_ROOT):
+                filename = os.path.relpath(filename, _STDLIB_ROOT)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame) -> Stack:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                sessions = list(self._sessions)
+            if sessions:
+                frames = sys._current_frames()
+                for session in sessions:
+                    for ident in list(session.threads):
+                        frame = frames.get(ident)
+                        if frame is None or ident == own:
+                            continue
+                        # 事件循环空闲等待IO的采样不计入
+                        if frame.f_code.co_filename.endswith("selectors.py"):
+                            continue
+                        session.stacks[self._stack(frame)] += 1
+                        session.samples += 1
+                del frames
+            time.sleep(self.interval)
+
+
+class HotFunctionAggregate:
+    """最近若干次剖析结果中最热的函数（按自身耗时，即位于栈顶的采样数）"""
+
+    def __init__(self, window: int = 50):
+        self._lock = threading.Lock()
+        self._profiles: Deque[Tuple[str, Counter, int]] = deque(maxlen=window)
+
+    def add(self, session: ProfileSession):
+        leaves = Counter()
+        for stack, count in session.stacks.items():
+            if stack:
+                leaves[stack[-1]] += count
+        with self._lock:
+            self._profiles.append((session.request_id, leaves, session.samples))
+
+    def top(self, n: int = 20) -> dict:
+        with self._lock:
+            profiles = list(self._profiles)
+        total = Counter()
+        samples = 0
+        for _, leaves, count in profiles:
+            total.update(leaves)
+            samples += count
+        return {
+            "profiles": len(profiles),
+            "samples": samples,
+            "request_ids": [request_id for request_id, _, _ in profiles],
+            "top": [
+                {"function": name, "samples": count, "ratio": round(count / samples, 4) if samples else 0.0}
+                for name, count in total.most_common(n)
+            ],
+        }
+
+
+def to_collapsed(session: ProfileSession) -> str:
+    """折叠栈格式（每行"栈帧;栈帧;... 次数"），可直接交给flamegraph.pl或speedscope"""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in session.stacks.most_common())
+
+
+def to_speedscope(session: ProfileSession, interval: float) -> dict:
+    frames: List[dict] = []
+    index: Dict[str, int] = {}
+    samples, weights = [], []
+    for stack, count in session.stacks.items():
+        sample = []
+        for label in stack:
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(round(count * interval * 1000, 3))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": session.request_id,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 3),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": session.request_id,
+        "activeProfileIndex": 0,
+        "exporter": "vocabverse",
+    }
+
+
+def write_profile(session: ProfileSession, directory: str, interval: float) -> str:
+    """写出折叠栈与speedscope两种格式（以profile_id命名），返回文件名前缀"""
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, session.profile_id)
+    with open(f"{prefix}.collapsed", "w", encoding="utf-8") as f:
+        f.write(to_collapsed(session))
+    with open(f"{prefix}.speedscope.json", "w", encoding="utf-8") as f:
+        json.dump(to_speedscope(session, interval), f, ensure_ascii=False)
+    return prefix
+
+
+profiler = SamplingProfiler(interval=settings.PROFILE_INTERVAL_MS / 1000, max_sessions=settings.PROFILE_MAX_CONCURRENT)
+hot_functions = HotFunctionAggregate(window=settings.PROFILE_AGGREGATE_WINDOW)
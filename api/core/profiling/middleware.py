@@ -0,0 +1,72 @@
+import asyncio
+import hmac
+import random
+
+from config.configs import settings
+from core.logger import api_logger
+from core.logger.context import get_request_id
+from core.profiling import _current_session, hot_functions, profiler, write_profile
+
+
+def is_admin_token(token: str) -> bool:
+    """校验管理令牌；未配置PROFILE_ADMIN_TOKEN时一律拒绝"""
+    return bool(settings.PROFILE_ADMIN_TOKEN) and hmac.compare_digest(token, settings.PROFILE_ADMIN_TOKEN)
+
+
+class ProfilingMiddleware:
+    """
+    按需剖析单个请求
+
+    请求头X-Profile携带管理令牌时剖析该请求，另外按PROFILE_SAMPLE_RATE随机抽样；
+    结果以服务端生成的剖析ID（时间戳加随机后缀）命名写入PROFILE_DIR，并计入最热函数的滚动统计，
+    响应头X-Profile-Id返回该ID，日志中同时记录请求ID。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == b"x-profile":
+                return is_admin_token(value.decode("latin-1"))
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = get_request_id()
+        session = profiler.start_session(request_id)
+        if session is None:
+            # 已有请求正在被剖析，本次正常处理
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", session.profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_session.set(session)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _current_session.reset(token)
+            profiler.stop_session(session)
+            hot_functions.add(session)
+            # 写文件放到线程中执行，不阻塞事件循环
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._write, session)
+
+    @staticmethod
+    def _write(session):
+        try:
+            prefix = write_profile(session, settings.PROFILE_DIR, profiler.interval)
+        except OSError as e:
+            api_logger.error(f"Profiling: failed to write profile {session.request_id}: {e}")
+            return
+        api_logger.info(f"Profiling: request {session.request_id}: {session.samples} samples in "
+                        f"{session.duration:.2f} seconds written to {prefix}")
@@ -1,7 +1,10 @@
 from jinja2 import Template
-from core.prompts.prompts import WORD2PASSAGE, WORD2TRANSLATION, PASSAGE2QUESTION
+from core.prompts.prompts import WORD2PASSAGE
 import json
 import re
+import threading
+from typing import Dict
+from core.tracing import span, traced
 
 class PromptTemplate:
     def __init__(self, template: str, input_variables):
@@ -9,8 +12,29 @@ class PromptTemplate:
         self.input_variables = input_variables
     
     def render(self, **kwargs) -> str:
-        return self.template.render(**kwargs)
+        with span("prompt.render"):
+            return self.template.render(**kwargs)
 
+# 模板源码 -> 编译后的PromptTemplate，同一模板只编译一次
+_template_cache: Dict[str, PromptTemplate] = {}
+_template_cache_lock = threading.Lock()
+
+def get_prompt_template(template: str) -> PromptTemplate:
+    prompt_template = _template_cache.get(template)
+    if prompt_template is None:
+        with _template_cache_lock:
+            prompt_template = _template_cache.get(template)
+            if prompt_template is None:
+                prompt_template = PromptTemplate(template, {})
+                _template_cache[template] = prompt_template
+    return prompt_template
+
+def compile_templates():
+    """预编译全部内置模板，供启动预热调用（导入注册表即完成编译）"""
+    from core.prompts.registry import prompt_registry
+    return prompt_registry.names()
+
+@traced("parse.json")
 def text_to_json(text: str):
     # 去除可能存在的Markdown代码块标记
     text = text.strip()
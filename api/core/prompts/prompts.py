@@ -60,6 +60,77 @@ WORD2PASSAGE = """
 """
 
 
+WORD2OUTLINE = """
+你是一位专业的文章策划助手。一篇较长的文章将被分为{{ sections }}个部分分别写作，请先为它制定大纲：
+
+单词列表: {{ words }}
+文章类型: {{ article_type }}
+难度级别: {{ difficulty_level }}
+文章风格: {{ tone_style }}
+文章长度: 约{{ total_words }}词
+主题领域: {{ topic }}
+句子复杂度: {{ sentence_complexity }}（0-1之间，越高越复杂）
+
+请确保:
+1. 大纲恰好包含{{ sections }}个部分，各部分前后衔接，共同构成一篇完整的文章
+2. 每个给定单词分配到最适合的一个部分，每个部分分到的单词数量大致相当
+3. 每个部分的目标字数之和约为{{ total_words }}词
+4. style_notes写明全文共同遵守的写作约束（叙述人称、时态、主要人物或对象、语气），供各部分写作时统一风格
+
+请以JSON格式返回结果:
+```json
+{
+  "title": "文章标题",
+  "style_notes": "全文共同的写作约束",
+  "sections": [
+    {
+      "heading": "部分小标题（文章类型不需要小标题时留空）",
+      "summary": "该部分的内容概要，一到两句话",
+      "words": ["分配到该部分的单词"],
+      "word_count": 该部分的目标字数
+    }
+  ]
+}
+```
+##########################################################################
+输出:
+"""
+
+
+OUTLINE2SECTION = """
+你是一位专业的文章生成助手。你正在与其他作者分工写作同一篇文章，请只写作其中第{{ index }}部分（共{{ sections }}部分）：
+
+文章标题: {{ title }}
+文章类型: {{ article_type }}
+难度级别: {{ difficulty_level }}
+文章风格: {{ tone_style }}
+主题领域: {{ topic }}
+句子复杂度: {{ sentence_complexity }}（0-1之间，越高越复杂）
+共同写作约束: {{ style_notes }}
+
+全文大纲:
+{% for section in outline %}{{ loop.index }}. {% if section.heading %}{{ section.heading }}: {% endif %}{{ section.summary }}
+{% endfor %}
+本部分概要: {{ summary }}
+本部分必须使用的单词: {{ words }}
+本部分长度: 约{{ word_count }}词
+
+请确保:
+1. 只写作本部分的内容，{% if index > 1 %}开头自然承接第{{ index - 1 }}部分，{% endif %}{% if index < sections %}结尾为第{{ index + 1 }}部分留出过渡，{% else %}结尾为全文收束，{% endif %}不要重复其他部分的内容
+2. 自然地使用所有给定单词，必要时可灵活变化词形，并对给出单词加粗体处理
+3. 不要写文章标题；{% if heading %}以"### {{ heading }}"作为本部分的小标题{% else %}不要写小标题{% endif %}
+
+请以JSON格式返回结果:
+```json
+{
+  "content": "本部分的内容, markdown格式"
+}
+```
+##########################################################################
+输出:
+"""
+
+
 WORD2TRANSLATION = """
 【文本分析任务说明】
 请根据提供的单词和文章内容，完成以下深度解析：
@@ -164,18 +235,161 @@ WORD2TRANSLATION = """
 """
 
 
-PASSAGE2QUESTION = """
-Please design 5 high-quality English reading comprehension multiple-choice questions based on the following elements to comprehensively assess readers' mastery of vocabulary in context and deep text understanding:
+WORD2EXPLANATION = """
+【单词语境解析任务说明】
+以下只提供了文章中包含目标单词的句子（S编号为句子在全文中的序号，括号内为所在段落），请据此完成解析：
+
+一、单词语境解析
+请为每个目标单词提供：
+
+基本信息 - 词性/音标（标注重音）/基础词义
+
+语境义项 - 结合所给句子的具体含义及引申义
+
+搭配分析 - 该词在句中出现的搭配结构（标注出现段落）
+例：
+[Resilience]
+▶ 词性：n. /rɪˈzɪliəns/
+▶ 文中含义：指经济体系在遭受冲击后的恢复能力（第3段）
+▶ 典型搭配：demonstrate remarkable resilience（展现非凡韧性）
+
+标注为"未在文中找到"的单词，按最常用的义项解析，不标注段落。
+
+{% if include_phrases is not defined or include_phrases %}
+二、关键词组提取
+请从所给句子中识别5-8个具有学习价值的词组：
+专业术语
+惯用表达
+高频搭配
+每个词组提供：
+结构解析
+语用功能
+仿写例句
+{% else %}
+只解析待解析单词，不需要额外提取词组。
+{% endif %}
+
+########################################################################
+请你按如下格式输出:
+```json
+{
+    "language_points":[
+        {"word":"单词或词组", "explanation":"单词的翻译或者词组搭配说明,用markdown格式"}
+    ]
+}
+```
+########################################################################
+示例输入:
+待解析单词:commodity,parade,gauge,bounce
+单词所在句子:
+S1（第1段）: **December** has always been a critical **commodity** sales season, but this year's shopping **parade** reveals shifting consumer priorities.
+S2（第1段）: Retail analysts use the **gauge** of foot traffic and online clicks to track spending patterns, noting that **she**-economy demographics are driving **rarely** seen purchasing behaviors.
+S5（第2段）: Vinyl records have made a remarkable **bounce** back, with collectors **recede**-ing from digital platforms to embrace tactile nostalgia.
+
+commodity: S1
+parade: S1
+gauge: S2
+bounce: S5
+########################################################################
+示例输出:
+```json
+{
+    "language_points": [
+        {
+            "word": "commodity",
+            "explanation": "n. /kəˈmɑːdəti/ 大宗商品（第1段）\n - 语境引申：具有季节属性的消费类产品\n - 搭配结构：critical commodity sales season（关键大宗商品销售季）"
+        },
+        {
+            "word": "parade",
+            "explanation": "n. /pəˈreɪd/ 购物季活动（第1段）\n - 隐喻用法：指系列促销活动的有序展开\n - 搭配结构：shopping parade（购物狂欢季）"
+        },
+        {
+            "word": "gauge",
+            "explanation": "n. /ɡeɪdʒ/ 测量指标（第1段）\n - 专业术语：零售业流量监测参数\n - 搭配结构：gauge of foot traffic（客流量监测指标）"
+        },
+        {
+            "word": "bounce",
+            "explanation": "n. /baʊns/ 反弹（第2段）\n - 文中含义：黑胶唱片销量的回升\n - 搭配结构：make a remarkable bounce back（强势反弹）"
+        },
+        {
+            "word": "she-economy",
+            "explanation": "专业术语（第1段）\n - 结构解析：复合名词'she'+连字符+经济领域\n - 语用功能：描述女性主导的消费经济形态\n - 仿写：The rise of silver-economy reflects aging population trends"
+        },
+        {
+            "word": "tactile nostalgia",
+            "explanation": "惯用表达（第2段）\n - 结构解析：形容词+抽象名词的非常规搭配\n - 语用功能：表达实体物品带来的怀旧触感\n - 仿写：Visual nostalgia drives the revival of film cameras"
+        }
+    ]
+}
+```
+########################################################################
+正式输入:
+待解析单词:{{words}}
+单词所在句子:
+{{contexts}}
+########################################################################
+输出:
+"""
 
+
+PASSAGE2TRANSLATION = """
+【全文翻译任务说明】
+请提供符合"信达雅"原则的全文翻译，要求：
+
+专业领域术语准确
+
+长难句逻辑清晰
+
+文学性文本保持韵律美
+
+保持原文的段落划分，段落之间用\\n\\n分隔，不要添加原文没有的内容
+########################################################################
+请你按如下格式输出:
+```json
+{
+    "translation":"文章翻译"
+}
+```
+########################################################################
+示例输入:
+原文内容:**December** has always been a critical **commodity** sales season, but this year's shopping **parade** reveals shifting consumer priorities.\n\nMusic **album** sales, however, defy this trend. Vinyl records have made a remarkable **bounce** back.
+########################################################################
+示例输出:
+```json
+{
+    "translation": "十二月向来是大宗商品销售的关键战役，然今岁购物狂欢季却显露出消费优先级的悄然转向。\n\n然音乐专辑销量却逆势而起，黑胶唱片演绎了绝地反弹的传奇。"
+}
+```
+########################################################################
+正式输入:
+原文内容:{{passage}}
+########################################################################
+输出:
+"""
+
+
+PASSAGE2QUESTION = """
+{% set count = question_count | default(5) %}
+Please design {{count}} high-quality English reading comprehension multiple-choice questions based on the following elements to comprehensively assess readers' mastery of vocabulary in context and deep text understanding:
+{% if section is defined and sections > 1 %}
+The article below is part {{section}} of {{sections}} of a longer article. Base every question on this part only; other parts are covered separately.
+{% endif %}
 Question Design Principles:
 
 Competency Dimensions Coverage:
-
+{% if count == 5 %}
 2 questions focusing on vocabulary application (word meaning differentiation/collocation usage/contextual inference)
 
 2 questions testing discourse structure comprehension (main idea/paragraph function/logical cohesion)
 
 1 question evaluating inferential judgment (implied meaning/author's perspective/text extension)
+{% else %}
+About 40% of the questions focusing on vocabulary application (word meaning differentiation/collocation usage/contextual inference)
+
+About 40% of the questions testing discourse structure comprehension (main idea/paragraph function/logical cohesion)
+
+The rest evaluating inferential judgment (implied meaning/author's perspective/text extension)
+{% endif %}
 
 Option Design Specifications:
 √ Each option length: 5-15 words
@@ -0,0 +1,195 @@
+import hashlib
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from config.configs import settings
+from core.metrics import registry as metrics_registry
+from core.nlp.passage import locate_words, split_sentences
+from core.prompts.prompt_template import PromptTemplate, get_prompt_template
+from core.prompts.prompts import (OUTLINE2SECTION, PASSAGE2QUESTION, PASSAGE2TRANSLATION, WORD2EXPLANATION,
+                                  WORD2OUTLINE, WORD2PASSAGE, WORD2TRANSLATION)
+from core.prompts.tokenizer import count_tokens, truncate_to_tokens
+from core.tracing import span
+
+prompt_tokens = metrics_registry.histogram(
+    "vocabverse_prompt_tokens", "渲染后提示词的估算token数", ("prompt", "version"),
+    buckets=(250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 12000, 16000),
+)
+prompt_trimmed = metrics_registry.counter(
+    "vocabverse_prompt_trimmed_total", "因超出token预算而裁剪文章的次数", ("prompt",),
+)
+
+# 裁剪后被省略的句子用省略号标出，提示模型原文并不完整
+_GAP = "……"
+# 输出必须覆盖全文的提示词（整篇翻译），裁剪会让用户拿到不完整的译文，不受token预算限制
+_FULL_COVERAGE = frozenset({"word2translation", "passage2translation"})
+_PASSAGE = re.compile(r"\{\{\s*passage\s*\}\}")
+# 模板去掉文章后的token数缓存条目上限
+_BASE_CACHE_SIZE = 256
+
+
+class PromptVersion(NamedTuple):
+    name: str
+    version: int
+    template: PromptTemplate
+    fingerprint: str    # 模板内容的哈希，版本号未变而内容被修改时可以从日志中发现
+    passage_copies: int  # 文章在模板中出现的次数，裁剪时每一份都计入预算
+
+
+class RenderedPrompt(NamedTuple):
+    text: str
+    name: str
+    version: int
+    fingerprint: str
+    tokens: int
+    trimmed: bool
+
+
+def _parse_mapping(value: str) -> Dict[str, int]:
+    """解析"name=value,name=value"格式的配置"""
+    result: Dict[str, int] = {}
+    for item in value.split(","):
+        name, _, number = item.partition("=")
+        if name.strip() and number.strip():
+            result[name.strip()] = int(number)
+    return result
+
+
+def fit_passage(passage: str, budget: int, words: Iterable[str] = (), tokens: Optional[int] = None) -> str:
+    """
+    将文章压缩到token预算以内
+
+    抽取式压缩：优先保留包含目标词的句子，剩余预算按原文顺序补充其他句子，
+    输出保持原文的句子与段落顺序，被省略的部分以省略号标出。
+    tokens为调用方已算出的文章token数，避免重复计算。
+    """
+    if tokens is None:
+        tokens = count_tokens(passage)
+    if tokens <= budget:
+        return passage
+    sentences = split_sentences(passage)
+    costs = [count_tokens(sentence.text) + 1 for sentence in sentences]
+    located = locate_words(sentences, words)
+    priority = sorted({index for indexes in located.values() for index in indexes})
+    selected = set()
+    remaining = budget
+    for index in priority + [sentence.index for sentence in sentences]:
+        if index not in selected and costs[index] <= remaining:
+            selected.add(index)
+            remaining -= costs[index]
+    if not selected:
+        # 单句即超出预算，直接截断
+        return truncate_to_tokens(passage, budget)
+
+    paragraphs: List[List[str]] = []
+    last_paragraph, last_index = None, None
+    for sentence in sentences:
+        if sentence.index not in selected:
+            continue
+        if sentence.paragraph != last_paragraph:
+            paragraphs.append([])
+            if last_index is not None and sentence.index != last_index + 1:
+                paragraphs[-1].append(_GAP)
+        elif sentence.index != last_index + 1:
+            paragraphs[-1].append(_GAP)
+        paragraphs[-1].append(sentence.text)
+        last_paragraph, last_index = sentence.paragraph, sentence.index
+    if last_index != sentences[-1].index:
+        paragraphs[-1].append(_GAP)
+    return "\n\n".join(" ".join(parts) for parts in paragraphs)
+
+
+class PromptRegistry:
+    """
+    提示词注册表
+
+    每个提示词按名称注册一个或多个版本，模板只编译一次；默认使用最新版本，
+    可通过PROMPT_VERSIONS固定某个版本以便回滚或对比。渲染时估算token数，
+    超出PROMPT_TOKEN_BUDGETS中的预算时对passage参数做抽取式压缩；
+    整篇翻译类提示词（_FULL_COVERAGE）始终使用完整原文。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, Dict[int, PromptVersion]] = {}
+        self.pinned = _parse_mapping(settings.PROMPT_VERSIONS)
+        self._base_tokens: Dict[tuple, int] = {}
+        self.budgets = {name: budget for name, budget in _parse_mapping(settings.PROMPT_TOKEN_BUDGETS).items()
+                        if name not in _FULL_COVERAGE}
+
+    def register(self, name: str, template: str, version: int = 1) -> PromptVersion:
+        fingerprint = hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+        prompt = PromptVersion(name, version, get_prompt_template(template), fingerprint,
+                               len(_PASSAGE.findall(template)))
+        with self._lock:
+            self._versions.setdefault(name, {})[version] = prompt
+        return prompt
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptVersion:
+        versions = self._versions.get(name)
+        if not versions:
+            raise KeyError(f"未注册的提示词: {name}")
+        version = version or self.pinned.get(name) or max(versions)
+        if version not in versions:
+            raise KeyError(f"提示词{name}没有版本{version}")
+        return versions[version]
+
+    def names(self) -> List[str]:
+        return list(self._versions)
+
+    def base_tokens(self, prompt: PromptVersion, kwargs: dict) -> int:
+        """模板去掉文章后的token数，按其余参数缓存（同一组单词的多次渲染只计算一次）"""
+        key = (prompt.name, prompt.version, tuple(sorted((k, str(v)) for k, v in kwargs.items() if k != "passage")))
+        tokens = self._base_tokens.get(key)
+        if tokens is None:
+            tokens = count_tokens(prompt.template.render(**{**kwargs, "passage": ""}))
+            with self._lock:
+                if len(self._base_tokens) >= _BASE_CACHE_SIZE:
+                    self._base_tokens.pop(next(iter(self._base_tokens)))
+                self._base_tokens[key] = tokens
+        return tokens
+
+    def render(self, name: str, version: Optional[int] = None, focus_words: Iterable[str] = (),
+               **kwargs) -> RenderedPrompt:
+        """
+        渲染提示词
+
+        Args:
+            name: 提示词名称
+            version: 版本号，默认使用固定版本或最新版本
+            focus_words: 目标词列表，压缩passage时优先保留包含这些词的句子
+            kwargs: 模板参数
+        """
+        prompt = self.get(name, version)
+        with span("prompt.build", prompt=name, version=prompt.version):
+            text = prompt.template.render(**kwargs)
+            trimmed = False
+            passage = kwargs.get("passage")
+            if not passage or not prompt.passage_copies:
+                tokens = count_tokens(text)
+            else:
+                # 文章只计算一次，按出现次数累加到模板其余部分的token数上
+                passage_tokens = count_tokens(passage)
+                base = self.base_tokens(prompt, kwargs)
+                tokens = base + passage_tokens * prompt.passage_copies
+                budget = self.budgets.get(name, 0)
+                if budget and tokens > budget:
+                    passage_budget = max((budget - base) // prompt.passage_copies, 0)
+                    fitted = fit_passage(passage, passage_budget, focus_words, passage_tokens)
+                    text = prompt.template.render(**{**kwargs, "passage": fitted})
+                    tokens = base + count_tokens(fitted) * prompt.passage_copies
+                    trimmed = True
+                    prompt_trimmed.inc(prompt=name)
+        prompt_tokens.observe(tokens, prompt=name, version=prompt.version)
+        return RenderedPrompt(text, name, prompt.version, prompt.fingerprint, tokens, trimmed)
+
+
+prompt_registry = PromptRegistry()
+prompt_registry.register("word2passage", WORD2PASSAGE, version=1)
+prompt_registry.register("word2outline", WORD2OUTLINE, version=1)
+prompt_registry.register("outline2section", OUTLINE2SECTION, version=1)
+prompt_registry.register("word2translation", WORD2TRANSLATION, version=1)
+prompt_registry.register("word2explanation", WORD2EXPLANATION, version=1)
+prompt_registry.register("passage2translation", PASSAGE2TRANSLATION, version=1)
+prompt_registry.register("passage2question", PASSAGE2QUESTION, version=1)
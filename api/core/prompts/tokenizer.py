@@ -0,0 +1,48 @@
+import re
+
+# 汉字、假名、全角标点等按单字计
+_CJK_RANGES = r"\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef"
+_CJK = re.compile(f"[{_CJK_RANGES}]")
+# 英文单词与数字：BPE词表中常见单词为一个token，长词按约6个字符一个token切分
+_ALPHA = re.compile(r"[A-Za-z]+")
+_DIGITS = re.compile(r"\d+")
+# 其余非空白字符（标点、符号、markdown标记）各算一个token
+_OTHER = re.compile(rf"[^\sA-Za-z\d{_CJK_RANGES}]")
+# 按上述规则逐个切分，截断时一次扫描即可累计token数
+_PIECE = re.compile(rf"[{_CJK_RANGES}]|[A-Za-z]+|\d+|[^\sA-Za-z\d{_CJK_RANGES}]")
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece[0].isascii() and piece[0].isalpha():
+        return (len(piece) + 5) // 6
+    if piece[0].isascii() and piece[0].isdigit():
+        return (len(piece) + 2) // 3
+    return 1
+
+
+def count_tokens(text: str) -> int:
+    """
+    本地估算文本的token数
+
+    不依赖具体模型的词表，按GPT/DeepSeek/Qwen等BPE分词器的统计规律近似：
+    常见英文单词一个token、长词约每6个字符一个token，数字约每3位一个token，汉字约每字一个token，标点各一个token。
+    用于预算控制与统计，与服务端计费的实际数值会有少量偏差。
+    """
+    if not text:
+        return 0
+    tokens = len(_CJK.findall(text)) + len(_OTHER.findall(text))
+    tokens += sum((len(word) + 5) // 6 for word in _ALPHA.findall(text))
+    tokens += sum((len(digits) + 2) // 3 for digits in _DIGITS.findall(text))
+    return tokens
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """按估算的token数截断文本（保留开头），预算充足时原样返回"""
+    if budget <= 0:
+        return ""
+    used = 0
+    for match in _PIECE.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > budget:
+            return text[:match.start()]
+    return text
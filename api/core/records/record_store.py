@@ -0,0 +1,281 @@
+import base64
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.configs import settings
+from core.records import review_store
+from core.records.sqlite_store import SQLiteStore
+
+_SCHEMA = [
+    # 文章、翻译与题目压缩后存为BLOB，列表查询只读取元数据列
+    """CREATE TABLE IF NOT EXISTS records (
+        user_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        words TEXT NOT NULL,
+        meta TEXT NOT NULL,
+        preview TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        article BLOB NOT NULL,
+        translation BLOB,
+        questions BLOB,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (user_id, id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_records_user_time ON records (user_id, timestamp, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_records_user_content ON records (user_id, content_hash)",
+    # 单词到记录的倒排表，按时间倒序查找包含某个单词的记录
+    """CREATE TABLE IF NOT EXISTS record_words (
+        user_id TEXT NOT NULL,
+        word TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        record_id TEXT NOT NULL,
+        PRIMARY KEY (user_id, word, timestamp, record_id)
+    ) WITHOUT ROWID""",
+]
+
+_INSERT_COLUMNS = ("user_id, id, timestamp, words, meta, preview, content_hash, article, translation, questions, "
+                   "updated_at")
+_FULL_COLUMNS = "id, timestamp, words, meta, article, translation, questions"
+_SUMMARY_COLUMNS = ("{p}id, {p}timestamp, {p}words, {p}meta, {p}preview, "
+                    "{p}translation IS NOT NULL, {p}questions IS NOT NULL")
+
+
+def _compress(value: Any) -> Optional[bytes]:
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(text.encode("utf-8"), settings.RECORD_COMPRESS_LEVEL)
+
+
+def _decompress(blob: Optional[bytes], is_json: bool = True) -> Any:
+    if blob is None:
+        return None
+    text = zlib.decompress(blob).decode("utf-8")
+    return json.loads(text) if is_json else text
+
+
+def content_hash(words: List[str], article: str) -> str:
+    """相同文章与单词列表（不计顺序）视为同一条记录，与前端本地存储的去重规则一致"""
+    payload = json.dumps([sorted(words), article], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encode_cursor(timestamp: int, record_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, record_id]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """解析分页游标，格式不正确时抛出ValueError"""
+    try:
+        timestamp, record_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(timestamp), str(record_id)
+    except Exception as e:
+        raise ValueError("无效的分页游标") from e
+
+
+class RecordStore(SQLiteStore):
+    """
+    服务端学习记录存储
+
+    每条记录单独插入或更新，不需要像本地存储那样整体读写；记录按 (user_id, timestamp, id)
+    建立索引，历史列表使用键集分页，翻页耗时与记录总数无关。文章、翻译与题目用zlib压缩存储。
+    """
+
+    # 新记录的单词在同一事务中加入复习计划，复习表需要在同一个数据库中
+    SCHEMA = _SCHEMA + review_store.SCHEMA
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(path or settings.RECORD_STORE_PATH)
+
+    @staticmethod
+    def _summary(row: tuple) -> Dict[str, Any]:
+        record_id, timestamp, words, meta, preview, has_translation, has_questions = row
+        return {
+            "id": record_id,
+            "timestamp": timestamp,
+            "words": json.loads(words),
+            "article": json.loads(meta),
+            "preview": preview,
+            "has_translation": bool(has_translation),
+            "has_questions": bool(has_questions),
+        }
+
+    @staticmethod
+    def _full(row: tuple) -> Dict[str, Any]:
+        record_id, timestamp, words, meta, article, translation, questions = row
+        return {
+            "id": record_id,
+            "timestamp": timestamp,
+            "words": json.loads(words),
+            "article": {**json.loads(meta), "article": _decompress(article, is_json=False)},
+            "translation": _decompress(translation),
+            "questions": _decompress(questions),
+        }
+
+    @staticmethod
+    def _row(user_id: str, record: Dict[str, Any]) -> tuple:
+        """记录对应的records表各列，顺序与_INSERT_COLUMNS一致"""
+        article = dict(record["article"])
+        text = str(article.pop("article", ""))
+        words = [str(word) for word in record["words"]]
+        return (user_id, str(record["id"]), int(record["timestamp"]), json.dumps(words, ensure_ascii=False),
+                json.dumps(article, ensure_ascii=False), text[:settings.RECORD_PREVIEW_CHARS],
+                content_hash(words, text), _compress(text), _compress(record.get("translation")),
+                _compress(record.get("questions")), time.time())
+
+    @staticmethod
+    def _index_words(conn: sqlite3.Connection, user_id: str, record_id: str, words: List[str], timestamp: int):
+        conn.execute("DELETE FROM record_words WHERE user_id = ? AND record_id = ?", (user_id, record_id))
+        conn.executemany(
+            "INSERT OR IGNORE INTO record_words (user_id, word, timestamp, record_id) VALUES (?, ?, ?, ?)",
+            [(user_id, word.strip().lower(), timestamp, record_id) for word in words if word.strip()])
+
+    def save(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        保存一条记录并返回其摘要
+
+        与前端saveLearningRecord的规则一致：已有相同内容的记录时合并到该记录（保留原ID、更新时间戳，
+        未提供的翻译与题目沿用已有内容）；否则按ID插入或覆盖。
+
+        Args:
+            user_id: 用户标识
+            record: 与前端LearningRecord结构相同的字典（id、timestamp、words、article、translation、questions）
+        """
+        row = self._row(user_id, record)
+        _, record_id, timestamp, words, _, _, digest, _, translation, questions, updated_at = row
+        with self.transaction() as conn:
+            existing = conn.execute("SELECT id, words FROM records WHERE user_id = ? AND content_hash = ?",
+                                    (user_id, digest)).fetchone()
+            if existing is not None:
+                record_id, words = existing
+                conn.execute(
+                    "UPDATE records SET timestamp = ?, translation = COALESCE(?, translation), "
+                    "questions = COALESCE(?, questions), updated_at = ? WHERE user_id = ? AND id = ?",
+                    (timestamp, translation, questions, updated_at, user_id, record_id))
+            else:
+                conn.execute(
+                    f"INSERT INTO records ({_INSERT_COLUMNS}) VALUES ({', '.join('?' * len(row))}) "
+                    "ON CONFLICT(user_id, id) DO UPDATE SET timestamp = excluded.timestamp, words = excluded.words, "
+                    "meta = excluded.meta, preview = excluded.preview, content_hash = excluded.content_hash, "
+                    "article = excluded.article, translation = excluded.translation, "
+                    "questions = excluded.questions, updated_at = excluded.updated_at", row)
+                if settings.REVIEW_TRACK_EXPOSURES:
+                    review_store.apply_exposures(conn, user_id, json.loads(words))
+            self._index_words(conn, user_id, record_id, json.loads(words), timestamp)
+            summary = conn.execute(f"SELECT {_SUMMARY_COLUMNS.format(p='')} FROM records "
+                                   "WHERE user_id = ? AND id = ?", (user_id, record_id)).fetchone()
+        return self._summary(summary)
+
+    def import_batch(self, user_id: str, records: List[Dict[str, Any]]) -> int:
+        """
+        在一个事务中批量导入记录，返回新插入的条数
+
+        导入是幂等的：ID已存在、或与已有记录内容相同的记录直接跳过，不覆盖已有内容，
+        重复导入同一文件不会产生重复记录。
+        """
+        inserted = 0
+        with self.transaction() as conn:
+            for record in records:
+                row = self._row(user_id, record)
+                cursor = conn.execute(
+                    f"INSERT OR IGNORE INTO records ({_INSERT_COLUMNS}) VALUES ({', '.join('?' * len(row))})", row)
+                if cursor.rowcount != 1:
+                    continue
+                inserted += 1
+                words = json.loads(row[3])
+                self._index_words(conn, user_id, row[1], words, row[2])
+                if settings.REVIEW_TRACK_EXPOSURES:
+                    # 按记录的时间加入复习计划，早已学过的单词导入后即为到期
+                    review_store.apply_exposures(conn, user_id, words, now=row[2])
+        return inserted
+
+    def get(self, user_id: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """返回完整记录，不存在时返回None"""
+        row = self._conn().execute(
+            f"SELECT {_FULL_COLUMNS} FROM records WHERE user_id = ? AND id = ?", (user_id, record_id)).fetchone()
+        return self._full(row) if row is not None else None
+
+    def cursor_after(self, user_id: str, record_id: str) -> Optional[str]:
+        """某条记录之后的导出游标，记录不存在时返回None"""
+        row = self._conn().execute("SELECT timestamp FROM records WHERE user_id = ? AND id = ?",
+                                   (user_id, record_id)).fetchone()
+        return encode_cursor(row[0], record_id) if row is not None else None
+
+    def export(self, user_id: str, cursor: Optional[str] = None,
+               batch: int = 200) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """
+        按时间从早到晚逐条返回完整记录及其游标
+
+        每次只从数据库读取batch条，内存占用与记录总数无关；传入某条记录的游标时从它之后继续，用于断点续传。
+        """
+        position = decode_cursor(cursor) if cursor else None
+        while True:
+            if position is None:
+                rows = self._conn().execute(
+                    f"SELECT {_FULL_COLUMNS} FROM records WHERE user_id = ? ORDER BY timestamp, id LIMIT ?",
+                    (user_id, batch)).fetchall()
+            else:
+                rows = self._conn().execute(
+                    f"SELECT {_FULL_COLUMNS} FROM records WHERE user_id = ? AND (timestamp, id) > (?, ?) "
+                    "ORDER BY timestamp, id LIMIT ?", (user_id, *position, batch)).fetchall()
+            for row in rows:
+                position = (row[1], row[0])
+                yield self._full(row), encode_cursor(*position)
+            if len(rows) < batch:
+                return
+
+    def delete(self, user_id: str, record_id: str) -> bool:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM record_words WHERE user_id = ? AND record_id = ?", (user_id, record_id))
+            cursor = conn.execute("DELETE FROM records WHERE user_id = ? AND id = ?", (user_id, record_id))
+        return cursor.rowcount > 0
+
+    def page(self, user_id: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按时间倒序返回一页记录摘要与下一页的游标（没有更多记录时为None）
+
+        键集分页：游标为上一页最后一条记录的 (timestamp, id)，查询直接从索引中该位置继续。
+        """
+        params: list = [user_id]
+        condition = ""
+        if cursor:
+            params.extend(decode_cursor(cursor))
+            condition = "AND (timestamp, id) < (?, ?)"
+        rows = self._conn().execute(
+            f"SELECT {_SUMMARY_COLUMNS.format(p='')} FROM records WHERE user_id = ? {condition} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ?", (*params, limit + 1)).fetchall()
+        items = [self._summary(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(items[-1]["timestamp"], items[-1]["id"]) if len(rows) > limit else None
+        return items, next_cursor
+
+    def find_by_word(self, user_id: str, word: str, limit: int) -> List[Dict[str, Any]]:
+        """按时间倒序返回包含该单词的记录摘要"""
+        rows = self._conn().execute(
+            f"SELECT {_SUMMARY_COLUMNS.format(p='r.')} "
+            "FROM record_words w JOIN records r ON r.user_id = w.user_id AND r.id = w.record_id "
+            "WHERE w.user_id = ? AND w.word = ? ORDER BY w.timestamp DESC, w.record_id DESC LIMIT ?",
+            (user_id, word.strip().lower(), limit)).fetchall()
+        return [self._summary(row) for row in rows]
+
+    def count(self, user_id: str) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM records WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+_record_store: Optional[RecordStore] = None
+_record_store_lock = threading.Lock()
+
+
+def get_record_store() -> RecordStore:
+    """获取全局学习记录存储（数据库路径由RECORD_STORE_PATH配置）"""
+    global _record_store
+    if _record_store is None:
+        with _record_store_lock:
+            if _record_store is None:
+                _record_store = RecordStore()
+    return _record_store
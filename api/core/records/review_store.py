@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.configs import settings
+from core.records.sqlite_store import SQLiteStore
+
+DAY_MS = 24 * 3600 * 1000
+
+# 每个用户的每个单词一行；(user_id, due_at) 索引即按到期时间排序的优先队列，
+# 取到期单词只需在索引中定位到该用户并顺序读取前k项，与单词总数无关
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS review_items (
+        user_id TEXT NOT NULL,
+        word TEXT NOT NULL,
+        ease REAL NOT NULL,
+        interval_days REAL NOT NULL,
+        repetitions INTEGER NOT NULL,
+        lapses INTEGER NOT NULL DEFAULT 0,
+        exposures INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        incorrect INTEGER NOT NULL DEFAULT 0,
+        due_at INTEGER NOT NULL,
+        last_reviewed_at INTEGER,
+        created_at INTEGER NOT NULL,
+        PRIMARY KEY (user_id, word)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_review_items_due ON review_items (user_id, due_at)",
+]
+
+_COLUMNS = ("word", "ease", "interval_days", "repetitions", "lapses", "exposures", "correct", "incorrect",
+            "due_at", "last_reviewed_at", "created_at")
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def normalize_word(word: str) -> str:
+    return " ".join(word.strip().lower().split())
+
+
+def schedule(item: Dict[str, Any], quality: int, now: int) -> Dict[str, Any]:
+    """
+    SM-2：按回忆质量（0-5）更新难度系数、间隔与下次到期时间
+
+    质量不低于3视为记住：前两次间隔为1天、6天，之后为上次间隔乘以难度系数；
+    低于3视为遗忘，重新从1天开始。难度系数随质量调整，下限1.3。
+    """
+    item = dict(item)
+    quality = max(0, min(5, quality))
+    if quality >= 3:
+        if item["repetitions"] == 0:
+            interval = 1.0
+        elif item["repetitions"] == 1:
+            interval = 6.0
+        else:
+            interval = item["interval_days"] * item["ease"]
+        item["repetitions"] += 1
+    else:
+        interval = 1.0
+        item["repetitions"] = 0
+        item["lapses"] += 1
+    item["ease"] = max(1.3, item["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    item["interval_days"] = min(interval, settings.REVIEW_MAX_INTERVAL_DAYS)
+    item["due_at"] = now + int(item["interval_days"] * DAY_MS)
+    item["last_reviewed_at"] = now
+    return item
+
+
+def _new_item(word: str, now: int) -> Dict[str, Any]:
+    return {"word": word, "ease": settings.REVIEW_INITIAL_EASE, "interval_days": 0.0, "repetitions": 0,
+            "lapses": 0, "exposures": 0, "correct": 0, "incorrect": 0, "due_at": now,
+            "last_reviewed_at": None, "created_at": now}
+
+
+def _load(conn: sqlite3.Connection, user_id: str, words: List[str]) -> Dict[str, Dict[str, Any]]:
+    if not words:
+        return {}
+    placeholders = ", ".join("?" * len(words))
+    rows = conn.execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM review_items WHERE user_id = ? AND word IN ({placeholders})",
+        (user_id, *words)).fetchall()
+    return {row[0]: dict(zip(_COLUMNS, row)) for row in rows}
+
+
+def _save(conn: sqlite3.Connection, user_id: str, items: Iterable[Dict[str, Any]]):
+    conn.executemany(
+        f"INSERT OR REPLACE INTO review_items (user_id, {', '.join(_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' * len(_COLUMNS))})",
+        [(user_id, *(item[column] for column in _COLUMNS)) for item in items])
+
+
+def apply_exposures(conn: sqlite3.Connection, user_id: str, words: Iterable[str], now: Optional[int] = None):
+    """
+    在给定连接的事务中记录单词出现在一篇生成的文章中
+
+    新单词加入复习计划，首次复习安排在一天后；已到期的单词视为一次被动复习（质量为REVIEW_EXPOSURE_QUALITY）；
+    未到期的单词只增加出现次数，不提前推迟其复习时间。
+    """
+    now = now or now_ms()
+    keys = list(dict.fromkeys(normalize_word(word) for word in words if word.strip()))
+    items = _load(conn, user_id, keys)
+    updated = []
+    for key in keys:
+        item = items.get(key)
+        if item is None:
+            item = schedule(_new_item(key, now), settings.REVIEW_EXPOSURE_QUALITY, now)
+        elif item["due_at"] <= now:
+            item = schedule(item, settings.REVIEW_EXPOSURE_QUALITY, now)
+        item["exposures"] += 1
+        updated.append(item)
+    _save(conn, user_id, updated)
+
+
+class ReviewStore(SQLiteStore):
+    """
+    间隔重复复习计划
+
+    记录每个用户每个单词的SM-2状态。单词出现在生成的文章中、以及用户回答与该单词相关的题目时更新状态，
+    到期单词按到期时间从早到晚返回，可直接作为/word2passage的单词列表。
+    """
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(path or settings.RECORD_STORE_PATH)
+
+    def record_exposures(self, user_id: str, words: Iterable[str], now: Optional[int] = None):
+        with self.transaction() as conn:
+            apply_exposures(conn, user_id, words, now)
+
+    def record_answers(self, user_id: str, results: Dict[str, bool], now: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        记录测验结果并返回更新后的单词状态
+
+        Args:
+            user_id: 用户标识
+            results: 单词 -> 是否答对（同一单词出现在多道题中时，任意一题答错即视为答错）
+        """
+        now = now or now_ms()
+        keys = {}
+        for word, correct in results.items():
+            key = normalize_word(word)
+            if key:
+                keys[key] = keys.get(key, True) and correct
+        with self.transaction() as conn:
+            items = _load(conn, user_id, list(keys))
+            updated = []
+            for key, correct in keys.items():
+                item = items.get(key) or _new_item(key, now)
+                quality = settings.REVIEW_CORRECT_QUALITY if correct else settings.REVIEW_INCORRECT_QUALITY
+                item = schedule(item, quality, now)
+                item["correct" if correct else "incorrect"] += 1
+                updated.append(item)
+            _save(conn, user_id, updated)
+        return updated
+
+    def due(self, user_id: str, limit: int, now: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按到期时间从早到晚返回已到期的单词"""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM review_items WHERE user_id = ? AND due_at <= ? "
+            "ORDER BY due_at LIMIT ?", (user_id, now or now_ms(), limit)).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def next_due_at(self, user_id: str) -> Optional[int]:
+        row = self._conn().execute("SELECT MIN(due_at) FROM review_items WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0]
+
+    def get(self, user_id: str, word: str) -> Optional[Dict[str, Any]]:
+        return _load(self._conn(), user_id, [normalize_word(word)]).get(normalize_word(word))
+
+    def delete(self, user_id: str, word: str) -> bool:
+        with self.transaction() as conn:
+            cursor = conn.execute("DELETE FROM review_items WHERE user_id = ? AND word = ?",
+                                  (user_id, normalize_word(word)))
+        return cursor.rowcount > 0
+
+
+_review_store: Optional[ReviewStore] = None
+_review_store_lock = threading.Lock()
+
+
+def get_review_store() -> ReviewStore:
+    """获取全局复习计划存储（与学习记录共用RECORD_STORE_PATH数据库）"""
+    global _review_store
+    if _review_store is None:
+        with _review_store_lock:
+            if _review_store is None:
+                _review_store = ReviewStore()
+    return _review_store
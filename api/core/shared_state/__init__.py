@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from config.configs import settings
+from core.shared_state.backend import MemoryBackend, SharedStateBackend
+
+_backend: Optional[SharedStateBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(kind: str) -> SharedStateBackend:
+    kind = kind.lower()
+    if kind == "sqlite":
+        from core.shared_state.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(settings.SHARED_STATE_SQLITE_PATH)
+    if kind == "redis":
+        from core.shared_state.redis_backend import RedisBackend
+        return RedisBackend(settings.SHARED_STATE_REDIS_URL)
+    if kind == "memory":
+        return MemoryBackend()
+    raise ValueError(f"不支持的共享状态后端: {kind}")
+
+
+def get_shared_state() -> SharedStateBackend:
+    """获取全局共享状态后端（由SHARED_STATE_BACKEND配置：sqlite、redis或memory）"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(settings.SHARED_STATE_BACKEND)
+    return _backend
+
+
+class RateLimiter:
+    """固定窗口限流，计数保存在共享后端中，多个worker共享同一额度"""
+
+    def __init__(self, backend: SharedStateBackend, limit: int, window: float = 60):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+
+    def hit(self, identity: str) -> bool:
+        """记录一次请求，未超出额度时返回True"""
+        if self.limit <= 0:
+            return True
+        bucket = int(time.time() // self.window)
+        count = self.backend.incr(f"ratelimit:{identity}:{bucket}", ttl=self.window * 2)
+        return count <= self.limit
+
+
+class SingleFlight:
+    """
+    跨进程的single-flight
+
+    同一个键同时只有一个调用者真正执行计算并把结果写入共享后端，
+    其余调用者（包括其他worker中的）轮询等待该结果，避免重复计算。
+    """
+
+    def __init__(self, backend: SharedStateBackend, namespace: str = "sf", lock_ttl: float = 60,
+                 result_ttl: float = 3600, poll_interval: float = 0.05):
+        """
+        Args:
+            backend: 共享状态后端
+            namespace: 键前缀，结果保存在"{namespace}:result:{key}"，可直接作为共享缓存读取
+            lock_ttl: 执行者崩溃时锁自动失效的时间
+            result_ttl: 结果的保留时间
+            poll_interval: 等待者的轮询间隔
+        """
+        self.backend = backend
+        self.namespace = namespace
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        return self.backend.get(f"{self.namespace}:result:{key}")
+
+    def publish(self, key: str, result: bytes):
+        self.backend.set(f"{self.namespace}:result:{key}", result, ttl=self.result_ttl)
+
+    def acquire(self, key: str) -> bool:
+        return self.backend.set_if_absent(f"{self.namespace}:lock:{key}", b"1", ttl=self.lock_ttl)
+
+    def release(self, key: str, result: Optional[bytes] = None):
+        if result is not None:
+            self.publish(key, result)
+        self.backend.delete(f"{self.namespace}:lock:{key}")
+
+    def check(self, key: str) -> Tuple[bool, Optional[bytes]]:
+        """检查一次其他调用者的进度，返回(是否已结束, 结果)；已结束但无结果表示对方失败"""
+        result = self.lookup(key)
+        if result is not None:
+            return True, result
+        if self.backend.get(f"{self.namespace}:lock:{key}") is None:
+            return True, self.lookup(key)
+        return False, None
+
+    def wait(self, key: str, timeout: float) -> Optional[bytes]:
+        """等待其他调用者的结果；锁被释放仍无结果（对方失败）或超时返回None"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            done, result = self.check(key)
+            if done:
+                return result
+            time.sleep(self.poll_interval)
+        return None
+
+    async def wait_async(self, key: str, timeout: float) -> Optional[bytes]:
+        """wait的异步版本：每次检查在线程中访问后端，轮询间隔在事件循环中等待，不占用线程"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            done, result = await loop.run_in_executor(None, self.check, key)
+            if done:
+                return result
+            await asyncio.sleep(min(self.poll_interval, max(deadline - loop.time(), 0)))
+        return None
+
+    def run(self, key: str, func: Callable[[], bytes], timeout: float = 60) -> bytes:
+        """返回键对应的结果，必要时执行func计算"""
+        while True:
+            result = self.lookup(key)
+            if result is not None:
+                return result
+            if self.acquire(key):
+                result = None
+                try:
+                    result = func()
+                    return result
+                finally:
+                    self.release(key, result)
+            result = self.wait(key, timeout)
+            if result is not None:
+                return result
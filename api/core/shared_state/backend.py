@@ -0,0 +1,104 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+
+class SharedStateBackend(ABC):
+    """
+    跨进程共享状态的存储后端
+
+    多worker部署时，缓存、限流计数与single-flight锁都必须放在进程之外，
+    否则每个worker各自计数、各自缓存。值统一为bytes，过期时间单位为秒。
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        pass
+
+    @abstractmethod
+    def set_if_absent(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """键不存在（或已过期）时写入并返回True，否则返回False"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """原子自增并返回新值；键新建时设置过期时间"""
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(SharedStateBackend):
+    """进程内实现，仅适用于单worker开发环境"""
+
+    # 清理过期键的最短间隔（秒）：限流计数等键写入后不会再被读取，只靠读取时删除会一直累积
+    PURGE_INTERVAL = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._last_purge = time.time()
+
+    def _purge_expired(self):
+        """写入时顺带清理过期键，每PURGE_INTERVAL秒最多一次（调用方持有锁）"""
+        now = time.time()
+        if now - self._last_purge > self.PURGE_INTERVAL:
+            self._last_purge = now
+            expired = [key for key, (_, expires_at) in self._data.items()
+                       if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del self._data[key]
+
+    def _alive(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._alive(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        with self._lock:
+            self._purge_expired()
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def set_if_absent(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            self._purge_expired()
+            if self._alive(key) is not None:
+                return False
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            self._purge_expired()
+            current = self._alive(key)
+            if current is None:
+                value = amount
+                expires_at = time.time() + ttl if ttl else None
+            else:
+                value = int(current) + amount
+                expires_at = self._data[key][1]
+            self._data[key] = (str(value).encode(), expires_at)
+            return value
@@ -0,0 +1,118 @@
+import socket
+import threading
+from typing import List, Optional, Union
+from urllib.parse import urlparse
+
+from core.shared_state.backend import SharedStateBackend
+
+
+class RedisError(RuntimeError):
+    """Redis服务端返回的错误"""
+
+
+class RedisBackend(SharedStateBackend):
+    """
+    基于Redis协议（RESP）的共享状态后端
+
+    只依赖标准库socket，可以连接Redis或任何兼容RESP的服务（如KeyDB、Dragonfly），
+    跨机器部署时替代本地SQLite。
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        """
+        Args:
+            url: 连接地址，如redis://:password@127.0.0.1:6379/0
+            timeout: 套接字超时（秒）
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        # 每个线程各自持有一条连接，避免请求与响应交错
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _send(self, *args) -> Union[bytes, int, list, None]:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Redis连接已关闭")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RedisError(f"无法解析的响应: {line!r}")
+
+    def command(self, *args):
+        """执行一条命令，连接断开时重连并重试一次"""
+        if getattr(self._local, "sock", None) is None:
+            self._connect()
+        try:
+            return self._send(*args)
+        except (ConnectionError, OSError):
+            self.close()
+            self._connect()
+            return self._send(*args)
+
+    @staticmethod
+    def _expiry_args(ttl: Optional[float]) -> List:
+        return ["PX", max(int(ttl * 1000), 1)] if ttl else []
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.command("SET", key, value, *self._expiry_args(ttl))
+
+    def set_if_absent(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return self.command("SET", key, value, "NX", *self._expiry_args(ttl)) is not None
+
+    def delete(self, key: str):
+        self.command("DEL", key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        value = self.command("INCRBY", key, amount)
+        if ttl and value == amount:
+            # 新建的计数器设置过期时间
+            self.command("PEXPIRE", key, max(int(ttl * 1000), 1))
+        return value
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            finally:
+                self._local.sock = None
+                self._local.reader = None
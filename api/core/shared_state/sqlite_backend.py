@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from core.shared_state.backend import SharedStateBackend
+
+
+class SQLiteBackend(SharedStateBackend):
+    """
+    基于SQLite的本地共享状态后端
+
+    同一台机器上的多个worker共享一个数据库文件：WAL模式允许并发读，
+    写操作由SQLite的文件锁串行化；开启mmap后热数据的读取不经过read系统调用。
+    """
+
+    def __init__(self, path: str, mmap_size: int = 64 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.mmap_size = mmap_size
+        # sqlite3连接不能跨线程共享，每个线程各自持有一个
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_kv_expires_at ON kv (expires_at)")
+        self._last_purge = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _expires_at(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    def _purge_expired(self, conn: sqlite3.Connection):
+        # 过期数据惰性清理，最多每分钟一次
+        now = time.time()
+        if now - self._last_purge > 60:
+            self._last_purge = now
+            conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        # 计数器以文本形式存储
+        return row[0].encode() if isinstance(row[0], str) else bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, self._expires_at(ttl)),
+        )
+        self._purge_expired(conn)
+
+    def set_if_absent(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        # 已过期的旧值视为不存在，可被覆盖
+        cursor = self._conn().execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+            (key, value, self._expires_at(ttl), time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        row = self._conn().execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "value = CASE WHEN kv.expires_at IS NOT NULL AND kv.expires_at <= ? THEN excluded.value "
+            "ELSE CAST(CAST(kv.value AS INTEGER) + ? AS TEXT) END, "
+            "expires_at = CASE WHEN kv.expires_at IS NOT NULL AND kv.expires_at <= ? THEN excluded.expires_at "
+            "ELSE kv.expires_at END "
+            "RETURNING value",
+            (key, str(amount), self._expires_at(ttl), now, amount, now),
+        ).fetchone()
+        return int(row[0])
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
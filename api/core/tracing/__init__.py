@@ -0,0 +1,111 @@
+import functools
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from core.profiling import note_thread
+
+
+class Span:
+    """一个计时区间，时间单位为纳秒（与OpenTelemetry一致）"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    """一次请求内的全部span"""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+    def add(self, span: Span):
+        # list.append是原子操作，线程池中的同步代码也可以直接追加
+        self.spans.append(span)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def _start_span(trace: Trace, name: str, attributes: Dict[str, Any]):
+    parent = _current_span.get()
+    span = Span(name, parent.span_id if parent is not None else None, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_attribute("error", type(e).__name__)
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.add(span)
+
+
+def span(name: str, **attributes):
+    """
+    记录一个span
+
+    只有在请求的追踪上下文中才会计时，其他场景（脚本、基准测试、后台预热）下为空操作。
+
+    Args:
+        name: span名称，同名span在Server-Timing中合并
+        attributes: 附加属性，随导出的JSON一起写出
+    """
+    # 线程池中执行的同步代码也纳入正在进行的请求剖析（与是否启用追踪无关）
+    note_thread()
+    trace = _current_trace.get()
+    if trace is None:
+        return nullcontext()
+    return _start_span(trace, name, attributes)
+
+
+def traced(name: str) -> Callable:
+    """以span包裹整个函数调用的装饰器"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def start_trace(trace_id: Optional[str] = None):
+    trace = Trace(trace_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
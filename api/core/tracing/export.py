@@ -0,0 +1,97 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.tracing import Trace
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP JSON中64位整数以字符串表示
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_json(trace: Trace, service_name: str) -> Dict[str, Any]:
+    """转换为OTLP/JSON格式（与OpenTelemetry Collector的文件导出格式一致）"""
+    spans = []
+    for span in trace.spans:
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            # 根span为SERVER，其余为INTERNAL
+            "kind": 2 if span.parent_id is None else 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in span.attributes.items()],
+        })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "vocabverse.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class FileSpanExporter:
+    """
+    将追踪写入JSON lines文件
+
+    请求结束时只把Trace放入队列，由后台线程序列化并追加写入，队列满时丢弃。
+    """
+
+    def __init__(self, path: str, service_name: str = "vocabverse-api", max_queue: int = 1000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.service_name = service_name
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                trace = self._queue.get()
+                if trace is None:
+                    break
+                batch: List[Trace] = [trace]
+                # 一次写出已积压的全部追踪，减少flush次数
+                while True:
+                    try:
+                        trace = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if trace is None:
+                        self._write(f, batch)
+                        return
+                    batch.append(trace)
+                self._write(f, batch)
+
+    def _write(self, f, batch: List[Trace]):
+        for trace in batch:
+            f.write(json.dumps(to_otlp_json(trace, self.service_name), ensure_ascii=False) + "\n")
+        f.flush()
+
+    def shutdown(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
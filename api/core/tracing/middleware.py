@@ -0,0 +1,81 @@
+import random
+import re
+from typing import Dict, List, Optional
+
+from config.configs import settings
+from core.logger.context import get_request_id
+from core.tracing import Span, Trace, span, start_trace
+from core.tracing.export import FileSpanExporter
+
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+_INVALID_TOKEN_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def server_timing(spans: List[Span], root: Span) -> str:
+    """
+    生成Server-Timing响应头
+
+    同名span的耗时合并（多次LLM调用等），按首次出现的顺序排列，最后附上请求总耗时。
+    """
+    totals: Dict[str, List[float]] = {}
+    for item in spans:
+        if item is root:
+            continue
+        entry = totals.setdefault(_INVALID_TOKEN_CHARS.sub("_", item.name), [0.0, 0])
+        entry[0] += item.duration_ms
+        entry[1] += 1
+    parts = []
+    for name, (duration, count) in totals.items():
+        parts.append(f'{name};dur={duration:.1f}' + (f';desc="x{count}"' if count > 1 else ""))
+    parts.append(f"total;dur={root.duration_ms:.1f}")
+    return ", ".join(parts)
+
+
+class TracingMiddleware:
+    """
+    为每个请求建立追踪上下文
+
+    请求内各阶段（提示词渲染、LLM调用、JSON解析、响应校验等）通过core.tracing.span记录，
+    响应头中返回Server-Timing，浏览器开发者工具可直接查看；
+    配置TRACE_EXPORT_PATH后按TRACE_EXPORT_SAMPLE_RATE抽样导出OTLP/JSON。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.exporter: Optional[FileSpanExporter] = None
+        if settings.TRACE_EXPORT_PATH:
+            self.exporter = FileSpanExporter(settings.TRACE_EXPORT_PATH)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        # 沿用上游传入的W3C traceparent中的trace id，便于与网关的追踪关联
+        trace_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                match = _TRACEPARENT.match(value.decode("latin-1"))
+                trace_id = match.group(1) if match else None
+                break
+
+        with start_trace(trace_id) as trace:
+            with span("http", **{"http.method": scope["method"], "http.target": scope["path"],
+                                 "request_id": get_request_id()}) as root:
+
+                async def send_with_timing(message):
+                    if message["type"] == "http.response.start":
+                        root.set_attribute("http.status_code", message["status"])
+                        headers = list(message.get("headers", []))
+                        headers.append((b"server-timing", server_timing(trace.spans, root).encode("latin-1")))
+                        message = {**message, "headers": headers}
+                    await send(message)
+
+                await self.app(scope, receive, send_with_timing)
+                route = scope.get("route")
+                if route is not None:
+                    root.set_attribute("http.route", getattr(route, "name", ""))
+                    root.name = f"{scope['method']} {getattr(route, 'name', '')}"
+
+        if self.exporter is not None and random.random() < settings.TRACE_EXPORT_SAMPLE_RATE:
+            self.exporter.export(trace)
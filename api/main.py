@@ -1,6 +1,21 @@
 from fastapi import FastAPI, APIRouter
 from starlette.middleware.cors import CORSMiddleware
-from controllers import (learning_router)
+from controllers import (learning_router, records_router, reviews_router, health_router, metrics_router, profiling_router)
+from contextlib import asynccontextmanager
+from core.image2word.ocr_pool import get_ocr_pool
+from core.lifecycle.warmup import run_warmup
+from core.lifecycle.inflight import inflight_tracker, install_drain_on_signal
+from core.logger import api_logger
+from core.logger.context import RequestIDMiddleware
+from core.metrics.middleware import MetricsMiddleware
+from core.tracing.middleware import TracingMiddleware
+from core.profiling.middleware import ProfilingMiddleware
+from core.http.compression import CompressionMiddleware
+from core.http.conditional import ConditionalGetMiddleware
+from core.http.results import GenerationResultMiddleware
+from config.configs import settings
+from starlette.concurrency import run_in_threadpool
+import asyncio
 
 origins = [
    "*" 
@@ -13,20 +28,56 @@ import uvicorn
 
 from pathlib import Path
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 在后台预热（共享客户端、模板编译、OCR进程池等），期间/healthz可用而/readyz返回503
+    warmup_task = asyncio.create_task(run_in_threadpool(run_warmup))
+    if settings.SERVER_DRAIN_ON_SIGNAL:
+        # 收到SIGTERM时在关闭监听端口之前排空
+        install_drain_on_signal(settings.SERVER_DRAIN_DELAY, settings.SERVER_DRAIN_TIMEOUT)
+    yield
+    warmup_task.cancel()
+    # 未接管信号时（开发模式）在此排空进行中的LLM调用，再关闭OCR进程池
+    drained = await run_in_threadpool(inflight_tracker.drain, settings.SERVER_DRAIN_TIMEOUT)
+    if not drained:
+        api_logger.error(f"Shutdown: {inflight_tracker.count} LLM calls still in flight after drain timeout")
+    get_ocr_pool().shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,            # 允许的域名
     allow_credentials=True,           # 允许携带凭证
     allow_methods=["*"],              # 允许的 HTTP 方法，如 GET, POST 等
     allow_headers=["*"],              # 允许的请求头
+    expose_headers=["X-Request-ID", "Server-Timing", "ETag", "Content-Location"],  # 允许前端读取关联ID、各阶段耗时与生成结果的地址
 )
+# 保存生成接口（POST）的结果，通过Content-Location给出可用GET与ETag验证的地址
+app.add_middleware(GenerationResultMiddleware)
+# GET响应的内容哈希ETag与304（在压缩之内，ETag按未压缩的内容计算）
+app.add_middleware(ConditionalGetMiddleware)
+# 按Accept-Encoding压缩响应，流式响应逐段压缩
+app.add_middleware(CompressionMiddleware)
+# 按需剖析单个请求（管理令牌或抽样触发），结果以服务端生成的剖析ID命名
+app.add_middleware(ProfilingMiddleware)
+# 记录请求各阶段耗时，返回Server-Timing响应头（位于关联ID中间件之内，追踪可带上请求ID）
+app.add_middleware(TracingMiddleware)
+# 为每个请求设置关联ID，写入日志并在响应头中返回
+app.add_middleware(RequestIDMiddleware)
+# 按路由统计请求耗时，由/metrics导出
+app.add_middleware(MetricsMiddleware)
 
 router = APIRouter()
 
 router.include_router(learning_router, prefix="/learning", tags=[ "learning"])
+router.include_router(records_router, prefix="/records", tags=["records"])
+router.include_router(reviews_router, prefix="/reviews", tags=["reviews"])
 
 app.include_router(router, prefix="/v1/api", tags=["v1"])
+app.include_router(health_router, tags=["health"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(profiling_router, prefix="/debug", tags=["debug"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+import os
+
+import uvicorn
+
+from config.configs import settings
+
+# 生产环境入口：多worker、无热重载；收到退出信号后先排空进行中的请求再退出
+# 开发时仍可使用 python3 main.py（单进程、热重载，重载时不等待排空）
+if __name__ == "__main__":
+    if "SERVER_DRAIN_ON_SIGNAL" not in settings.model_fields_set:
+        # 未显式配置时默认开启；worker进程会重新读取配置，同时通过环境变量传递
+        os.environ["SERVER_DRAIN_ON_SIGNAL"] = "true"
+        settings.SERVER_DRAIN_ON_SIGNAL = True
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=max(1, settings.SERVER_WORKERS),
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+    )
@@ -1,19 +1,106 @@
 from core.llm.llm_manager import LLM_Manager
-from core.prompts.prompt_template import PromptTemplate, text_to_json
-from core.prompts.prompts import WORD2PASSAGE, WORD2TRANSLATION, PASSAGE2QUESTION
-from typing import List, Dict, Any, Optional
+from core.llm.limiter import get_provider_limiter
+from core.prompts.prompt_template import text_to_json
+from core.prompts.registry import prompt_registry, RenderedPrompt
+from typing import List, Dict, Any, Optional, Callable
 from services.learning.learning_type import ArticleType, DifficultyLevel, ToneStyle, ArticleLength, TopicArea
 import json
 import time
 from config.configs import settings as llm_Settings
 from core.logger import api_logger
+from core.lifecycle.inflight import inflight_tracker
+from core.tracing import span, traced
+from core.llm.metrics import llm_json_parse_failures, llm_request_duration, llm_time_to_first_token
+from core.nlp.passage import PassageAnalysis, analyze_passage, chunk_paragraphs, split_sections
+from core.shared_state import SingleFlight, get_shared_state
+from services.learning.longform import count_english_words, normalize_outline, stitch_sections
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import contextvars
+import hashlib
+import re
+import threading
+
+_parallel_executor: Optional[ThreadPoolExecutor] = None
+_parallel_executor_lock = threading.Lock()
+
+def get_parallel_executor() -> ThreadPoolExecutor:
+    """分片并行调用共用的线程池，线程数上限为LLM_PARALLEL_WORKERS"""
+    global _parallel_executor
+    if _parallel_executor is None:
+        with _parallel_executor_lock:
+            if _parallel_executor is None:
+                _parallel_executor = ThreadPoolExecutor(max_workers=llm_Settings.LLM_PARALLEL_WORKERS,
+                                                        thread_name_prefix="llm-parallel")
+    return _parallel_executor
+
+def sanitize_words(words: List[str]) -> List[str]:
+    """只保留单词中的字母、数字、连字符和空格，去掉处理后为空的单词"""
+    safe_words = []
+    for word in words:
+        safe_word = ''.join(c for c in word if c.isalnum() or c in ['-', ' '])
+        if safe_word:
+            safe_words.append(safe_word)
+    return safe_words
 
 class WordServices:
     def __init__(self):
         self.llm_manager = LLM_Manager()
+        self._translation_cache: Optional[SingleFlight] = None
+        self._translation_cache_lock = threading.Lock()
         # 默认使用OPENAI提供商，也可从配置文件读取
         # self.llm = self.llm_manager.creatLLM(llm_Settings.LLM_PROVIDER)
+
+    def _chat(self, system_prompt: str, prompt: str) -> str:
+        """调用LLM并记录耗时；调用期间计入进行中请求，进程退出前会等待其完成"""
+        provider = llm_Settings.LLM_PROVIDER
+        start_time = time.time()
+        outcome = "error"
+        llm = None
+        try:
+            with inflight_tracker.track(), get_provider_limiter(provider).slot(), \
+                    span("llm.chat", provider=provider) as chat_span:
+                # 排队等待并发额度的时间单独统计，不计入调用耗时
+                start_time = time.time()
+                with span("llm.create"):
+                    llm = self.llm_manager.creatLLM(provider)
+                if chat_span is not None:
+                    chat_span.set_attribute("model", getattr(llm, "model", ""))
+                llm.setPrompt(system_prompt)
+                if llm_Settings.LLM_STREAM_RESPONSES:
+                    # 流式调用可以统计首段内容的延迟，拼接后与非流式结果一致
+                    chunks = []
+                    stream = llm.ChatToBotWithStream(prompt)
+                    with span("llm.first_token"):
+                        for chunk in stream:
+                            if chunk:
+                                chunks.append(chunk)
+                                break
+                    if chunks:
+                        llm_time_to_first_token.observe(time.time() - start_time, provider=provider,
+                                                        model=getattr(llm, "model", ""))
+                    with span("llm.generate"):
+                        chunks.extend(chunk for chunk in stream if chunk)
+                    response = "".join(chunks)
+                else:
+                    response = llm.ChatToBot(prompt)
+            outcome = "ok"
+        finally:
+            elapsed_time = time.time() - start_time
+            llm_request_duration.observe(elapsed_time, provider=provider, model=getattr(llm, "model", ""),
+                                         outcome=outcome)
+        api_logger.info(f"Service: LLM response received in {elapsed_time:.2f} seconds")
+        return response
     
+    @staticmethod
+    def _render_prompt(name: str, **kwargs) -> str:
+        rendered: RenderedPrompt = prompt_registry.render(name, **kwargs)
+        api_logger.info(f"Service: Prompt {rendered.name} v{rendered.version} ({rendered.fingerprint}) rendered, "
+                        f"~{rendered.tokens} tokens"
+                        + (" (passage trimmed to fit the token budget)" if rendered.trimmed else ""))
+        return rendered.text
+
+    @traced("service.generate_passage")
     def generate_passage(self, 
                          words: List[str], 
                          article_type: ArticleType,
@@ -33,12 +120,7 @@ class WordServices:
             api_logger.info(f"Service: Words count limited to 50")
         
         # 安全处理：去除每个单词中可能的危险字符
-        safe_words = []
-        for word in words:
-            # 只保留字母、数字、连字符和空格
-            safe_word = ''.join(c for c in word if c.isalnum() or c in ['-', ' '])
-            if safe_word:
-                safe_words.append(safe_word)
+        safe_words = sanitize_words(words)
         
         words_str = ",".join(safe_words)
         
@@ -75,22 +157,24 @@ class WordServices:
         
         api_logger.info(f"Service: LLM parameters: {params}")
         
-        prompt_template = PromptTemplate(WORD2PASSAGE, {})
-        prompt = prompt_template.render(**params)
+        # 长文章先生成大纲，再并行生成各部分；大纲不可用时退回单次生成
+        total_words = self._longform_total_words(article_length, word_count)
+        if total_words:
+            result = self._generate_longform(safe_words, params, total_words)
+            if result is not None:
+                if alert_message:
+                    result["alert"] = alert_message
+                return result
         
-        api_logger.info(f"Service: Calling LLM to generate passage")
-        start_time = time.time()
-        
-        llm = self.llm_manager.creatLLM(llm_Settings.LLM_PROVIDER)
-        llm.setPrompt("你是一个文章生成助手")
-        response = llm.ChatToBot(prompt) 
+        prompt = self._render_prompt("word2passage", **params)
         
-        elapsed_time = time.time() - start_time
-        api_logger.info(f"Service: LLM response received in {elapsed_time:.2f} seconds")
+        api_logger.info(f"Service: Calling LLM to generate passage")
+        response = self._chat("你是一个文章生成助手", prompt)
         
         result = text_to_json(response)
         if not result:
             api_logger.error("Service: Failed to parse JSON from LLM response")
+            llm_json_parse_failures.inc(task="passage")
             result = {
                 "article": response, 
                 "word_count": word_count or "Unknown", 
@@ -109,54 +193,314 @@ class WordServices:
         
         return result
     
+    @staticmethod
+    def _longform_total_words(article_length: ArticleLength, word_count: Optional[str]) -> int:
+        """需要分部分生成时返回目标总字数，否则返回0"""
+        if not llm_Settings.LONGFORM_ENABLED:
+            return 0
+        if article_length == ArticleLength.LONG:
+            total = 800
+        elif article_length == ArticleLength.CUSTOM and word_count:
+            total = int(word_count)
+        else:
+            return 0
+        return total if total >= llm_Settings.LONGFORM_MIN_WORDS else 0
+    
+    @traced("service.generate_longform")
+    def _generate_longform(self, words: List[str], params: Dict[str, Any], total_words: int) -> Optional[Dict[str, Any]]:
+        """
+        分部分生成长文章
+        
+        先生成简短的大纲，为每个部分分配目标词与字数并确定全文共同的写作约束；
+        各部分按大纲并行生成，最后在本地拼接。总耗时约为大纲加上一个部分的生成时间，
+        单个部分生成失败也只需重试该部分。
+        """
+        sections = min(max(-(-total_words // llm_Settings.LONGFORM_SECTION_WORDS), 2),
+                       llm_Settings.LONGFORM_MAX_SECTIONS)
+        prompt = self._render_prompt("word2outline", **params, total_words=total_words, sections=sections)
+        
+        api_logger.info(f"Service: Calling LLM to generate outline with {sections} sections")
+        response = self._chat("你是一个文章策划助手", prompt)
+        
+        outline = text_to_json(response)
+        normalized = normalize_outline(outline, words, sections, total_words)
+        if not normalized:
+            api_logger.error("Service: Failed to parse outline from LLM response, falling back to single generation")
+            llm_json_parse_failures.inc(task="outline")
+            return None
+        
+        title = str(outline.get("title") or "").strip()
+        style_notes = str(outline.get("style_notes") or "").strip()
+        contents = self._parallel(*(
+            partial(self._generate_section, params, title, style_notes, normalized, index)
+            for index in range(len(normalized))
+        ))
+        if any(content is None for content in contents):
+            api_logger.error("Service: Failed to parse a section from LLM response, falling back to single generation")
+            return None
+        
+        with span("longform.stitch"):
+            article = stitch_sections(title, contents, words)
+        return {
+            "article": article,
+            "word_count": str(count_english_words(article)),
+            "article_type": params["article_type"],
+            "difficulty_level": params["difficulty_level"],
+            "tone_style": params["tone_style"],
+            "topic": params["topic"],
+        }
+    
+    def _generate_section(self, params: Dict[str, Any], title: str, style_notes: str,
+                          outline: List[Dict[str, Any]], index: int) -> Optional[str]:
+        """生成大纲中的一个部分，两次都无法解析时返回None"""
+        section = outline[index]
+        prompt = self._render_prompt(
+            "outline2section", **{**params, "words": ",".join(section["words"]), "word_count": section["word_count"]},
+            title=title, style_notes=style_notes, outline=outline, index=index + 1, sections=len(outline),
+            summary=section["summary"], heading=section["heading"],
+        )
+        # 单个部分解析失败时只重试该部分
+        for attempt in range(2):
+            api_logger.info(f"Service: Calling LLM to generate section {index + 1}/{len(outline)}")
+            response = self._chat("你是一个文章生成助手", prompt)
+            result = text_to_json(response)
+            content = result.get("content") if isinstance(result, dict) else None
+            if isinstance(content, str) and content.strip():
+                return content
+            llm_json_parse_failures.inc(task="section")
+        # 原始输出可能是JSON或说明文字，不能拼进文章
+        api_logger.error(f"Service: Failed to parse section {index + 1} from LLM response")
+        return None
+    
+    @staticmethod
+    def _parallel(*calls: Callable[[], Any]) -> List[Any]:
+        """
+        并发执行多个调用并按顺序返回结果；每个调用在复制的上下文中运行，请求ID与追踪span保持关联
+
+        第一个调用在当前线程执行，其余提交到共用线程池。线程池已满时尚未开始的调用
+        由当前线程依次执行，嵌套的并行调用（如解释中的分片翻译）不会因等待空闲线程而死锁。
+        """
+        executor = get_parallel_executor()
+        futures = [executor.submit(contextvars.copy_context().run, call) for call in calls[1:]]
+        try:
+            results = [contextvars.copy_context().run(calls[0])] if calls else []
+            for call, future in zip(calls[1:], futures):
+                results.append(contextvars.copy_context().run(call) if future.cancel() else future.result())
+            return results
+        except BaseException:
+            # 请求已失败，取消还未开始的调用
+            for future in futures:
+                future.cancel()
+            raise
+
+    @traced("service.generate_explanation")
     def generate_explanation(self, words: List[str], passage: str) -> Dict[str, Any]:
         """为文章生成解释和翻译"""
         api_logger.info(f"Service: Generating explanation for {len(words)} words")
         
+        if not llm_Settings.EXPLANATION_USE_CONTEXTS:
+            return self._generate_explanation_full(words, passage)
+        
+        # 单词解析只需要目标词所在的句子；全文翻译是独立的调用，两者并发执行
+        language_points, translation = self._parallel(
+            lambda: self.generate_language_points(words, passage),
+            lambda: self._translate_or_fallback(passage),
+        )
+        return {"language_points": language_points, "translation": translation}
+    
+    def _translate_or_fallback(self, passage: str) -> str:
+        try:
+            return self.translate_passage(passage)
+        except ValueError as e:
+            api_logger.error(f"Service: {str(e)}")
+            return "解析失败，请重试。"
+    
+    def _generate_explanation_full(self, words: List[str], passage: str) -> Dict[str, Any]:
+        """整篇文章放入同一个提示词，一次调用同时生成解释和翻译"""
         words_str = ",".join(words)
         
-        prompt_template = PromptTemplate(WORD2TRANSLATION, {})
-        prompt = prompt_template.render(words=words_str, passage=passage)
+        prompt = self._render_prompt("word2translation", focus_words=words, words=words_str, passage=passage)
         
         api_logger.info(f"Service: Calling LLM to generate explanation")
-        start_time = time.time()
-        
-        llm = self.llm_manager.creatLLM(llm_Settings.LLM_PROVIDER)
-        llm.setPrompt("你是一个翻译助手")
-        response = llm.ChatToBot(prompt)
-        
-        elapsed_time = time.time() - start_time
-        api_logger.info(f"Service: LLM response received in {elapsed_time:.2f} seconds")
+        response = self._chat("你是一个翻译助手", prompt)
         
         result = text_to_json(response)
         if not result:
             api_logger.error("Service: Failed to parse JSON from LLM response")
+            llm_json_parse_failures.inc(task="explanation")
             return {"language_points": [], "translation": "解析失败，请重试。"}
         
         return result
     
-    def generate_questions(self, words: List[str], passage: str, difficulty: str = "适中") -> List[Dict[str, Any]]:
-        """为文章生成问题"""
-        api_logger.info(f"Service: Generating questions for {len(words)} words with difficulty={difficulty}")
+    @traced("service.generate_language_points")
+    def generate_language_points(self, words: List[str], passage: str) -> List[Dict[str, Any]]:
+        """
+        根据目标词所在的句子生成单词与词组解析
         
-        words_str = ",".join(words)
+        单词按EXPLANATION_SHARD_WORDS分组并行生成，每组只带各自单词的语境，
+        词组提取只由第一组完成；结果按单词合并去重。
+        """
+        with span("passage.analyze"):
+            analysis = analyze_passage(passage, words)
+        if analysis.missing:
+            api_logger.info(f"Service: Words not found in passage: {analysis.missing}")
         
-        prompt_template = PromptTemplate(PASSAGE2QUESTION, {})
-        prompt = prompt_template.render(words=words_str, passage=passage, difficulty=difficulty)
+        size = llm_Settings.EXPLANATION_SHARD_WORDS
+        groups = [words[i:i + size] for i in range(0, len(words), size)] if size > 0 else [words]
+        shards = self._parallel(*(
+            partial(self._language_points_shard, analysis, group, index == 0)
+            for index, group in enumerate(groups)
+        ))
         
-        api_logger.info(f"Service: Calling LLM to generate questions")
-        start_time = time.time()
+        language_points = []
+        seen = set()
+        for point in (point for shard in shards for point in shard):
+            if not isinstance(point, dict):
+                continue
+            key = str(point.get("word", "")).strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                language_points.append(point)
+        return language_points
+    
+    def _language_points_shard(self, analysis: PassageAnalysis, words: List[str],
+                               include_phrases: bool) -> List[Dict[str, Any]]:
+        contexts = analysis.contexts(llm_Settings.EXPLANATION_CONTEXT_SENTENCES, words)
+        prompt = self._render_prompt("word2explanation", words=",".join(words), contexts=contexts,
+                                     include_phrases=include_phrases)
         
-        llm = self.llm_manager.creatLLM(llm_Settings.LLM_PROVIDER)
-        llm.setPrompt("你是一个问题生成助手")
-        response = llm.ChatToBot(prompt)
+        api_logger.info(f"Service: Calling LLM to generate language points for {len(words)} words")
+        response = self._chat("你是一个翻译助手", prompt)
         
-        elapsed_time = time.time() - start_time
-        api_logger.info(f"Service: LLM response received in {elapsed_time:.2f} seconds")
+        result = text_to_json(response)
+        if isinstance(result, dict):
+            result = result.get("language_points")
+        if not isinstance(result, list):
+            api_logger.error("Service: Failed to parse language points from LLM response")
+            llm_json_parse_failures.inc(task="explanation")
+            return []
+        return result
+    
+    def _get_translation_cache(self) -> Optional[SingleFlight]:
+        if not llm_Settings.TRANSLATION_CACHE_ENABLED:
+            return None
+        if self._translation_cache is None:
+            with self._translation_cache_lock:
+                if self._translation_cache is None:
+                    self._translation_cache = SingleFlight(get_shared_state(), namespace="translation",
+                                                           lock_ttl=llm_Settings.TRANSLATION_TIMEOUT_SECONDS,
+                                                           result_ttl=llm_Settings.TRANSLATION_CACHE_TTL)
+        return self._translation_cache
+    
+    @traced("service.translate_passage")
+    def translate_passage(self, passage: str) -> str:
+        """
+        全文翻译
+        
+        结果按文章内容与提示词版本缓存在共享状态后端，同一篇文章再次解析时直接复用；
+        多个请求（包括其他worker中的）同时翻译同一篇文章时只调用一次LLM。
+        解析失败时抛出ValueError，失败的结果不会被缓存。
+        """
+        cache = self._get_translation_cache()
+        if cache is None:
+            return self._translate_sharded(passage)
+        fingerprint = prompt_registry.get("passage2translation").fingerprint
+        key = hashlib.sha256(f"{fingerprint}:{passage}".encode("utf-8")).hexdigest()
+        cached = cache.lookup(key)
+        if cached is not None:
+            api_logger.info("Service: Translation served from cache")
+            return cached.decode("utf-8")
+        return cache.run(key, lambda: self._translate_sharded(passage).encode("utf-8"),
+                         timeout=llm_Settings.TRANSLATION_TIMEOUT_SECONDS).decode("utf-8")
+    
+    def _translate_sharded(self, passage: str) -> str:
+        """长文章按段落分片并行翻译，再按原顺序拼接"""
+        if llm_Settings.TRANSLATION_SHARD_CHARS <= 0:
+            return self._translate(passage)
+        chunks = chunk_paragraphs(passage, llm_Settings.TRANSLATION_SHARD_CHARS)
+        if len(chunks) <= 1:
+            return self._translate(passage)
+        return "\n\n".join(self._parallel(*(partial(self._translate, chunk) for chunk in chunks)))
+    
+    def _translate(self, passage: str) -> str:
+        prompt = self._render_prompt("passage2translation", passage=passage)
+        
+        api_logger.info(f"Service: Calling LLM to translate passage")
+        response = self._chat("你是一个翻译助手", prompt)
+        
+        result = text_to_json(response)
+        translation = result.get("translation") if isinstance(result, dict) else None
+        if not isinstance(translation, str) or not translation.strip():
+            llm_json_parse_failures.inc(task="translation")
+            raise ValueError("Failed to parse translation from LLM response")
+        return translation
+    
+    @traced("service.generate_questions")
+    def generate_questions(self, words: List[str], passage: str, difficulty: str = "适中",
+                           question_count: int = 5) -> List[Dict[str, Any]]:
+        """
+        为文章生成问题
+        
+        题目数超过QUESTION_SHARD_SIZE时，文章按段落切为若干部分，每部分带上其中出现的目标词并行出题，
+        再按文章顺序合并，去掉题干重复的题目。解析失败或题目不足的分片重新生成，
+        合并后仍不足question_count时抛出ValueError，不返回缺题的测验。
+        """
+        api_logger.info(f"Service: Generating questions for {len(words)} words with difficulty={difficulty}, "
+                        f"count={question_count}")
+        
+        size = llm_Settings.QUESTION_SHARD_SIZE
+        parts = -(-question_count // size) if size > 0 else 1
+        sections = split_sections(passage, parts) if parts > 1 else [passage]
+        if len(sections) <= 1:
+            return self._questions_shard(words, passage, difficulty, question_count)
+        
+        # 题目数平均分配到各部分，余数分给靠前的部分
+        counts = [question_count // len(sections) + (1 if i < question_count % len(sections) else 0)
+                  for i in range(len(sections))]
+        calls = []
+        for index, (section, count) in enumerate(zip(sections, counts)):
+            located = analyze_passage(section, words).located
+            section_words = [word for word in words if located.get(word)] or words
+            calls.append(partial(self._questions_shard, section_words, section, difficulty, count,
+                                 section=index + 1, sections=len(sections)))
+        shards = self._parallel(*calls)
+        for _ in range(llm_Settings.QUESTION_SHARD_RETRIES):
+            short = [index for index, (shard, count) in enumerate(zip(shards, counts)) if len(shard) < count]
+            if not short:
+                break
+            api_logger.error(f"Service: Question shards {[index + 1 for index in short]} came back short, retrying")
+            for index, shard in zip(short, self._parallel(*(calls[index] for index in short))):
+                if len(shard) > len(shards[index]):
+                    shards[index] = shard
+        
+        questions = []
+        seen = set()
+        for question in (question for shard in shards for question in shard):
+            if not isinstance(question, dict):
+                continue
+            key = re.sub(r"\W+", " ", str(question.get("question", ""))).strip().lower()
+            if key not in seen:
+                seen.add(key)
+                questions.append(question)
+        api_logger.info(f"Service: Merged {len(questions)} questions from {len(sections)} sections")
+        if len(questions) < question_count:
+            raise ValueError(f"生成的题目数量不足（{len(questions)}/{question_count}）")
+        return questions[:question_count]
+    
+    def _questions_shard(self, words: List[str], passage: str, difficulty: str, question_count: int,
+                         **section) -> List[Dict[str, Any]]:
+        words_str = ",".join(words)
+        
+        prompt = self._render_prompt("passage2question", focus_words=words, words=words_str, passage=passage,
+                                     difficulty=difficulty, question_count=question_count, **section)
+        
+        api_logger.info(f"Service: Calling LLM to generate questions")
+        response = self._chat("你是一个问题生成助手", prompt)
         
         result = text_to_json(response)
         if not result:
             api_logger.error("Service: Failed to parse JSON from LLM response")
+            llm_json_parse_failures.inc(task="questions")
             print("解析JSON失败，返回空列表")
             return []
         
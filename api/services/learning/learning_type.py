@@ -4,7 +4,7 @@ from enum import Enum
 
 
 class ImageResponse(BaseModel):
-    image_path: str
+    image_path: Optional[str] = None  # 仅在启用上传存储时返回
     words: List[str]
 
 # 枚举类型定义
@@ -115,6 +115,7 @@ class Passage2QuestionRequest(BaseModel):
     words: conlist(str, max_length=50)  # 限制最多50个单词
     passage: str = Field(..., max_length=10000)  # 限制最大长度
     difficulty: QuestionDifficulty = QuestionDifficulty.MEDIUM  # 使用枚举
+    question_count: int = Field(5, ge=1, le=20)  # 题目数量，超过5题时分段并行生成
     
     # 验证器
     @validator('passage')
@@ -146,6 +147,16 @@ class Passage2ExplanationRequest(BaseModel):
             raise ValueError('单词列表不能为空')
         return v
 
+class Passage2TranslationRequest(BaseModel):
+    passage: str = Field(..., max_length=10000)  # 限制最大长度
+    
+    # 验证器
+    @validator('passage')
+    def passage_not_empty(cls, v):
+        if not v.strip():
+            raise ValueError('文章内容不能为空')
+        return v
+
 # 响应模型
 class Word2PassageResponse(BaseModel):
     article: str
@@ -164,6 +175,9 @@ class Passage2ExplanationResponse(BaseModel):
     language_points: List[LanguagePoint]
     translation: str
 
+class Passage2TranslationResponse(BaseModel):
+    translation: str
+
 class QuestionOption(BaseModel):
     A: str
     B: str
@@ -0,0 +1,112 @@
+import re
+from typing import Any, Dict, List
+
+from core.nlp.lemmatizer import Lemmatizer
+
+# 统计英文字数时去掉markdown标记
+_MARKDOWN = re.compile(r"[#*_>`]+")
+_ENGLISH_WORD = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*")
+_HEADING = re.compile(r"^\s*#{1,6}\s+(.*?)\s*$")
+
+
+def normalize_outline(outline: Any, words: List[str], sections: int, total_words: int) -> List[Dict[str, Any]]:
+    """
+    整理LLM返回的大纲
+
+    丢弃格式不正确的部分，部分数超出时合并到最后一部分；补齐缺失的目标字数，
+    去掉不在单词列表中或重复分配的单词，未分配的目标词补到单词最少的部分，保证每个单词恰好出现在一个部分。
+    大纲不可用时返回空列表。
+    """
+    raw = outline.get("sections") if isinstance(outline, dict) else None
+    if not isinstance(raw, list):
+        return []
+    result: List[Dict[str, Any]] = []
+    for item in raw:
+        if not isinstance(item, dict) or not str(item.get("summary", "")).strip():
+            continue
+        item_words = item.get("words")
+        result.append({
+            "heading": str(item.get("heading") or "").strip(),
+            "summary": str(item["summary"]).strip(),
+            "words": [str(word) for word in item_words] if isinstance(item_words, list) else [],
+            "word_count": item.get("word_count"),
+        })
+    if not result:
+        return []
+    while len(result) > sections:
+        extra = result.pop()
+        result[-1]["summary"] = f"{result[-1]['summary']} {extra['summary']}"
+        result[-1]["words"].extend(extra["words"])
+
+    targets = {word.lower(): word for word in words}
+    assigned = set()
+    for section in result:
+        section_words = []
+        for word in section["words"]:
+            key = word.strip().lower()
+            if key in targets and key not in assigned:
+                assigned.add(key)
+                section_words.append(targets[key])
+        section["words"] = section_words
+    for key, word in targets.items():
+        if key not in assigned:
+            min(result, key=lambda section: len(section["words"]))["words"].append(word)
+
+    default_count = max(total_words // len(result), 50)
+    for section in result:
+        try:
+            section["word_count"] = max(int(section["word_count"]), 50)
+        except (TypeError, ValueError):
+            section["word_count"] = default_count
+    return result
+
+
+def count_english_words(text: str) -> int:
+    return len(_ENGLISH_WORD.findall(_MARKDOWN.sub(" ", text)))
+
+
+def stitch_sections(title: str, contents: List[str], words: List[str]) -> str:
+    """
+    在本地拼接各部分
+
+    轻量的连贯性处理：去掉各部分误写的文章标题、重复的小标题和首尾空白，
+    按顺序以空行连接；文中没有加粗的目标词，在其第一次出现处补上粗体。
+    """
+    seen_headings = set()
+    parts: List[str] = [f"## {title.strip()}"] if title and title.strip() else []
+    for content in contents:
+        lines = []
+        for line in content.replace("\\n", "\n").strip().splitlines():
+            match = _HEADING.match(line)
+            if match:
+                heading = match.group(1).strip("*").strip().lower()
+                if (title and heading == title.strip().lower()) or heading in seen_headings:
+                    continue
+                seen_headings.add(heading)
+            lines.append(line.rstrip())
+        text = "\n".join(lines).strip()
+        if text:
+            parts.append(text)
+    article = "\n\n".join(parts)
+    lines = article.split("\n")
+
+    lemmatizer = Lemmatizer(vocabulary=[word.lower() for word in words if " " not in word])
+    for word in words:
+        article = "\n".join(lines)
+        if f"**{word.lower()}" in article.lower():
+            continue
+        if " " in word:
+            pattern = re.compile(re.escape(word), re.IGNORECASE)
+        else:
+            forms = [token for token in set(_ENGLISH_WORD.findall(article))
+                     if lemmatizer.lemmatize(token) == word.lower()]
+            if not forms:
+                continue
+            pattern = re.compile(r"(?<![\w*])(" + "|".join(map(re.escape, sorted(forms, key=len, reverse=True)))
+                                 + r")(?![\w*])")
+        # 只在正文中补粗体，标题行保持不变
+        for number, line in enumerate(lines):
+            if not _HEADING.match(line) and pattern.search(line):
+                lines[number] = pattern.sub(lambda match: f"**{match.group(0)}**", line, count=1)
+                break
+    return "\n".join(lines)
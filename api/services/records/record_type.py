@@ -0,0 +1,96 @@
+from pydantic import BaseModel, Field, validator, conlist
+from typing import List, Dict, Optional, Any, Union
+
+from services.learning.learning_type import Passage2ExplanationResponse, QuestionItem
+
+
+# 请求模型（与前端LearningRecord结构一致）
+class RecordArticle(BaseModel):
+    article: str = Field(..., max_length=20000)  # 文章正文
+    word_count: Union[int, str]
+    article_type: Optional[str] = None
+    difficulty_level: Optional[str] = None
+    tone_style: Optional[str] = None
+    topic: Optional[str] = None
+    sentence_complexity: Optional[float] = None
+    alert: Optional[str] = None
+
+    class Config:
+        extra = "allow"  # 保留旧版前端的record_id、passage_needs等字段
+
+class LearningRecord(BaseModel):
+    id: str = Field(..., min_length=1, max_length=100)
+    timestamp: int = Field(..., ge=0)  # 毫秒时间戳
+    words: conlist(str, max_length=50)
+    article: RecordArticle
+    translation: Optional[Passage2ExplanationResponse] = None
+    questions: Optional[List[Dict[str, Any]]] = None
+
+    # 验证器
+    @validator('words')
+    def words_not_empty(cls, v):
+        if not v:
+            raise ValueError('单词列表不能为空')
+        return v
+
+# 响应模型
+class RecordSummary(BaseModel):
+    id: str
+    timestamp: int
+    words: List[str]
+    article: Dict[str, Any]  # 文章元数据，不含正文
+    preview: str  # 正文开头部分
+    has_translation: bool
+    has_questions: bool
+
+class RecordPage(BaseModel):
+    items: List[RecordSummary]
+    next_cursor: Optional[str] = None  # 下一页的游标，没有更多记录时为空
+
+class UserIdResponse(BaseModel):
+    user_id: str  # 新签发的用户标识，作为X-User-Id发送
+
+# 复习计划
+class QuizAnswer(BaseModel):
+    question: QuestionItem
+    selected: str = Field(..., pattern="^[ABCD]$")  # 用户选择的选项
+    words: Optional[List[str]] = None  # 题目考查的单词，未提供时按题干与选项中出现的目标词判断
+
+class QuizAnswersRequest(BaseModel):
+    words: conlist(str, max_length=50)  # 文章的目标单词
+    answers: conlist(QuizAnswer, min_length=1, max_length=20)
+
+class ExposuresRequest(BaseModel):
+    words: conlist(str, min_length=1, max_length=50)
+
+class ReviewItem(BaseModel):
+    word: str
+    ease: float
+    interval_days: float
+    repetitions: int
+    lapses: int
+    exposures: int
+    correct: int
+    incorrect: int
+    due_at: int  # 毫秒时间戳
+    last_reviewed_at: Optional[int] = None
+
+class DueWordsResponse(BaseModel):
+    words: List[str]  # 可直接作为/word2passage的单词列表
+    items: List[ReviewItem]
+    next_due_at: Optional[int] = None  # 最早到期时间，没有到期单词时可据此提示下次复习
+
+class QuizAnswersResponse(BaseModel):
+    items: List[ReviewItem]
+    unmatched: int  # 无法对应到目标单词的题目数
+
+# 导入
+class RecordImportError(BaseModel):
+    line: int
+    error: str
+
+class RecordImportResponse(BaseModel):
+    imported: int  # 新插入的记录数
+    skipped: int  # ID已存在或内容重复而跳过的记录数
+    failed: int  # 格式不正确的行数
+    errors: List[RecordImportError]  # 前20个错误
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# 测试从api目录导入模块（与运行服务时的工作目录一致）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 配置中必填的提供商字段，测试不调用LLM
+os.environ.setdefault("LLM_PROVIDER", "OPENAI")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_BASE_URL", "http://localhost")
+os.environ.setdefault("OPENAI_MODEL", "test")
+# 共享状态使用内存后端，测试不在data目录下创建数据库文件
+os.environ.setdefault("SHARED_STATE_BACKEND", "memory")
+# 日志写到临时目录，不在api目录下留下logs
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "vocabverse-test-logs"))
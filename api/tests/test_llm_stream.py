@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from core.llm.deepseek import DeepSeek_LLM
+from core.llm.openaillm import OpenAILLM
+
+
+def chunk(content=None, choices=True):
+    if not choices:
+        return SimpleNamespace(choices=[])
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class FakeClient:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.kwargs = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.kwargs.append(kwargs)
+        if kwargs.get("stream"):
+            return iter(self.chunks)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+def test_stream_skips_chunks_without_choices():
+    client = FakeClient([chunk(None), chunk("Hel"), chunk(choices=False), chunk("lo"), chunk(choices=False)])
+    llm = OpenAILLM(api_key="k", base_url="http://llm", model="m", client=client)
+    assert "".join(llm.ChatToBotWithStream("hi")) == "Hello"
+
+
+def test_deepseek_stream_uses_same_parameters_as_chat():
+    client = FakeClient([chunk("x")])
+    DeepSeek_LLM(api_key="k", base_url="http://llm", model="m", client=client).ChatToBot("hi")
+    list(DeepSeek_LLM(api_key="k", base_url="http://llm", model="m", client=client).ChatToBotWithStream("hi"))
+    chat, stream = client.kwargs
+    assert stream.pop("stream") is True
+    assert {k: v for k, v in stream.items() if k != "messages"} == {k: v for k, v in chat.items() if k != "messages"}
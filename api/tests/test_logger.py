@@ -0,0 +1,25 @@
+import pytest
+
+from core.logger import claim_worker_index, fcntl
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="需要fcntl文件锁")
+
+
+def test_workers_get_distinct_stable_indexes(tmp_path):
+    first, first_lock = claim_worker_index(str(tmp_path), 2)
+    second, second_lock = claim_worker_index(str(tmp_path), 2)
+    assert (first, second) == (0, 1)
+
+    # worker退出后，重启的worker复用空出的序号
+    first_lock.close()
+    restarted, restarted_lock = claim_worker_index(str(tmp_path), 2)
+    assert restarted == 0
+    second_lock.close()
+    restarted_lock.close()
+
+
+def test_falls_back_when_all_indexes_are_taken(tmp_path):
+    locks = [claim_worker_index(str(tmp_path), 1)[1] for _ in range(2)]
+    assert claim_worker_index(str(tmp_path), 1) == (None, None)
+    for lock in locks:
+        lock.close()
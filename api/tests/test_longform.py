@@ -0,0 +1,41 @@
+import json
+
+from services.learning.learning_service import WordServices
+from services.learning.learning_type import ArticleLength, ArticleType, DifficultyLevel, ToneStyle, TopicArea
+
+
+OUTLINE = json.dumps({
+    "title": "A Day Out",
+    "sections": [
+        {"heading": "Morning", "summary": "They leave early.", "words": ["apple"], "word_count": 300},
+        {"heading": "Evening", "summary": "They come home.", "words": ["river"], "word_count": 300},
+    ],
+})
+PASSAGE = json.dumps({"article": "An **apple** fell into the **river**.", "word_count": 7})
+
+
+def generate(service):
+    return service.generate_passage(
+        ["apple", "river"], ArticleType.SHORT_STORY, DifficultyLevel.B1, ToneStyle.INFORMAL,
+        ArticleLength.CUSTOM, TopicArea.GENERAL, custom_word_count=600,
+    )
+
+
+def test_unparseable_section_falls_back_to_single_generation(monkeypatch):
+    service = WordServices()
+    calls = []
+
+    def chat(system_prompt, prompt):
+        if system_prompt == "你是一个文章策划助手":
+            return OUTLINE
+        if "They come home." in prompt:
+            # 大纲中的部分：两次都返回无法解析的说明文字
+            calls.append("section")
+            return "Sorry, I cannot write this section."
+        calls.append("passage")
+        return PASSAGE
+
+    monkeypatch.setattr(service, "_chat", chat)
+    result = generate(service)
+    assert result["article"] == "An **apple** fell into the **river**."
+    assert calls.count("passage") == 1
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from core.image2word.ocr_cache import OCRResultCache
+from core.image2word.ocr_pool import OCRWorkerPool
+from core.shared_state import SingleFlight
+from core.shared_state.backend import MemoryBackend
+
+RESULT = [("page", 0.9), ("apple", 0.95)]
+
+
+def make_pool(shared):
+    pool = OCRWorkerPool(pool_size=1, queue_size=8)
+    pool.cache = OCRResultCache(max_entries=10, disk_dir="", max_distance=0, shared=shared)
+    submitted = []
+
+    def submit(image):
+        future = Future()
+        submitted.append(image)
+        threading.Timer(0.2, future.set_result, (RESULT,)).start()
+        return future
+
+    pool.submit = submit
+    return pool, submitted
+
+
+def test_concurrent_requests_for_one_image_share_a_single_recognition():
+    pool, submitted = make_pool(SingleFlight(MemoryBackend(), namespace="ocr"))
+
+    async def main():
+        return await asyncio.gather(*(pool.recognize_async(b"image", timeout=2) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(submitted) == 1
+    assert [list(map(tuple, result)) for result in results] == [RESULT] * 5
+    assert not pool._inflight
+
+
+def test_wait_async_returns_result_published_by_another_worker():
+    flight = SingleFlight(MemoryBackend(), namespace="ocr", poll_interval=0.01)
+    assert flight.acquire("key")
+    threading.Timer(0.1, flight.release, ("key", b"done")).start()
+    assert asyncio.run(flight.wait_async("key", 2)) == b"done"
+
+
+def test_wait_async_times_out_while_peer_holds_the_lock():
+    flight = SingleFlight(MemoryBackend(), namespace="ocr", poll_interval=0.01)
+    assert flight.acquire("key")
+    assert asyncio.run(flight.wait_async("key", 0.1)) is None
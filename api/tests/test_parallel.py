@@ -0,0 +1,43 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import services.learning.learning_service as learning_service
+from core.llm.limiter import LLMQueueTimeoutError, ProviderLimiter
+from services.learning.learning_service import WordServices
+
+
+def test_limiter_fails_when_queue_wait_exceeds_timeout():
+    limiter = ProviderLimiter("TEST", 1, timeout=0.05)
+    with limiter.slot():
+        with pytest.raises(LLMQueueTimeoutError):
+            with limiter.slot():
+                pass
+    with limiter.slot():
+        pass
+
+
+def test_nested_parallel_calls_finish_on_a_saturated_pool(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(learning_service, "_parallel_executor", executor)
+    parallel = WordServices._parallel
+
+    def outer(index):
+        return sum(parallel(*(lambda i=i: index * 10 + i for i in range(3))))
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(parallel(*(lambda i=i: outer(i) for i in range(4)))))
+    worker.start()
+    worker.join(5)
+    executor.shutdown(wait=False)
+    assert result == [[3, 33, 63, 93]]
+
+
+def test_parallel_keeps_order_and_propagates_errors():
+    def fail():
+        raise ValueError("boom")
+
+    assert WordServices._parallel(lambda: 1, lambda: 2, lambda: 3) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        WordServices._parallel(lambda: 1, fail)
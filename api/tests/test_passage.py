@@ -0,0 +1,40 @@
+from core.nlp.lemmatizer import inflections
+from core.nlp.passage import analyze_passage
+
+PASSAGE = ("The river began to flow past the garden. "
+           "It was a new idea for the town. "
+           "Children like to teach their parents games. "
+           "She showed us the way home. "
+           "Everyone watched the parades and cheered.")
+
+
+def located(words, passage=PASSAGE):
+    return analyze_passage(passage, words).located
+
+
+def test_derived_words_do_not_match_their_stems():
+    result = located(["flower", "news", "teacher", "shower"])
+    assert result == {"flower": [], "news": [], "teacher": [], "shower": []}
+
+
+def test_inflections_of_target_match():
+    result = located(["flow", "show", "cheer", "watch"])
+    assert result == {"flow": [0], "show": [3], "cheer": [4], "watch": [4]}
+
+
+def test_inflected_target_matches_base_form_in_passage():
+    result = located(["parade", "ideas", "games"])
+    assert result == {"parade": [4], "ideas": [1], "games": [2]}
+
+
+def test_inflected_target_matches_base_form_only_when_present():
+    assert located(["gauges"], "The gauge broke. The gauges were replaced.") == {"gauges": [0, 1]}
+
+
+def test_no_degree_or_irregular_adjective_mapping():
+    assert located(["good"], "This plan is better than the last one.") == {"good": []}
+    assert "better" not in inflections("good")
+
+
+def test_irregular_verb_forms_match():
+    assert located(["go", "child"], "He went home. The children stayed.") == {"go": [0], "child": [1]}
@@ -0,0 +1,17 @@
+import pickle
+
+import pytest
+
+from core.image2word.preprocess import ImageDecodeError, ImagePreprocessor
+
+
+def test_undecodable_image_raises_image_decode_error():
+    with pytest.raises(ImageDecodeError):
+        ImagePreprocessor().process(b"not an image")
+
+
+def test_image_decode_error_survives_the_process_pool():
+    # OCR在工作进程中执行，异常需要能序列化回主进程并保持类型
+    error = pickle.loads(pickle.dumps(ImageDecodeError("无法解码图片数据")))
+    assert isinstance(error, ImageDecodeError)
+    assert str(error) == "无法解码图片数据"
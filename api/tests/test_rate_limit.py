@@ -0,0 +1,36 @@
+import time
+
+from starlette.requests import Request
+
+from config.configs import settings
+from controllers.learning import client_identity
+from core.shared_state.backend import MemoryBackend
+
+
+def request(client: str, forwarded: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (client, 1234)})
+
+
+def test_forwarded_for_ignored_without_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "")
+    assert client_identity(request("203.0.113.9", "1.2.3.4")) == "203.0.113.9"
+
+
+def test_forwarded_for_uses_rightmost_untrusted_hop(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.0/8, 192.168.1.1")
+    # 最左侧为客户端伪造的值，代理追加了真实的客户端地址
+    forwarded = "1.2.3.4, 198.51.100.7, 10.0.0.2"
+    assert client_identity(request("192.168.1.1", forwarded)) == "198.51.100.7"
+    # 不是来自可信代理时不采用请求头
+    assert client_identity(request("203.0.113.9", forwarded)) == "203.0.113.9"
+
+
+def test_memory_backend_purges_unread_expired_keys(monkeypatch):
+    backend = MemoryBackend()
+    for index in range(100):
+        backend.incr(f"ratelimit:client-{index}:1", ttl=0.01)
+    time.sleep(0.02)
+    monkeypatch.setattr(MemoryBackend, "PURGE_INTERVAL", 0)
+    backend.incr("ratelimit:other:2", ttl=60)
+    assert len(backend._data) == 1
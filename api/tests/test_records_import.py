@@ -0,0 +1,53 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import controllers.records as records
+from controllers.learning import rate_limit
+
+
+class FakeStore:
+    def __init__(self):
+        self.records = []
+
+    def import_batch(self, user_id, batch):
+        self.records.extend(batch)
+        return len(batch)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = FakeStore()
+    monkeypatch.setattr(records, "get_record_store", lambda: store)
+    app = FastAPI()
+    app.include_router(records.router, prefix="/records")
+    app.dependency_overrides[rate_limit] = lambda: None
+    app.dependency_overrides[records.current_user] = lambda: "user"
+    with TestClient(app) as test_client:
+        yield test_client, store
+
+
+def ndjson(start, count):
+    lines = [
+        json.dumps({"id": f"r{i}", "timestamp": i, "words": ["apple"], "article": {"article": "An apple.", "word_count": 2}})
+        for i in range(start, start + count)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_import_reads_every_gzip_member(client):
+    test_client, store = client
+    body = gzip.compress(ndjson(0, 3)) + gzip.compress(ndjson(3, 2))
+    response = test_client.post("/records/import", content=body)
+    assert response.status_code == 200
+    assert response.json()["imported"] == 5
+    assert [record["id"] for record in store.records] == ["r0", "r1", "r2", "r3", "r4"]
+
+
+def test_import_rejects_truncated_gzip(client):
+    test_client, _ = client
+    body = gzip.compress(ndjson(0, 3))
+    assert test_client.post("/records/import", content=body[:-10]).status_code == 400
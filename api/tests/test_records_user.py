@@ -0,0 +1,21 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from controllers.records import create_user, current_user
+
+
+@pytest.mark.parametrize("user_id", [None, "1", "alice", "a" * 31, "x" * 32 + "!"])
+def test_current_user_rejects_guessable_ids(user_id):
+    with pytest.raises(HTTPException) as error:
+        current_user(user_id)
+    assert error.value.status_code == 400
+
+
+def test_current_user_accepts_issued_ids_and_uuids():
+    issued = create_user().user_id
+    assert len(issued) >= 32
+    assert current_user(issued) != issued
+    assert current_user(issued) == current_user(issued)
+    assert current_user(str(uuid.uuid4())) != current_user(str(uuid.uuid4()))
@@ -0,0 +1,32 @@
+from controllers.reviews import answer_words
+from services.records.record_type import QuizAnswer
+from services.learning.learning_type import QuestionItem
+
+
+def quiz_answer(question: str, correct_option: str = "A new phone") -> QuizAnswer:
+    item = QuestionItem(
+        question=question,
+        answer="A",
+        option={"A": correct_option, "B": "A book", "C": "A bike", "D": "Nothing"},
+        explanation={"chinese_exp": "", "english_exp": ""},
+    )
+    return QuizAnswer(question=item, selected="B")
+
+
+def test_answer_words_ignores_stems_of_target_words():
+    assert answer_words(quiz_answer("What new thing did he buy?"), ["news", "apple"]) == []
+
+
+def test_answer_words_matches_target_and_its_inflections():
+    answer = quiz_answer("Why did he buy apples after watching the news?")
+    assert answer_words(answer, ["news", "apple", "watch"]) == ["news", "apple", "watch"]
+
+
+def test_answer_words_does_not_match_base_form_of_inflected_target():
+    assert answer_words(quiz_answer("Which apple did she pick?", "The red one"), ["apples"]) == []
+
+
+def test_answer_words_prefers_explicit_words():
+    answer = quiz_answer("What new thing did he buy?")
+    answer.words = ["news"]
+    assert answer_words(answer, ["apple"]) == ["news"]
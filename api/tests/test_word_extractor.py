@@ -0,0 +1,48 @@
+import pytest
+
+from core.image2word.word_extractor import VocabularyExtractor
+from core.nlp.lemmatizer import Lemmatizer
+
+
+# 课本上本身就是原形的词条，无词表时不能被改写
+@pytest.mark.parametrize("line, expected", [
+    ("always 总是", "always"),
+    ("news 新闻", "news"),
+    ("series 系列", "series"),
+    ("physics 物理", "physics"),
+    ("lens 透镜", "lens"),
+    ("perhaps 也许", "perhaps"),
+    ("people 人们", "people"),
+    ("better adj.", "better"),
+    ("left 左边", "left"),
+    ("rose 玫瑰", "rose"),
+    ("a.m. 上午", "a.m."),
+])
+def test_headword_keeps_dictionary_forms_without_wordlist(line, expected):
+    assert VocabularyExtractor().headword(line) == expected
+
+
+def test_headword_still_strips_numbering():
+    extractor = VocabularyExtractor()
+    assert extractor.headword("3. apple /ˈæpl/ n. 苹果") == "apple"
+    assert extractor.headword("b) p.m. 下午") == "p.m."
+
+
+def test_headword_lemmatizes_only_when_wordlist_confirms():
+    extractor = VocabularyExtractor(wordlist=["apple", "news", "rise", "give up"])
+    assert extractor.headword("apples 苹果") == "apple"
+    assert extractor.headword("news 新闻") == "news"
+    assert extractor.headword("rose 玫瑰") == "rise"
+    assert extractor.headword("gave up 放弃") is None
+    assert extractor.headword("lens 透镜") is None
+
+
+def test_extract_deduplicates_surface_forms():
+    texts = [("news 新闻", 0.9), ("news", 0.95), ("new 新的", 0.8)]
+    assert VocabularyExtractor().extract(texts) == ["news", "new"]
+
+
+@pytest.mark.parametrize("word", ["always", "news", "series", "physics", "lens", "perhaps", "people",
+                                  "better", "left", "rose"])
+def test_lemmatize_without_vocabulary_is_identity(word):
+    assert Lemmatizer().lemmatize(word) == word
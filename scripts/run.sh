@@ -85,7 +85,7 @@ cd ../api  # 切换到后端目录
 python3 -m venv venv       # 创建虚拟环境
 source venv/bin/activate   # 激活虚拟环境
 pip install -r requirements.txt  # 安装依赖
-nohup python3 main.py &    # 后台启动后端服务
+nohup python3 serve.py &   # 后台启动后端服务（worker数等见.env中的SERVER_*配置）
 
 echo -e "${GREEN}部署完成!${NC}"
 echo "API服务: http://localhost:9988"